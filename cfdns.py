@@ -10,6 +10,38 @@ from tkinter import ttk, messagebox, scrolledtext
 import requests
 import json
 import os
+import re
+import queue
+import argparse
+import sys
+import ipaddress
+import hashlib
+import sqlite3
+import threading
+import contextvars
+import functools
+import importlib.util
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import yaml  # 可选：读取 YAML 格式的期望状态文件
+except ImportError:
+    yaml = None
+
+try:
+    import orjson  # 可选：更快的 JSON 编解码
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # 可选：HTTP/2 传输（还需要 h2，即 pip install httpx[http2]）
+except ImportError:
+    httpx = None
+
+if httpx is not None and importlib.util.find_spec('h2') is None:
+    httpx = None  # 缺少 h2 时 httpx 无法使用 HTTP/2
 
 # ==================== 配置管理 ====================
 
@@ -19,6 +51,8 @@ class Config:
     def __init__(self):
         self.accounts = []  # 账号列表 [{"name": "账号名", "api_token": "token", "email": "email", "account_id": "id", "auth_type": "token"}]
         self.current_account_index = 0
+        self.templates = {}  # 记录模板 {"模板名": [{"type": "MX", "name": "@", "content": "mx.{zone}", "priority": 10}]}
+        self.transport = "http1"  # HTTP 传输: http1 (requests 连接池) 或 http2 (httpx，需要安装)
         self.load_config()
     
     def load_config(self):
@@ -29,6 +63,8 @@ class Config:
                     data = json.load(f)
                     self.accounts = data.get('accounts', [])
                     self.current_account_index = data.get('current_account_index', 0)
+                    self.templates = data.get('templates', {})
+                    self.transport = data.get('transport', self.transport)
             except Exception as e:
                 print(f"加载配置失败: {e}")
     
@@ -37,7 +73,9 @@ class Config:
         try:
             data = {
                 'accounts': self.accounts,
-                'current_account_index': self.current_account_index
+                'current_account_index': self.current_account_index,
+                'templates': self.templates,
+                'transport': self.transport
             }
             with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)
@@ -95,6 +133,18 @@ class Config:
             self.current_account_index = index
             return self.save_config()
         return False
+    
+    def save_template(self, name, records):
+        """保存（新建或覆盖）记录模板"""
+        self.templates[name] = records
+        return self.save_config()
+    
+    def delete_template(self, name):
+        """删除记录模板"""
+        if name in self.templates:
+            del self.templates[name]
+            return self.save_config()
+        return False
 
 # 全局配置实例
 config = Config()
@@ -134,11 +184,605 @@ def center_window(window, parent=None):
     window.geometry(f"+{x}+{y}")
 
 
+# ==================== 并发与限速 ====================
+
+MAX_WORKERS = 8          # 并发请求线程数
+BATCH_SIZE = 200         # 批量接口单次提交的最大记录数
+RATE_LIMIT = 4.0         # Cloudflare 限制约 1200 次/5分钟，即每秒 4 次
+RATE_BURST = 20          # 允许的突发请求数
+ACCOUNTS_CACHE_TTL = 300 # 账号列表缓存时间（秒）
+UI_POLL_MS = 50          # 主线程处理后台回调的间隔（毫秒）
+SELECT_DEBOUNCE_MS = 250 # 域名选择停留多久后才加载记录（毫秒）
+RECORD_CACHE_ZONES = 50          # 记录缓存最多保留的域名数
+RECORD_CACHE_RECORDS = 200000    # 记录缓存最多保留的记录总数
+PREFETCH_DELAY_MS = 1500         # 选择停留多久后预取相邻域名（毫秒）
+PREFETCH_NEIGHBOURS = 2          # 预取选中域名上下各几个域名
+ACTIVATION_POLL_MIN = 15         # 激活状态轮询的最短间隔（秒）
+ACTIVATION_POLL_MAX = 600        # 无变化时间隔逐次翻倍，最长间隔（秒）
+SYNC_INTERVAL = 300              # 后台同步的间隔（秒）
+SYNC_REQUEST_BUDGET = 500        # 每轮后台同步最多发出的请求数
+LOCAL_CACHE_MAX_AGE = 900        # 本地缓存在该时间（秒）内视为最新，界面直接使用
+RATE_INTERACTIVE_RESERVE = 5     # 限速令牌中留给交互请求的数量，批量任务不能动用
+JOB_CONCURRENCY = 2              # 任务队列同时运行的批量任务数
+HTTP2_CONNECTIONS = 2            # HTTP/2 传输的最大连接数（每个连接上多路复用并发请求）
+REQUEST_TIMEOUT = 30             # 单个 HTTP 请求的超时（秒）
+METRICS_SAMPLES = 1000           # 请求指标保留的最近样本数（用于计算分位数）
+ACCEPT_ENCODING = "gzip, deflate"  # 协商的响应压缩方式
+
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+
+# 当前请求所属的通道：任务队列、后台同步和预取中的请求为 bulk，其余（用户操作）为 interactive
+request_priority = contextvars.ContextVar('request_priority', default=PRIORITY_INTERACTIVE)
+
+
+def in_bulk_lane(func, *args, **kwargs):
+    """在批量通道中执行 func(*args, **kwargs)，其中的请求让位于交互请求"""
+    token = request_priority.set(PRIORITY_BULK)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        request_priority.reset(token)
+
+
+class RateLimiter:
+    """令牌桶限速器（线程安全），同一凭据的所有请求共用一个
+    
+    交互请求优先：批量通道的请求在有交互请求等待时不取令牌，并且始终留出 reserve 个令牌，
+    因此批量任务占满限速时用户操作仍能立即发出。
+    """
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, reserve=RATE_INTERACTIVE_RESERVE):
+        self.rate = rate
+        self.burst = burst
+        self.reserve = min(reserve, burst - 1)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.interactive_waiting = 0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """获取一个令牌，不足时阻塞等待"""
+        bulk = request_priority.get() == PRIORITY_BULK
+        floor = 1 + self.reserve if bulk else 1
+        waiting = False
+        try:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= floor and not (bulk and self.interactive_waiting):
+                        self.tokens -= 1
+                        return
+                    if not bulk and not waiting:
+                        self.interactive_waiting += 1
+                        waiting = True
+                    wait = max((floor - self.tokens) / self.rate, 1 / self.rate / 10)
+                time.sleep(wait)
+        finally:
+            if waiting:
+                with self.lock:
+                    self.interactive_waiting -= 1
+
+
+def run_concurrently(func, items, max_workers=MAX_WORKERS):
+    """并发执行 func(item)，按完成顺序逐个产出 (item, result, error)
+    
+    func 需遵循 API 方法的 (result, error) 返回约定。生成器在调用线程中迭代，
+    因此调用方可以在每次产出后安全地刷新界面。
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        # 复制调用线程的上下文（如当前变更任务），工作线程中的请求归入同一任务
+        futures = {executor.submit(contextvars.copy_context().run, func, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result, error = future.result()
+            except Exception as e:
+                result, error = None, f"请求错误: {str(e)}"
+            yield item, result, error
+
+
+class BackgroundRunner:
+    """在后台线程执行任务，并把回调转交给 Tk 主线程执行（Tk 不是线程安全的）"""
+    def __init__(self, root, max_workers=MAX_WORKERS):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.callbacks = queue.Queue()
+        self.root.after(UI_POLL_MS, self._poll)
+    
+    def submit(self, func, callback=None):
+        """后台执行 func()，完成后在主线程调用 callback(func 的返回值)"""
+        def run():
+            try:
+                result = func()
+            except Exception as e:
+                result = (None, f"请求错误: {str(e)}")
+            if callback:
+                self.callbacks.put((callback, (result,)))
+        return self.executor.submit(contextvars.copy_context().run, run)
+    
+    def call_soon(self, callback, *args):
+        """从任意线程安排 callback(*args) 在主线程执行"""
+        self.callbacks.put((callback, args))
+    
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self.callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"后台任务回调出错: {e}")
+        self.root.after(UI_POLL_MS, self._poll)
+    
+    def shutdown(self):
+        """取消尚未开始的任务"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def chunked(items, size):
+    """按固定大小切分列表"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def diff_record(record, desired):
+    """计算记录的字段级差异，只返回与当前值不同的字段"""
+    changes = {}
+    for field, value in desired.items():
+        if record.get(field) != value:
+            changes[field] = value
+    return changes
+
+
+# ==================== 任务队列 ====================
+
+class ScheduledJob:
+    """任务队列中的一个批量任务
+    
+    任务对象本身可以当作 cancel_event 传给现有函数（iter_zones、list_dns_records、
+    apply_template 等）：is_set() 在暂停期间阻塞、取消后返回 True，wait(timeout) 等待取消。
+    这样这些函数检查取消的地方同时也是暂停点。
+    """
+    QUEUED = "排队中"
+    RUNNING = "运行中"
+    DONE = "已完成"
+    FAILED = "失败"
+    CANCELLED = "已取消"
+    
+    _ids = iter(range(1, 1 << 62))
+    
+    def __init__(self, scheduler, label, func, priority=0, on_done=None, key=None):
+        self.id = next(self._ids)
+        self.scheduler = scheduler
+        self.label = label
+        self.func = func  # func(job) 在工作线程中执行，返回 (result, error)
+        self.priority = priority
+        self.on_done = on_done  # on_done(job)，在工作线程中调用
+        self.key = key  # 任务操作的对象（如任务文件路径），同一对象同时只能有一个未结束的任务
+        self.state = self.QUEUED
+        self.paused = False
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.lines = []  # 任务输出的结果行
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.context = contextvars.copy_context()  # 提交时的上下文（如当前变更任务）
+        self.cancelled = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+    
+    def is_set(self):
+        """检查点：暂停时阻塞到继续或取消，返回是否已取消"""
+        while not self.resumed.wait(0.2):
+            if self.cancelled.is_set():
+                break
+        return self.cancelled.is_set()
+    
+    def wait(self, timeout=None):
+        """等待取消（用于轮询间隔），返回是否已取消"""
+        return self.cancelled.wait(timeout)
+    
+    def progress(self, done=None, total=None, message=None):
+        """更新进度（工作线程中调用）"""
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.scheduler.notify(self)
+    
+    def log(self, line):
+        """追加一行结果"""
+        self.lines.append(line)
+    
+    def is_finished(self):
+        return self.state in (self.DONE, self.FAILED, self.CANCELLED)
+    
+    def status_text(self):
+        if self.paused and not self.is_finished():
+            return "已暂停"
+        return self.state
+    
+    def progress_text(self):
+        if not self.total:
+            return str(self.done) if self.done else ""
+        return f"{self.done}/{self.total} ({self.done * 100 // self.total}%)"
+
+
+class JobScheduler:
+    """批量任务调度器：按优先级（数值大的先运行）排队，同时最多运行 concurrency 个任务
+    
+    任务在独立线程中以批量通道运行（见 RateLimiter），不阻塞界面，也不影响交互请求。
+    状态变化时调用监听器 listener(job)（任意线程）。
+    """
+    def __init__(self, concurrency=JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.jobs = []
+        self.listeners = []
+        self.lock = threading.Lock()
+    
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def notify(self, job):
+        for listener in list(self.listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"任务队列监听器出错: {e}")
+    
+    def submit(self, label, func, priority=0, on_done=None, key=None):
+        """提交任务，返回 ScheduledJob"""
+        job = ScheduledJob(self, label, func, priority, on_done, key)
+        with self.lock:
+            self.jobs.append(job)
+        self.notify(job)
+        self.dispatch()
+        return job
+    
+    def is_active(self, key):
+        """是否有操作该对象、尚未结束的任务"""
+        return any(job.key == key and not job.is_finished() for job in list(self.jobs))
+    
+    def dispatch(self):
+        """有空闲名额时按优先级启动排队中（且未暂停）的任务"""
+        with self.lock:
+            running = sum(1 for job in self.jobs if job.state == ScheduledJob.RUNNING)
+            queued = [job for job in self.jobs if job.state == ScheduledJob.QUEUED and not job.paused]
+            queued.sort(key=lambda job: (-job.priority, job.id))
+            starting = queued[:max(0, self.concurrency - running)]
+            for job in starting:
+                job.state = ScheduledJob.RUNNING
+                job.started_at = time.time()
+        
+        for job in starting:
+            self.notify(job)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+    
+    def _run(self, job):
+        """工作线程：在提交时的上下文和批量通道中执行任务"""
+        try:
+            result, error = job.context.run(in_bulk_lane, job.func, job)
+        except Exception as e:
+            result, error = None, f"任务出错: {str(e)}"
+        
+        with self.lock:
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+            if job.cancelled.is_set():
+                job.state = ScheduledJob.CANCELLED
+            else:
+                job.state = ScheduledJob.FAILED if error else ScheduledJob.DONE
+        if error and not job.message:
+            job.message = error
+        
+        self.notify(job)
+        self._call_on_done(job)
+        self.dispatch()
+    
+    def _call_on_done(self, job):
+        """任务结束后调用 on_done（回调出错不影响调度）"""
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"任务完成回调出错: {e}")
+    
+    def pause(self, job):
+        """暂停任务：运行中的任务在下一个检查点停下，排队中的任务暂不启动"""
+        if job.is_finished():
+            return
+        job.paused = True
+        job.resumed.clear()
+        self.notify(job)
+    
+    def resume(self, job):
+        """继续已暂停的任务"""
+        job.paused = False
+        job.resumed.set()
+        self.notify(job)
+        self.dispatch()
+    
+    def cancel(self, job):
+        """取消任务：排队中的直接取消，运行中的在下一个检查点结束"""
+        with self.lock:
+            if job.is_finished():
+                return
+            job.cancelled.set()
+            job.resumed.set()
+            never_started = job.state == ScheduledJob.QUEUED
+            if never_started:
+                job.state = ScheduledJob.CANCELLED
+                job.finished_at = time.time()
+        self.notify(job)
+        if never_started:
+            # 排队中的任务不会进入 _run，在这里通知提交方任务已结束
+            self._call_on_done(job)
+        self.dispatch()
+    
+    def set_priority(self, job, priority):
+        """调整优先级（只影响尚未开始的任务）"""
+        job.priority = priority
+        self.notify(job)
+    
+    def set_concurrency(self, concurrency):
+        """调整同时运行的任务数"""
+        self.concurrency = max(1, concurrency)
+        self.dispatch()
+    
+    def clear_finished(self):
+        """从列表中移除已结束的任务，返回被移除的任务"""
+        with self.lock:
+            finished = [job for job in self.jobs if job.is_finished()]
+            self.jobs = [job for job in self.jobs if not job.is_finished()]
+        return finished
+
+
+# 全局任务队列
+scheduler = JobScheduler()
+
+
+# ==================== HTTP 传输 ====================
+
+class StdlibJsonCodec:
+    """标准库 json 编解码（未安装 orjson 时使用）"""
+    name = "json"
+    
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+    
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class OrjsonCodec:
+    """orjson 编解码：解码大的域名和记录列表页明显快于标准库"""
+    name = "orjson"
+    
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+    
+    @staticmethod
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+
+JSON_CODECS = {StdlibJsonCodec.name: StdlibJsonCodec, OrjsonCodec.name: OrjsonCodec}
+
+
+def available_json_codecs():
+    """当前环境可用的 JSON 编解码名称"""
+    return [name for name in JSON_CODECS if name != OrjsonCodec.name or orjson is not None]
+
+
+def default_json_codec():
+    """可用时使用 orjson，否则使用标准库"""
+    return OrjsonCodec if orjson is not None else StdlibJsonCodec
+
+
+class RequestsTransport:
+    """HTTP/1.1 传输（requests 连接池）：每个连接同时只处理一个请求，并发请求数受连接池大小限制"""
+    name = "http1"
+    
+    def __init__(self, headers, pool_size=MAX_WORKERS):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    
+    def request(self, method, url, params=None, body=None, timeout=REQUEST_TIMEOUT):
+        """发送请求（body 为已编码的 JSON 字节），返回带 status_code、headers、content 的响应（已解压）
+        
+        超时和连接失败转换为内置的 TimeoutError、ConnectionError。
+        """
+        try:
+            return self.session.request(method, url, params=params, data=body, timeout=timeout)
+        except requests.exceptions.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+    
+    @staticmethod
+    def wire_size(response):
+        """响应正文在网络上传输的字节数（压缩时为压缩后的大小）"""
+        try:
+            return response.raw.tell()
+        except Exception:
+            return int(response.headers.get("Content-Length") or len(response.content))
+    
+    def close(self):
+        self.session.close()
+
+
+class Http2Transport:
+    """HTTP/2 传输（httpx）：少量连接上多路复用所有并发的翻页和写请求
+    
+    服务器不支持 HTTP/2 时 httpx 自动协商回 HTTP/1.1。
+    """
+    name = "http2"
+    
+    def __init__(self, headers, connections=HTTP2_CONNECTIONS):
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        headers = dict(headers, **{"Accept-Encoding": ACCEPT_ENCODING})
+        self.client = httpx.Client(http2=True, headers=headers, limits=limits, timeout=REQUEST_TIMEOUT)
+    
+    def request(self, method, url, params=None, body=None, timeout=REQUEST_TIMEOUT):
+        try:
+            return self.client.request(method, url, params=params, content=body, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+    
+    @staticmethod
+    def wire_size(response):
+        return response.num_bytes_downloaded
+    
+    def close(self):
+        self.client.close()
+
+
+TRANSPORTS = {RequestsTransport.name: RequestsTransport, Http2Transport.name: Http2Transport}
+
+
+def available_transports():
+    """当前环境可用的传输名称"""
+    return [name for name in TRANSPORTS if name != Http2Transport.name or httpx is not None]
+
+
+def create_transport(name, headers):
+    """按名称创建传输；未知名称或缺少可选依赖时退回 HTTP/1.1"""
+    if name not in available_transports():
+        if name == Http2Transport.name:
+            print("HTTP/2 传输需要安装 httpx[http2]，已改用 HTTP/1.1")
+        else:
+            print(f"未知的传输 {name}，已改用 HTTP/1.1")
+        name = RequestsTransport.name
+    return TRANSPORTS[name](headers)
+
+
+def percentile(values, fraction):
+    """已排序列表的分位数（最近秩），空列表返回 0"""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class RequestMetrics:
+    """请求指标（线程安全）：累计请求数、失败数、耗时、传输字节数和解码耗时，
+    并保留最近 METRICS_SAMPLES 个样本计算分位数"""
+    def __init__(self, samples=METRICS_SAMPLES):
+        self.samples = deque(maxlen=samples)  # 每个 HTTP 请求一个 dict
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def record(self, transport, method, endpoint, status, elapsed, wire_bytes=0, body_bytes=0,
+               encoding="", decode_time=0.0):
+        """记录一次 HTTP 请求；status 为 None 表示没有收到响应
+        
+        wire_bytes 为网络上传输的正文字节数（压缩后），body_bytes 为解压后的字节数，
+        decode_time 为 JSON 解码耗时（秒）。
+        """
+        ui_thread = threading.current_thread() is threading.main_thread()
+        with self.lock:
+            self.count += 1
+            self.total_time += elapsed
+            if status is None or status >= 400:
+                self.errors += 1
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+            self.decode_time += decode_time
+            if ui_thread and decode_time:
+                self.ui_decodes += 1
+            self.samples.append({'transport': transport, 'method': method, 'endpoint': endpoint,
+                                 'status': status, 'elapsed': elapsed, 'wire_bytes': wire_bytes,
+                                 'body_bytes': body_bytes, 'encoding': encoding, 'decode_time': decode_time,
+                                 'ui_thread': ui_thread})
+    
+    def reset(self):
+        with self.lock:
+            self.count = 0
+            self.errors = 0
+            self.total_time = 0.0
+            self.wire_bytes = 0
+            self.body_bytes = 0
+            self.decode_time = 0.0
+            self.ui_decodes = 0  # 在界面线程中解码的响应数（应为 0 或只有很小的响应）
+            self.samples.clear()
+    
+    def snapshot(self):
+        """汇总：请求数、失败数、平均/中位/P95 耗时和平均解码耗时（毫秒，分位数基于最近的样本）、
+        传输字节数和压缩率"""
+        with self.lock:
+            elapsed = sorted(sample['elapsed'] for sample in self.samples)
+            count, errors, total_time = self.count, self.errors, self.total_time
+            wire_bytes, body_bytes, decode_time, ui_decodes = (self.wire_bytes, self.body_bytes,
+                                                               self.decode_time, self.ui_decodes)
+        return {
+            'count': count,
+            'errors': errors,
+            'avg_ms': total_time / count * 1000 if count else 0,
+            'p50_ms': percentile(elapsed, 0.5) * 1000,
+            'p95_ms': percentile(elapsed, 0.95) * 1000,
+            'wire_bytes': wire_bytes,
+            'body_bytes': body_bytes,
+            'compression': wire_bytes / body_bytes if body_bytes else 1.0,
+            'decode_ms': decode_time / count * 1000 if count else 0,
+            'ui_decodes': ui_decodes,
+        }
+    
+    def describe(self):
+        summary = self.snapshot()
+        return (f"请求 {summary['count']} 次，失败 {summary['errors']}，平均 {summary['avg_ms']:.1f} ms，"
+                f"P50 {summary['p50_ms']:.1f} ms，P95 {summary['p95_ms']:.1f} ms，"
+                f"传输 {summary['wire_bytes'] / 1024:.0f} KB（解压后 {summary['body_bytes'] / 1024:.0f} KB），"
+                f"平均解码 {summary['decode_ms']:.2f} ms")
+
 
 # ==================== Cloudflare API ====================
 
+PROXIABLE_TYPES = ('A', 'AAAA', 'CNAME')  # 可以开启 Cloudflare 代理的记录类型
+
+
+class UncertainError(str):
+    """没有得到明确答复的错误（超时、连接中断、服务器错误等），写请求可能已经生效
+    
+    仍是普通的错误信息字符串，需要区分时用 isinstance 判断。
+    """
+
 class CloudflareAPI:
-    def __init__(self, api_token, account_id="", email="", auth_type="token"):
+    _rate_limiters = {}  # 凭据 -> RateLimiter，同一凭据的客户端共享限速
+    _rate_limiters_lock = threading.Lock()
+    mutation_listeners = []  # 写操作成功后的回调 listener(api, method, endpoint, data, result)
+    before_mutation_listeners = []  # 写请求发出前的回调 listener(api, method, endpoint, data)
+    records_listeners = []  # 获取到一页完整记录后的回调 listener(api, zone_id, records)
+    _accounts_cache = {}  # 凭据 -> (获取时间, 账号列表)
+    _accounts_cache_lock = threading.Lock()
+    
+    def __init__(self, api_token, account_id="", email="", auth_type="token", transport=None, json_codec=None):
         self.api_token = api_token
         self.account_id = account_id
         self.email = email
@@ -159,34 +803,116 @@ class CloudflareAPI:
                 "Authorization": f"Bearer {api_token}",
                 "Content-Type": "application/json"
             }
+        
+        # 客户端级缓存（由 AccountRegistry 复用，切换账号后再切回时仍然有效）
+        self.cache = {}
+        
+        # 进行中的 GET 请求，用于合并相同的并发请求
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced_requests = 0
+        
+        # 实际发出的 HTTP 请求数（含 429 重试），用于后台同步的请求预算
+        self.requests_sent = 0
+        self._stats_lock = threading.Lock()
+        
+        # HTTP 传输（复用连接，支持并发请求），默认使用配置中选择的传输
+        self.transport = create_transport(transport or config.transport, self.headers)
+        self.json_codec = json_codec or default_json_codec()
+        self.metrics = RequestMetrics()
+        
+        with CloudflareAPI._rate_limiters_lock:
+            key = (auth_type, email, api_token)
+            if key not in CloudflareAPI._rate_limiters:
+                CloudflareAPI._rate_limiters[key] = RateLimiter()
+            self.rate_limiter = CloudflareAPI._rate_limiters[key]
+    
+    def _request(self, method, endpoint, data=None, params=None, with_info=False):
+        """统一请求方法
+        
+        with_info 为 True 时返回 ((result, result_info), error)，用于获取分页信息。
+        并发的相同 GET 请求（同一端点和参数）会合并为一次 HTTP 调用，共享同一个结果，
+        因此调用方不应修改返回的数据。
+        """
+        if method != "GET":
+            return self._send(method, endpoint, data, params, with_info)
+        
+        key = (endpoint, tuple(sorted((params or {}).items())), with_info)
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._inflight[key] = {'event': threading.Event(), 'result': (None, "请求未完成")}
+            else:
+                self.coalesced_requests += 1
+        
+        if not is_leader:
+            call['event'].wait()
+            return call['result']
+        
+        try:
+            call['result'] = self._send(method, endpoint, data, params, with_info)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call['event'].set()
+        return call['result']
     
-    def _request(self, method, endpoint, data=None, params=None):
-        """统一请求方法"""
+    def _send(self, method, endpoint, data=None, params=None, with_info=False):
+        """发送单个 HTTP 请求并解析结果"""
         url = f"{self.base_url}{endpoint}"
+        if method not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            return None, "不支持的请求方法"
+        if method != "GET":
+            self._notify_before_mutation(method, endpoint, data)
         try:
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data, timeout=30)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data, timeout=30)
-            elif method == "PATCH":
-                response = requests.patch(url, headers=self.headers, json=data, timeout=30)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers, timeout=30)
-            else:
-                return None, "不支持的请求方法"
+            body = self.json_codec.dumps(data) if data is not None else None
+            # 被限速（429）时按 Retry-After 等待后重试
+            for attempt in range(3):
+                self.rate_limiter.acquire()
+                with self._stats_lock:
+                    self.requests_sent += 1
+                started = time.perf_counter()
+                try:
+                    response = self.transport.request(method, url, params=params, body=body)
+                except Exception:
+                    self.metrics.record(self.transport.name, method, endpoint, None, time.perf_counter() - started)
+                    raise
+                elapsed = time.perf_counter() - started
+                if response.status_code != 429 or attempt == 2:
+                    break
+                self.metrics.record(self.transport.name, method, endpoint, response.status_code, elapsed)
+                time.sleep(float(response.headers.get("Retry-After", 2 ** attempt)))
+            
+            # 在调用线程中解码；界面发起的请求经 BackgroundRunner / 任务队列在后台线程发出，
+            # 仍在界面线程解码的响应计入 ui_decodes
+            decode_started = time.perf_counter()
+            try:
+                result = self.json_codec.loads(response.content) if response.status_code < 500 else None
+            except ValueError:
+                result = None
+            decode_time = time.perf_counter() - decode_started
+            self.metrics.record(self.transport.name, method, endpoint, response.status_code, elapsed,
+                                self.transport.wire_size(response), len(response.content),
+                                response.headers.get("Content-Encoding", ""), decode_time)
             
             # 检查HTTP状态码
-            if response.status_code == 403:
+            if response.status_code == 429:
+                return None, "请求过于频繁，请稍后再试"
+            elif response.status_code == 403:
                 return None, "权限不足，请检查API Token权限"
             elif response.status_code == 401:
                 return None, "认证失败，请检查API Token是否正确"
             elif response.status_code >= 500:
-                return None, f"Cloudflare服务器错误 ({response.status_code})"
+                return None, UncertainError(f"Cloudflare服务器错误 ({response.status_code})")
             
-            result = response.json()
+            if not isinstance(result, dict):
+                return None, UncertainError(f"无法解析服务器响应 ({response.status_code})")
             if result.get('success'):
+                if method != "GET":
+                    self._notify_mutation(method, endpoint, data, result.get('result'))
+                if with_info:
+                    return (result.get('result'), result.get('result_info') or {}), None
                 return result.get('result'), None
             else:
                 errors = result.get('errors', [])
@@ -195,12 +921,53 @@ class CloudflareAPI:
                 if errors and errors[0].get('code'):
                     error_msg += f" (代码: {errors[0].get('code')})"
                 return None, error_msg
-        except requests.exceptions.Timeout:
-            return None, "请求超时，请检查网络连接"
-        except requests.exceptions.ConnectionError:
-            return None, "无法连接到Cloudflare，请检查网络"
+        except TimeoutError:
+            return None, UncertainError("请求超时，请检查网络连接")
+        except ConnectionError:
+            return None, UncertainError("无法连接到Cloudflare，请检查网络")
         except Exception as e:
-            return None, f"请求错误: {str(e)}"
+            return None, UncertainError(f"请求错误: {str(e)}")
+    
+    def close(self):
+        """关闭传输的连接"""
+        self.transport.close()
+    
+    @classmethod
+    def add_mutation_listener(cls, listener):
+        """注册写操作监听器（所有客户端共用）"""
+        cls.mutation_listeners.append(listener)
+    
+    @classmethod
+    def add_before_mutation_listener(cls, listener):
+        """注册写请求发出前的监听器（所有客户端共用），如用于保存修改前的状态"""
+        cls.before_mutation_listeners.append(listener)
+    
+    @classmethod
+    def add_records_listener(cls, listener):
+        """注册记录列表监听器（所有客户端共用），如用于保存记录的当前状态"""
+        cls.records_listeners.append(listener)
+    
+    def _notify_records(self, zone_id, records):
+        for listener in CloudflareAPI.records_listeners:
+            try:
+                listener(self, zone_id, records)
+            except Exception as e:
+                print(f"记录列表监听器出错: {e}")
+    
+    def _notify_before_mutation(self, method, endpoint, data):
+        for listener in CloudflareAPI.before_mutation_listeners:
+            try:
+                listener(self, method, endpoint, data)
+            except Exception as e:
+                print(f"写操作监听器出错: {e}")
+    
+    def _notify_mutation(self, method, endpoint, data, result):
+        """通知监听器，监听器的异常不影响请求结果"""
+        for listener in CloudflareAPI.mutation_listeners:
+            try:
+                listener(self, method, endpoint, data, result)
+            except Exception as e:
+                print(f"写操作监听器出错: {e}")
     
     def verify_token(self):
         """验证 API Token 或 Global API Key"""
@@ -212,14 +979,54 @@ class CloudflareAPI:
             result, error = self._request("GET", "/user/tokens/verify")
         return error is None
     
-    def get_accounts(self):
-        """获取账号列表"""
-        # 使用分页参数获取账号列表
-        params = {
-            "page": 1,
-            "per_page": 50
-        }
-        return self._request("GET", "/accounts", params=params)
+    def get_accounts(self, use_cache=True):
+        """获取账号列表（自动翻页）
+        
+        先取第一页得到总页数，其余页并发获取。结果按凭据缓存 ACCOUNTS_CACHE_TTL 秒，
+        use_cache 为 False 时强制重新获取。
+        """
+        key = (self.auth_type, self.email, self.api_token)
+        if use_cache:
+            with CloudflareAPI._accounts_cache_lock:
+                cached = CloudflareAPI._accounts_cache.get(key)
+            if cached and time.monotonic() - cached[0] < ACCOUNTS_CACHE_TTL:
+                return list(cached[1]), None
+        
+        per_page = 50
+        page_data, error = self._request("GET", "/accounts", params={"page": 1, "per_page": per_page}, with_info=True)
+        if error:
+            return None, error
+        
+        first_page, info = page_data
+        accounts = list(first_page or [])
+        total_pages = info.get('total_pages')
+        
+        if total_pages:
+            # 已知总页数，其余页并发获取，再按页码顺序合并
+            pages = {}
+            for page, result, error in run_concurrently(
+                    lambda page: self._request("GET", "/accounts", params={"page": page, "per_page": per_page}),
+                    range(2, total_pages + 1)):
+                if error:
+                    return None, error
+                pages[page] = result or []
+            for page in sorted(pages):
+                accounts.extend(pages[page])
+        else:
+            # 没有分页信息时逐页获取，直到某页不足 per_page 条
+            page = 1
+            last_count = len(first_page or [])
+            while last_count >= per_page:
+                page += 1
+                result, error = self._request("GET", "/accounts", params={"page": page, "per_page": per_page})
+                if error:
+                    return None, error
+                accounts.extend(result or [])
+                last_count = len(result or [])
+        
+        with CloudflareAPI._accounts_cache_lock:
+            CloudflareAPI._accounts_cache[key] = (time.monotonic(), accounts)
+        return list(accounts), None
     
     def add_zone(self, domain, account_id=None):
         """添加域名到Cloudflare"""
@@ -235,72 +1042,114 @@ class CloudflareAPI:
         
         return self._request("POST", "/zones", data)
     
-    def get_zones(self, account_id=None):
-        """获取所有域名（支持分页）"""
+    def iter_zones(self, account_id=None, cancel_event=None, status=None):
+        """逐页获取域名，每获取一页产出 (zones, None)
+        
+        出错时产出 (None, error) 后结束；cancel_event 被设置后产出 (None, "已取消")。
+        status 不为空时只获取该状态的域名（如 "pending"）。
+        """
         params = {
             "per_page": 50,  # 每页50条
             "page": 1
         }
         
+        if status:
+            params["status"] = status
+        
         if account_id:
             params["account.id"] = account_id
         elif self.account_id:
             params["account.id"] = self.account_id
         
-        all_zones = []
-        
         while True:
+            if cancel_event is not None and cancel_event.is_set():
+                yield None, "已取消"
+                return
+            
             zones, error = self._request("GET", "/zones", params=params)
             
             if error:
-                return None, error
+                yield None, error
+                return
             
             if not zones:
-                break
+                return
             
-            all_zones.extend(zones)
+            yield zones, None
             
             # 检查是否还有更多页
             # 如果返回的记录数少于per_page，说明已经是最后一页
             if len(zones) < params["per_page"]:
-                break
+                return
             
             params["page"] += 1
+    
+    def get_zones(self, account_id=None):
+        """获取所有域名（支持分页）"""
+        all_zones = []
+        
+        for zones, error in self.iter_zones(account_id):
+            if error:
+                return None, error
+            all_zones.extend(zones)
         
         return all_zones, None
     
+    def get_zone(self, zone_id):
+        """获取单个域名的详细信息"""
+        return self._request("GET", f"/zones/{zone_id}")
+    
     def get_zone_nameservers(self, zone_id):
         """获取域名的名称服务器"""
-        result, error = self._request("GET", f"/zones/{zone_id}")
+        result, error = self.get_zone(zone_id)
         if error:
             return None, error
         return result.get('name_servers', []), None
     
-    def list_dns_records(self, zone_id):
-        """列出DNS记录（支持分页）"""
+    def iter_dns_records(self, zone_id, cancel_event=None):
+        """逐页获取DNS记录，每获取一页产出 (records, None)
+        
+        出错时产出 (None, error) 后结束；cancel_event 被设置后产出 (None, "已取消")。
+        """
         params = {
             "per_page": 100,  # 每页100条
             "page": 1
         }
         
-        all_records = []
-        
         while True:
+            if cancel_event is not None and cancel_event.is_set():
+                yield None, "已取消"
+                return
+            
             records, error = self._request("GET", f"/zones/{zone_id}/dns_records", params=params)
             
             if error:
-                return None, error
+                yield None, error
+                return
             
             if not records:
-                break
+                return
             
-            all_records.extend(records)
+            self._notify_records(zone_id, records)
+            yield records, None
             
             # 检查是否还有更多页
             if len(records) < params["per_page"]:
-                break
+                return
             
             params["page"] += 1
+    
+    def list_dns_records(self, zone_id, cancel_event=None):
+        """列出DNS记录（支持分页）
+        
+        cancel_event 被设置后不再获取后续页，返回 (None, "已取消")。
+        """
+        all_records = []
+        
+        for records, error in self.iter_dns_records(zone_id, cancel_event):
+            if error:
+                return None, error
+            all_records.extend(records)
         
         return all_records, None
     
@@ -326,6 +1175,109 @@ class CloudflareAPI:
         }
         return self._request("PUT", f"/zones/{zone_id}/dns_records/{record_id}", data)
     
+    def patch_dns_record(self, zone_id, record_id, changes):
+        """部分更新DNS记录（只提交变化的字段）"""
+        return self._request("PATCH", f"/zones/{zone_id}/dns_records/{record_id}", changes)
+    
+    def batch_dns_records(self, zone_id, posts=None, patches=None, puts=None, deletes=None):
+        """批量提交DNS记录变更（单次请求，Cloudflare 按事务执行，任一失败则整体回滚）"""
+        data = {}
+        if deletes:
+            data["deletes"] = deletes
+        if patches:
+            data["patches"] = patches
+        if puts:
+            data["puts"] = puts
+        if posts:
+            data["posts"] = posts
+        return self._request("POST", f"/zones/{zone_id}/dns_records/batch", data)
+    
+    def apply_record_changes(self, zone_id, posts=(), patches=(), deletes=()):
+        """提交一组记录变更，posts 为完整记录，patches 为 {"id": record_id, 字段: 值}，deletes 为 {"id": record_id}
+        
+        按 BATCH_SIZE 分块走批量接口；某块被明确拒绝（事务整体回滚）时退回逐条并发请求
+        （按 删除 -> 修改 -> 新增 的顺序，与批量接口一致），以便定位具体失败的记录。
+        批量请求没有明确答复（超时等，可能已经生效）时先重新获取记录核对，只重发尚未生效的部分，
+        避免重复新增。返回 [(操作, 提交的数据, 结果, error), ...]，操作为 "deletes"/"patches"/"posts"。
+        """
+        operations = ([("deletes", item) for item in deletes] +
+                      [("patches", item) for item in patches] +
+                      [("posts", item) for item in posts])
+        outcome = []
+        
+        def send_one(operation):
+            kind, item = operation
+            if kind == "deletes":
+                return self.delete_dns_record(zone_id, item['id'])
+            if kind == "patches":
+                changes = {k: v for k, v in item.items() if k != 'id'}
+                return self.patch_dns_record(zone_id, item['id'], changes)
+            return self._request("POST", f"/zones/{zone_id}/dns_records", item)
+        
+        for chunk in chunked(operations, BATCH_SIZE):
+            grouped = {"deletes": [], "patches": [], "posts": []}
+            for kind, item in chunk:
+                grouped[kind].append(item)
+            
+            result, error = self.batch_dns_records(zone_id, **grouped)
+            if not error:
+                for kind in ("deletes", "patches", "posts"):
+                    returned = (result or {}).get(kind) or []
+                    for i, item in enumerate(grouped[kind]):
+                        outcome.append((kind, item, returned[i] if i < len(returned) else None, None))
+                continue
+            
+            if isinstance(error, UncertainError):
+                settled, error = self.reconcile_batch(zone_id, grouped)
+                if error:
+                    for kind in ("deletes", "patches", "posts"):
+                        for item in grouped[kind]:
+                            outcome.append((kind, item, None, f"批量请求结果未知且无法核对，未重发: {error}"))
+                    continue
+                outcome.extend(settled)
+            
+            for kind in ("deletes", "patches", "posts"):
+                for (_, item), result, error in run_concurrently(send_one, [(kind, item) for item in grouped[kind]]):
+                    outcome.append((kind, item, result, error))
+        return outcome
+    
+    def reconcile_batch(self, zone_id, grouped):
+        """批量请求结果未知时重新获取记录，判断哪些变更已经生效
+        
+        已删除的记录和已存在的新增记录（按 record_key 逐条匹配）视为已完成，从 grouped 中移除；
+        修改是幂等的，保留重发。返回 (已完成的 outcome 条目, error)。
+        """
+        current, error = self.list_dns_records(zone_id)
+        if error:
+            return None, error
+        
+        settled = []
+        existing_ids = {record['id'] for record in current}
+        remaining = []
+        for item in grouped["deletes"]:
+            if item['id'] in existing_ids:
+                remaining.append(item)
+            else:
+                settled.append(("deletes", item, None, None))
+        grouped["deletes"] = remaining
+        
+        available = {}  # record_key -> [当前记录, ...]，每条只能匹配一次新增
+        for record in current:
+            available.setdefault(record_key(record), []).append(record)
+        remaining = []
+        for item in grouped["posts"]:
+            matches = available.get(record_key(item))
+            if matches:
+                settled.append(("posts", item, matches.pop(), None))
+            else:
+                remaining.append(item)
+        grouped["posts"] = remaining
+        return settled, None
+    
+    def apply_record_patches(self, zone_id, patches):
+        """提交一组部分更新 [{"id": record_id, 字段: 值}, ...]，返回 {record_id: error}，error 为 None 表示成功"""
+        return {item['id']: error for _, item, _, error in self.apply_record_changes(zone_id, patches=patches)}
+    
     def delete_dns_record(self, zone_id, record_id):
         """删除DNS记录"""
         return self._request("DELETE", f"/zones/{zone_id}/dns_records/{record_id}")
@@ -339,9 +1291,9 @@ class CloudflareAPI:
         
         record_type = result.get('type')
         
-        # 只有A和AAAA记录支持代理
-        if record_type not in ['A', 'AAAA']:
-            return None, f"{record_type} 类型的记录不支持代理功能，只有 A 和 AAAA 记录可以使用代理"
+        # 只有 A、AAAA 和 CNAME 记录支持代理
+        if record_type not in PROXIABLE_TYPES:
+            return None, f"{record_type} 类型的记录不支持代理功能，只有 {'、'.join(PROXIABLE_TYPES)} 记录可以使用代理"
         
         # 如果要开启代理，TTL必须设为1（自动）
         ttl = 1 if proxied else result.get('ttl', 1)
@@ -360,25 +1312,2154 @@ class CloudflareAPI:
         
         return self._request("PATCH", f"/zones/{zone_id}/dns_records/{record_id}", data)
     
+    def check_activation(self, zone_id):
+        """触发 Cloudflare 立即检查域名的名称服务器是否已切换（激活检查）"""
+        return self._request("PUT", f"/zones/{zone_id}/activation_check")
+    
     def delete_zone(self, zone_id):
         """删除域名"""
         return self._request("DELETE", f"/zones/{zone_id}")
 
 
-# ==================== 对话框界面 ====================
+# ==================== 数据模型 ====================
 
-class AccountManageDialog:
-    """账号管理对话框"""
-    def __init__(self, parent):
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title("账号管理")
-        self.dialog.geometry("700x500")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
-        
-        self.setup_ui()
-        self.refresh_accounts()
-        
+class CompactModel:
+    """精简数据模型基类：使用 __slots__ 节省内存，并兼容字典式读取（get / []）"""
+    __slots__ = ()
+    
+    def get(self, key, default=None):
+        """兼容字典式访问"""
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+    
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Zone(CompactModel):
+    """域名的精简模型，只保留本工具用到的字段"""
+    __slots__ = ('id', 'name', 'status', 'name_servers')
+    
+    def __init__(self, id, name, status='', name_servers=()):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.name_servers = name_servers
+    
+    @classmethod
+    def from_api(cls, data):
+        """从 API 返回的字典创建，状态和名称服务器字符串做驻留以便共享"""
+        return cls(
+            data['id'],
+            data['name'],
+            sys.intern(data.get('status') or ''),
+            tuple(sys.intern(ns) for ns in data.get('name_servers') or ())
+        )
+    
+    def raw(self, api):
+        """按需获取完整的 API 数据（不在内存中保留），返回 (result, error)"""
+        return api._request("GET", f"/zones/{self.id}")
+
+
+class DnsRecord(CompactModel):
+    """DNS记录的精简模型，只保留本工具用到的字段"""
+    __slots__ = ('id', 'zone_id', 'type', 'name', 'content', 'proxied', 'ttl', 'priority', 'data')
+    
+    def __init__(self, id, zone_id, type, name, content, proxied=False, ttl=1, priority=None, data=None):
+        self.id = id
+        self.zone_id = zone_id
+        self.type = type
+        self.name = name
+        self.content = content
+        self.proxied = proxied
+        self.ttl = ttl
+        self.priority = priority
+        self.data = data
+    
+    @classmethod
+    def from_api(cls, data, zone_id):
+        """从 API 返回的字典创建，zone_id 由调用方传入以便同一域名的记录共享同一字符串"""
+        return cls(
+            data['id'],
+            zone_id,
+            sys.intern(data.get('type') or ''),
+            data.get('name'),
+            data.get('content'),
+            bool(data.get('proxied')),
+            data.get('ttl', 1),
+            data.get('priority'),
+            data.get('data')
+        )
+    
+    def raw(self, api):
+        """按需获取完整的 API 数据（不在内存中保留），返回 (result, error)"""
+        return api._request("GET", f"/zones/{self.zone_id}/dns_records/{self.id}")
+
+
+class RecordListModel:
+    """DNS记录列表的数据模型：保存当前域名的全部记录，筛选和排序都在模型上计算，
+    界面只渲染 view 中可见的一段（记录数上万时 Treeview 中也只有几十行）
+    """
+    SORT_KEYS = {
+        'type': lambda record: record.type,
+        'name': lambda record: (record.name or '').lower(),
+        'content': lambda record: (record.content or '').lower(),
+        'proxy': lambda record: record.proxied,
+        'ttl': lambda record: record.ttl if isinstance(record.ttl, int) else 0,
+    }
+
+    def __init__(self):
+        self.records = {}  # record_id -> DnsRecord，按 API 返回顺序
+        self.view = []  # 筛选并排序后的 record_id 列表
+        self.selection = set()  # 选中的 record_id（包括滚动出可见区域的）
+        self.filter_type = ''
+        self.filter_name = ''
+        self.filter_content = ''
+        self.filter_proxied = None  # None 不限 / True / False
+        self.sort_column = None
+        self.sort_reverse = False
+
+    def __len__(self):
+        return len(self.records)
+
+    def clear(self):
+        """清空记录和选中项"""
+        self.records.clear()
+        self.view = []
+        self.selection.clear()
+
+    def set_records(self, records):
+        """替换全部记录（保留仍存在的选中项），重新计算 view"""
+        self.records.clear()
+        for record in records:
+            self.records[record.id] = record
+        self.refresh()
+
+    def set_filters(self, record_type='', name='', content='', proxied=None):
+        """设置筛选条件并重新计算 view，名称和内容为不区分大小写的子串匹配"""
+        self.filter_type = record_type
+        self.filter_name = name.strip().lower()
+        self.filter_content = content.strip().lower()
+        self.filter_proxied = proxied
+        self.refresh()
+
+    def is_filtered(self):
+        """是否设置了任一筛选条件"""
+        return bool(self.filter_type or self.filter_name or self.filter_content
+                    or self.filter_proxied is not None)
+
+    def matches(self, record):
+        """判断记录是否符合当前筛选条件"""
+        if self.filter_type and record.type != self.filter_type:
+            return False
+        if self.filter_proxied is not None and record.proxied != self.filter_proxied:
+            return False
+        if self.filter_name and self.filter_name not in (record.name or '').lower():
+            return False
+        if self.filter_content and self.filter_content not in (record.content or '').lower():
+            return False
+        return True
+
+    def sort_by(self, column):
+        """按列排序，再次点击同一列反转顺序"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self.refresh()
+
+    def refresh(self):
+        """按当前筛选条件和排序重新计算 view"""
+        if self.is_filtered():
+            records = [record for record in self.records.values() if self.matches(record)]
+        else:
+            records = list(self.records.values())
+
+        if self.sort_column in self.SORT_KEYS:
+            # 排序稳定，相同键保持 API 返回顺序
+            records.sort(key=self.SORT_KEYS[self.sort_column], reverse=self.sort_reverse)
+
+        self.view = [record.id for record in records]
+        # 被筛选隐藏的记录不再保持选中，避免批量操作作用到看不见的记录
+        if self.selection:
+            self.selection &= set(self.view)
+
+    def apply_changes(self, deleted, records):
+        """应用写操作返回的增量：删除记录，替换或追加记录（修改过的记录保持原位置），重新计算 view"""
+        for record_id in deleted:
+            self.records.pop(record_id, None)
+            self.selection.discard(record_id)
+        for record in records:
+            self.records[record.id] = record
+        self.refresh()
+
+    def restore(self, record, position=None):
+        """把已删除的记录放回原来的位置（position 为其在 records 中的序号），重新计算 view"""
+        items = list(self.records.items())
+        if position is None or position > len(items):
+            position = len(items)
+        items.insert(position, (record.id, record))
+        # 原地更新，保持外部持有的 records 引用有效
+        self.records.clear()
+        self.records.update(items)
+        self.refresh()
+
+    def types(self):
+        """当前记录中出现的记录类型（用于类型筛选下拉框）"""
+        return sorted({record.type for record in self.records.values()})
+
+    def selected_ids(self):
+        """选中的 record_id，按当前显示顺序排列"""
+        if not self.selection:
+            return []
+        return [record_id for record_id in self.view if record_id in self.selection]
+
+
+def sample_zone_payload(i):
+    """生成与 Cloudflare /zones 返回结构一致的示例数据（用于内存基准）"""
+    return {
+        "id": f"{i:032x}",
+        "name": f"example-{i}.com",
+        "status": "active" if i % 10 else "pending",
+        "paused": False,
+        "type": "full",
+        "development_mode": 0,
+        "name_servers": ["ada.ns.cloudflare.com", "bob.ns.cloudflare.com"],
+        "original_name_servers": ["ns1.registrar.example", "ns2.registrar.example"],
+        "original_registrar": "example registrar",
+        "original_dnshost": None,
+        "modified_on": "2025-01-01T00:00:00.000000Z",
+        "created_on": "2024-01-01T00:00:00.000000Z",
+        "activated_on": "2024-01-02T00:00:00.000000Z",
+        "meta": {"step": 2, "custom_certificate_quota": 0, "page_rule_quota": 3,
+                 "phishing_detected": False, "multiple_railguns_allowed": False},
+        "owner": {"id": None, "type": "user", "email": None},
+        "account": {"id": "0123456789abcdef0123456789abcdef", "name": "Example Account"},
+        "tenant": {"id": None, "name": None},
+        "tenant_unit": {"id": None},
+        "permissions": ["#dns_records:edit", "#dns_records:read", "#zone:read", "#zone:edit"],
+        "plan": {"id": "0feeeeeeeeeeeeeeeeeeeeeeeeeeeeee", "name": "Free Website", "price": 0,
+                 "currency": "USD", "frequency": "", "is_subscribed": False, "can_subscribe": False,
+                 "legacy_id": "free", "legacy_discount": False, "externally_managed": False}
+    }
+
+
+def run_memory_benchmark(zone_count=100000):
+    """命令行：对比原始 JSON 字典与精简模型保存 zone_count 个域名的内存占用"""
+    import tracemalloc
+    
+    payload = json.dumps([sample_zone_payload(i) for i in range(zone_count)])
+    
+    def measure(build):
+        tracemalloc.start()
+        data = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        return current
+    
+    def build_dicts():
+        return {zone['id']: zone for zone in json.loads(payload)}
+    
+    def build_models():
+        zones = {}
+        for zone in json.loads(payload):
+            model = Zone.from_api(zone)
+            zones[model.id] = model
+        return zones
+    
+    dict_bytes = measure(build_dicts)
+    model_bytes = measure(build_models)
+    
+    print(f"域名数: {zone_count}")
+    print(f"原始 JSON 字典: {dict_bytes / 1024 / 1024:.1f} MB ({dict_bytes / zone_count:.0f} 字节/域名)")
+    print(f"精简模型 Zone:  {model_bytes / 1024 / 1024:.1f} MB ({model_bytes / zone_count:.0f} 字节/域名)")
+    print(f"减少: {(1 - model_bytes / dict_bytes) * 100:.1f}%")
+    return 0
+
+
+def start_benchmark_server(latency=0.02, per_page=50):
+    """启动本地模拟 API（HTTP/1.1），/zones 按页返回示例域名，每个请求延迟 latency 秒模拟网络往返
+    
+    客户端接受时按 gzip 或 deflate 压缩响应。返回 (server, base_url, stats)，
+    stats['connections'] 为服务器接受的连接数。
+    """
+    import gzip
+    import socket
+    import zlib
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import urlparse, parse_qs
+    
+    stats = {'connections': 0}
+    stats_lock = threading.Lock()
+    # 每页内容相同，只生成一次，避免服务器端序列化影响测量
+    result = json.dumps([sample_zone_payload(i) for i in range(per_page)])
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def setup(self):
+            super().setup()
+            # 响应头和正文分两次写出，关闭 Nagle 算法避免与延迟确认叠加出约 40ms 的额外延迟
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with stats_lock:
+                stats['connections'] += 1
+        
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get('page', ['1'])[0])
+            body = (f'{{"success": true, "errors": [], "messages": [], "result": {result}, '
+                    f'"result_info": {{"page": {page}, "per_page": {per_page}}}}}').encode()
+            accepted = self.headers.get("Accept-Encoding", "")
+            encoding = None
+            if "gzip" in accepted:
+                encoding, body = "gzip", gzip.compress(body, compresslevel=5)
+            elif "deflate" in accepted:
+                encoding, body = "deflate", zlib.compress(body, 5)
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/client/v4", stats
+
+
+def run_transport_benchmark(url=None, requests_per_level=200, levels=(1, 4, 8, 16, 32), latency=0.02):
+    """命令行：对比各传输在不同并发数下翻页请求的吞吐量和延迟
+    
+    未指定 url 时使用本地模拟 API（只支持 HTTP/1.1，HTTP/2 传输会协商回 HTTP/1.1，
+    要比较多路复用需指定支持 HTTP/2 的 HTTPS 地址）。不受限速器限制。
+    """
+    server = stats = None
+    if not url:
+        server, url, stats = start_benchmark_server(latency)
+    
+    print(f"目标: {url}，每个并发级别 {requests_per_level} 个请求，JSON 解码: {default_json_codec().name}")
+    print(f"{'传输':<6} {'并发':>4} {'用时(s)':>8} {'请求/s':>8} {'P50(ms)':>8} {'P95(ms)':>8} "
+          f"{'解码(ms)':>8} {'KB/请求':>8} {'压缩率':>6} {'失败':>4} {'新连接':>6}")
+    try:
+        for name in available_transports():
+            for level in levels:
+                api = CloudflareAPI("benchmark", transport=name)
+                api.base_url = url
+                api.rate_limiter = RateLimiter(rate=1e6, burst=10 ** 6, reserve=0)
+                connections_before = stats['connections'] if stats else 0
+                
+                started = time.perf_counter()
+                fetch = lambda page: api._request("GET", "/zones", params={'page': page, 'per_page': 50})
+                for _ in run_concurrently(fetch, range(1, requests_per_level + 1), max_workers=level):
+                    pass
+                elapsed = time.perf_counter() - started
+                api.close()
+                
+                summary = api.metrics.snapshot()
+                connections = stats['connections'] - connections_before if stats else "-"
+                print(f"{name:<6} {level:>4} {elapsed:>8.2f} {summary['count'] / elapsed:>8.1f} "
+                      f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} {summary['decode_ms']:>8.2f} "
+                      f"{summary['wire_bytes'] / max(1, summary['count']) / 1024:>8.1f} "
+                      f"{summary['compression']:>6.0%} {summary['errors']:>4} {connections:>6}")
+        if Http2Transport.name not in available_transports():
+            print("未安装 httpx[http2]，跳过 HTTP/2 传输")
+    finally:
+        if server:
+            server.shutdown()
+    
+    run_json_benchmark()
+    return 0
+
+
+def run_json_benchmark(zone_count=5000, rounds=5):
+    """对比各 JSON 编解码解码一个 zone_count 个域名的列表响应的耗时"""
+    payload = json.dumps({'success': True, 'result': [sample_zone_payload(i) for i in range(zone_count)]}).encode()
+    print(f"\n解码 {zone_count} 个域名的响应 ({len(payload) / 1024 / 1024:.1f} MB)，取 {rounds} 次中最快的一次:")
+    for name in available_json_codecs():
+        codec = JSON_CODECS[name]
+        best = min(timed(codec.loads, payload) for _ in range(rounds))
+        print(f"  {name:<7} {best * 1000:>8.1f} ms")
+    if OrjsonCodec.name not in available_json_codecs():
+        print("  未安装 orjson，只测量了标准库")
+
+
+def timed(func, *args):
+    """执行 func(*args)，返回耗时（秒）"""
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+# ==================== 账号注册表 ====================
+
+def credential_key(account):
+    """账号配置的凭据标识，相同凭据共用一个 API 客户端"""
+    return (
+        account.get('auth_type', 'token'),
+        account.get('email', ''),
+        account.get('api_token', ''),
+        account.get('account_id', '')
+    )
+
+
+class AccountRegistry:
+    """账号注册表：按名称和 Cloudflare Account ID 索引已配置的账号，
+    并为每个凭据缓存一个复用连接池的 API 客户端（线程安全）"""
+    def __init__(self, config):
+        self.config = config
+        self.by_name = {}        # 账号名称 -> 配置索引
+        self.by_account_id = {}  # Cloudflare Account ID -> 配置索引
+        self.clients = {}        # 凭据 -> CloudflareAPI
+        self.lock = threading.Lock()
+        self.rebuild()
+    
+    def rebuild(self):
+        """配置变化后重建索引，并关闭已不再使用的客户端"""
+        with self.lock:
+            self.by_name = {}
+            self.by_account_id = {}
+            for i, account in enumerate(self.config.accounts):
+                self.by_name.setdefault(account.get('name'), i)
+                if account.get('account_id'):
+                    self.by_account_id.setdefault(account['account_id'], i)
+            
+            keys = {credential_key(account) for account in self.config.accounts}
+            for key in list(self.clients):
+                if key not in keys:
+                    self.clients.pop(key).close()
+    
+    def register_account_ids(self, account, account_ids):
+        """记录某个配置账号可访问的 Cloudflare Account ID（来自 /accounts）"""
+        with self.lock:
+            index = self.by_name.get(account.get('name'))
+            if index is None:
+                return
+            for account_id in account_ids:
+                if account_id:
+                    self.by_account_id.setdefault(account_id, index)
+    
+    def find(self, key):
+        """按账号名称或 Account ID 查找配置索引，找不到返回 None"""
+        with self.lock:
+            if key in self.by_name:
+                return self.by_name[key]
+            return self.by_account_id.get(key)
+    
+    def get_client(self, account):
+        """获取账号对应的 API 客户端，同一凭据复用同一个客户端"""
+        key = credential_key(account)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = CloudflareAPI(
+                    account['api_token'],
+                    account.get('account_id', ''),
+                    account.get('email', ''),
+                    account.get('auth_type', 'token')
+                )
+                self.clients[key] = client
+            return client
+
+
+# 全局账号注册表
+registry = AccountRegistry(config)
+
+
+# ==================== 批量抓取 ====================
+
+def crawl_zones(accounts, max_workers=MAX_WORKERS):
+    """并发获取多个账号的域名列表，按完成顺序产出 (account, api, zones, error)"""
+    def fetch_zones(account):
+        api = registry.get_client(account)
+        zone_list, error = api.get_zones()
+        return (api, zone_list), error
+    
+    for account, result, error in run_concurrently(fetch_zones, accounts, max_workers):
+        api, zone_list = result if result else (None, None)
+        yield account, api, zone_list, error
+
+
+def crawl_records(accounts, max_workers=MAX_WORKERS, cancel_event=None):
+    """并发抓取多个账号下全部域名的DNS记录
+    
+    先并发获取各账号的域名列表（按 zone_id 去重），再并发获取各域名的记录。
+    按完成顺序产出 (account, api, zone, records, error)；
+    获取域名列表失败时 zone 为 None。cancel_event 被设置后尚未开始的域名返回 "已取消"。
+    """
+    zones = {}  # zone_id -> (account, api, zone)
+    for account, api, zone_list, error in crawl_zones(accounts, max_workers):
+        if error:
+            yield account, None, None, None, error
+            continue
+        for zone in zone_list or []:
+            zones.setdefault(zone['id'], (account, api, zone))
+    
+    def fetch_records(zone_id):
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "已取消"
+        api = zones[zone_id][1]
+        return api.list_dns_records(zone_id, cancel_event=cancel_event)
+    
+    for zone_id, records, error in run_concurrently(fetch_records, list(zones), max_workers):
+        account, api, zone = zones[zone_id]
+        yield account, api, zone, records, error
+
+
+def watch_activation(api, zone_ids, report, cancel_event, account_id=None, max_workers=MAX_WORKERS):
+    """并发触发 pending 域名的激活检查，然后轮询直到全部离开 pending 状态
+    
+    每轮只分页获取一次 status=pending 的域名列表，不再出现在列表中的域名才单独
+    查询实际状态。有域名状态变化时恢复最短间隔，否则间隔逐次翻倍（自适应退避）。
+    report(zone_id, status, error) 在工作线程中调用：触发检查后 status 为 None，
+    状态变化后为新状态。cancel_event 被设置后停止，返回仍为 pending 的 zone_id 集合。
+    """
+    pending = set(zone_ids)
+    
+    for zone_id, _, error in run_concurrently(api.check_activation, list(pending), max_workers):
+        report(zone_id, None, error)
+        if cancel_event.is_set():
+            return pending
+    
+    delay = ACTIVATION_POLL_MIN
+    while pending and not cancel_event.wait(delay):
+        still_pending = set()
+        error = None
+        for zones, error in api.iter_zones(account_id, cancel_event, status="pending"):
+            if error:
+                break
+            still_pending.update(zone['id'] for zone in zones)
+        
+        if error:
+            delay = min(delay * 2, ACTIVATION_POLL_MAX)
+            continue
+        
+        changed = False
+        for zone_id, zone, error in run_concurrently(api.get_zone, list(pending - still_pending), max_workers):
+            if error:
+                # 域名已被删除等情况，不再跟踪
+                pending.discard(zone_id)
+                report(zone_id, None, error)
+            elif zone.get('status') != 'pending':
+                pending.discard(zone_id)
+                report(zone_id, zone.get('status'), None)
+                changed = True
+        
+        delay = ACTIVATION_POLL_MIN if changed else min(delay * 2, ACTIVATION_POLL_MAX)
+    
+    return pending
+
+
+# ==================== 记录反向索引 ====================
+
+INDEXED_TYPES = ('A', 'AAAA', 'CNAME', 'MX', 'NS', 'PTR', 'SRV', 'TXT')
+SPF_MECHANISMS = ('ip4:', 'ip6:', 'include:', 'a:', 'mx:')
+
+DNS_RECORD_ENDPOINT = re.compile(r"^/zones/(\w+)/dns_records(?:/(batch|\w+))?$")
+ZONE_ENDPOINT = re.compile(r"^/zones/(\w+)$")
+
+
+def record_mutation(method, endpoint, result):
+    """从写操作的接口返回中解析记录增量，返回 (zone_id, 删除的 record_id 列表, 新增或修改后的记录字典列表)，
+    不是记录写操作时返回 None"""
+    match = DNS_RECORD_ENDPOINT.match(endpoint)
+    if not match:
+        return None
+    zone_id, target = match.groups()
+    if target == 'batch':
+        result = result or {}
+        deleted = [item['id'] for item in result.get('deletes') or []]
+        upserted = [item for kind in ('patches', 'puts', 'posts') for item in result.get(kind) or []]
+    elif method == "DELETE":
+        deleted, upserted = [target], []
+    else:
+        deleted, upserted = [], [result] if isinstance(result, dict) and result.get('id') else []
+    return zone_id, deleted, upserted
+
+
+def normalize_target(value):
+    """规范化记录指向的目标：IP 转为标准写法，主机名转小写并去掉末尾的点"""
+    value = value.strip()
+    try:
+        return ipaddress.ip_address(value).compressed
+    except ValueError:
+        pass
+    try:
+        # SPF 中的 ip4/ip6 可能带网段
+        return ipaddress.ip_network(value, strict=False).compressed
+    except ValueError:
+        return value.lower().rstrip('.')
+
+
+def record_targets(record_type, content):
+    """提取记录指向的目标（IP、CNAME 目标、MX 主机、SPF 中的地址等）"""
+    if not content or record_type not in INDEXED_TYPES:
+        return set()
+    if record_type == 'SRV':
+        # SRV 内容格式: "权重 端口 目标"
+        return {normalize_target(content.split()[-1])}
+    if record_type == 'TXT':
+        text = content.strip('"')
+        if not text.startswith('v=spf1'):
+            return set()
+        targets = set()
+        for term in text.split():
+            term = term.lstrip('+-~?')
+            for mechanism in SPF_MECHANISMS:
+                if term.startswith(mechanism):
+                    targets.add(normalize_target(term[len(mechanism):]))
+        return targets
+    return {normalize_target(content)}
+
+
+class RecordIndex:
+    """记录内容 -> 记录位置 的倒排索引（线程安全）
+    
+    由并发抓取建立，并通过 CloudflareAPI 的写操作监听器随本工具的修改同步更新。
+    """
+    def __init__(self):
+        self.by_target = {}     # target -> {record_id, ...}
+        self.records = {}       # record_id -> (zone_id, type, name, content, targets)
+        self.zone_records = {}  # zone_id -> {record_id, ...}
+        self.zones = {}         # zone_id -> (account_name, zone_name)
+        self.built_at = None
+        self.lock = threading.Lock()
+    
+    def _add(self, zone_id, record):
+        record_id = record['id']
+        self._remove(record_id)
+        record_type = sys.intern(record.get('type') or '')
+        targets = record_targets(record_type, record.get('content'))
+        self.records[record_id] = (zone_id, record_type, record.get('name'), record.get('content'), targets)
+        self.zone_records.setdefault(zone_id, set()).add(record_id)
+        for target in targets:
+            self.by_target.setdefault(target, set()).add(record_id)
+    
+    def _remove(self, record_id):
+        entry = self.records.pop(record_id, None)
+        if not entry:
+            return
+        zone_id, _, _, _, targets = entry
+        self.zone_records.get(zone_id, set()).discard(record_id)
+        for target in targets:
+            ids = self.by_target.get(target)
+            if ids:
+                ids.discard(record_id)
+                if not ids:
+                    del self.by_target[target]
+    
+    def update_zone(self, zone_id, records, account_name=None, zone_name=None):
+        """用完整的记录列表替换某个域名的索引"""
+        with self.lock:
+            if account_name is not None or zone_id not in self.zones:
+                self.zones[zone_id] = (account_name or '', zone_name or zone_id)
+            for record_id in list(self.zone_records.get(zone_id, ())):
+                self._remove(record_id)
+            for record in records:
+                self._add(zone_id, record)
+    
+    def remove_zone(self, zone_id):
+        """移除某个域名的全部索引"""
+        with self.lock:
+            for record_id in list(self.zone_records.pop(zone_id, ())):
+                self._remove(record_id)
+            self.zones.pop(zone_id, None)
+    
+    def lookup(self, query):
+        """查找指向 query 的所有记录"""
+        with self.lock:
+            results = []
+            for record_id in self.by_target.get(normalize_target(query), ()):
+                zone_id, record_type, name, content, _ = self.records[record_id]
+                account_name, zone_name = self.zones.get(zone_id, ('', zone_id))
+                results.append({
+                    'account': account_name,
+                    'zone_id': zone_id,
+                    'zone': zone_name,
+                    'record_id': record_id,
+                    'type': record_type,
+                    'name': name,
+                    'content': content
+                })
+        results.sort(key=lambda r: (r['account'], r['zone'], r['name'] or ''))
+        return results
+    
+    def stats(self):
+        """返回 (域名数, 记录数, 目标数)"""
+        with self.lock:
+            return len(self.zone_records), len(self.records), len(self.by_target)
+    
+    def on_mutation(self, api, method, endpoint, data, result):
+        """写操作监听器：根据接口返回的记录增量更新索引"""
+        match = ZONE_ENDPOINT.match(endpoint)
+        if match and method == "DELETE":
+            self.remove_zone(match.group(1))
+            return
+        
+        match = DNS_RECORD_ENDPOINT.match(endpoint)
+        if not match or not isinstance(result, dict):
+            return
+        zone_id, suffix = match.groups()
+        
+        with self.lock:
+            if suffix == "batch":
+                for record in result.get('deletes') or []:
+                    self._remove(record['id'])
+                for key in ('patches', 'puts', 'posts'):
+                    for record in result.get(key) or []:
+                        self._add(zone_id, record)
+            elif method == "DELETE":
+                self._remove(suffix)
+            elif isinstance(result, dict) and result.get('id'):
+                self._add(zone_id, result)
+
+
+# 全局反向索引实例
+record_index = RecordIndex()
+CloudflareAPI.add_mutation_listener(record_index.on_mutation)
+
+
+# ==================== 记录缓存 ====================
+
+def merge_record_changes(zone_id, records, deleted, upserted):
+    """返回应用增量后的新记录列表（DnsRecord），不修改传入的列表"""
+    if not deleted and not upserted:
+        return records
+    changed = {}
+    for data in upserted:
+        record = DnsRecord.from_api(data, zone_id)
+        changed[record.id] = record
+    removed = set(deleted)
+    result = []
+    for record in records:
+        if record.id in removed:
+            continue
+        result.append(changed.pop(record.id, record))
+    result.extend(changed.values())
+    return result
+
+
+class RecordCache:
+    """按域名缓存DNS记录列表的 LRU 缓存（线程安全）
+    
+    同时限制缓存的域名数和记录总数（近似内存上限），超出时淘汰最久未使用的域名。
+    通过写操作监听器在本工具修改记录后使对应域名失效。
+    """
+    def __init__(self, max_zones=RECORD_CACHE_ZONES, max_records=RECORD_CACHE_RECORDS):
+        self.max_zones = max_zones
+        self.max_records = max_records
+        self.entries = OrderedDict()  # zone_id -> (获取时间, records)
+        self.record_count = 0
+        self.lock = threading.Lock()
+    
+    def get(self, zone_id):
+        """返回缓存的记录列表，未命中返回 None"""
+        with self.lock:
+            entry = self.entries.get(zone_id)
+            if entry is None:
+                return None
+            self.entries.move_to_end(zone_id)
+            return entry[1]
+    
+    def contains(self, zone_id):
+        with self.lock:
+            return zone_id in self.entries
+    
+    def put(self, zone_id, records):
+        with self.lock:
+            self._discard(zone_id)
+            self.entries[zone_id] = (time.time(), records)
+            self.record_count += len(records)
+            while self.entries and (len(self.entries) > self.max_zones or self.record_count > self.max_records):
+                self._discard(next(iter(self.entries)))
+    
+    def invalidate(self, zone_id):
+        with self.lock:
+            self._discard(zone_id)
+    
+    def _discard(self, zone_id):
+        entry = self.entries.pop(zone_id, None)
+        if entry:
+            self.record_count -= len(entry[1])
+    
+    def apply(self, zone_id, deleted, upserted):
+        """把写操作返回的记录增量应用到已缓存的域名（未缓存时忽略），
+        修改过的记录保持原来的位置，新记录追加在末尾"""
+        with self.lock:
+            entry = self.entries.get(zone_id)
+            if entry is None:
+                return
+            records = merge_record_changes(zone_id, entry[1], deleted, upserted)
+            self.entries[zone_id] = (entry[0], records)
+            self.record_count += len(records) - len(entry[1])
+    
+    def on_mutation(self, api, method, endpoint, data, result):
+        """写操作监听器：记录被修改后按返回的增量更新缓存，域名被修改或删除后使其失效"""
+        mutation = record_mutation(method, endpoint, result)
+        if mutation:
+            self.apply(*mutation)
+            return
+        match = ZONE_ENDPOINT.match(endpoint)
+        if match:
+            self.invalidate(match.group(1))
+
+
+# 全局记录缓存实例
+record_cache = RecordCache()
+CloudflareAPI.add_mutation_listener(record_cache.on_mutation)
+
+
+# ==================== 本地缓存与后台同步 ====================
+
+CACHE_FILE = "cache.db"
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS credentials (
+    credential TEXT PRIMARY KEY,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS zones (
+    credential TEXT,
+    id TEXT,
+    account_id TEXT,
+    account_name TEXT,
+    name TEXT,
+    status TEXT,
+    name_servers TEXT,
+    PRIMARY KEY (credential, id)
+);
+CREATE TABLE IF NOT EXISTS zone_sync (
+    zone_id TEXT PRIMARY KEY,
+    records_synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    zone_id TEXT,
+    type TEXT,
+    name TEXT,
+    content TEXT,
+    proxied INTEGER,
+    ttl INTEGER,
+    priority INTEGER,
+    comment TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS records_zone ON records(zone_id);
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL,
+    finished_at REAL,
+    requests INTEGER,
+    zones INTEGER,
+    skipped INTEGER,
+    errors TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_changes (
+    run_id INTEGER,
+    zone_id TEXT,
+    zone_name TEXT,
+    kind TEXT,
+    record_type TEXT,
+    name TEXT,
+    detail TEXT
+);
+"""
+
+RECORD_COLUMNS = ('id', 'zone_id', 'type', 'name', 'content', 'proxied', 'ttl', 'priority', 'comment', 'data')
+RECORD_UPSERT = (f"INSERT OR REPLACE INTO records ({', '.join(RECORD_COLUMNS)}) "
+                 f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))})")
+
+# 全文索引（FTS5，外部内容表，由触发器随 records 增量更新）。
+# trigram 分词支持任意片段（≥3 个字符）匹配，旧版 SQLite 不支持时退回默认分词（按词前缀匹配）
+CACHE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE records_fts USING fts5(
+    name, content, type, comment, content='records', tokenize='{tokenizer}'
+);
+CREATE TRIGGER records_fts_insert AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts(rowid, name, content, type, comment)
+    VALUES (new.rowid, new.name, new.content, new.type, new.comment);
+END;
+CREATE TRIGGER records_fts_delete AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, name, content, type, comment)
+    VALUES ('delete', old.rowid, old.name, old.content, old.type, old.comment);
+END;
+CREATE TRIGGER records_fts_update AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, name, content, type, comment)
+    VALUES ('delete', old.rowid, old.name, old.content, old.type, old.comment);
+    INSERT INTO records_fts(rowid, name, content, type, comment)
+    VALUES (new.rowid, new.name, new.content, new.type, new.comment);
+END;
+INSERT INTO records_fts(records_fts) VALUES ('rebuild');
+"""
+SEARCH_LIMIT = 500  # 全文搜索最多返回的结果数
+
+
+def record_row(zone_id, record):
+    """API 返回的记录转为 records 表的一行"""
+    return (record['id'], zone_id, record.get('type'), record.get('name'), record.get('content'),
+            int(bool(record.get('proxied'))), record.get('ttl', 1), record.get('priority'),
+            record.get('comment'), json.dumps(record['data']) if record.get('data') else None)
+
+
+def credential_id(account):
+    """凭据的短标识（哈希），本地缓存中不保存 Token 本身"""
+    return hashlib.sha256(json.dumps(credential_key(account)).encode('utf-8')).hexdigest()[:16]
+
+
+class LocalCache:
+    """本地持久缓存（SQLite），保存后台同步得到的域名和DNS记录
+    
+    界面在内存缓存未命中时先读本地缓存，同步时间在 LOCAL_CACHE_MAX_AGE 内的
+    直接使用，不再请求 API。本工具对记录的修改会直接写入缓存。
+    记录另有全文索引（records_fts）供 search 使用。
+    文件在第一次同步时才创建；从未同步过时所有读取都返回 None。
+    """
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.conn = None
+        self.lock = threading.RLock()
+        self.fts_tokenizer = None  # 全文索引使用的分词器，不支持 FTS5 时为 None
+    
+    def _db(self, create=True):
+        """打开数据库（线程间共用一个连接，由 self.lock 串行化）"""
+        if self.conn is None:
+            if not create and not os.path.exists(self.path):
+                return None
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            # INSERT OR REPLACE 替换旧行时也要触发删除触发器，全文索引才不会残留旧内容
+            self.conn.execute("PRAGMA recursive_triggers = ON")
+            self.conn.executescript(CACHE_SCHEMA)
+            self._ensure_fts()
+        return self.conn
+    
+    def _ensure_fts(self):
+        """创建全文索引（已有记录时一次性重建），之后由触发器增量维护"""
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'records_fts'").fetchone()
+        if row:
+            self.fts_tokenizer = 'trigram' if 'trigram' in row[0] else 'unicode61'
+            return
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.conn.executescript(CACHE_FTS_SCHEMA.format(tokenizer=tokenizer))
+                self.fts_tokenizer = tokenizer
+                return
+            except sqlite3.OperationalError:
+                self.conn.rollback()
+    
+    def search(self, query, limit=SEARCH_LIMIT):
+        """在本地缓存的全部记录中搜索（名称、内容、类型、备注），多个词之间为"与"
+        
+        返回按相关度排序的 [{'zone_id', 'id', 'account', 'zone', 'type', 'name', 'content', 'comment'}, ...]。
+        trigram 分词下少于 3 个字符的词无法走索引，此时退回逐行匹配。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        columns = ("r.zone_id, r.id, "
+                   "(SELECT account_name FROM zones WHERE zones.id = r.zone_id LIMIT 1), "
+                   "(SELECT name FROM zones WHERE zones.id = r.zone_id LIMIT 1), "
+                   "r.type, r.name, r.content, r.comment")
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return []
+            
+            if self.fts_tokenizer == 'trigram' and min(len(term) for term in terms) >= 3:
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            elif self.fts_tokenizer == 'unicode61':
+                match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+            else:
+                match = None
+            
+            if match:
+                rows = db.execute(f"SELECT {columns} FROM records_fts JOIN records r ON r.rowid = records_fts.rowid "
+                                  "WHERE records_fts MATCH ? ORDER BY records_fts.rank LIMIT ?",
+                                  (match, limit)).fetchall()
+            else:
+                condition = " AND ".join(
+                    "(r.name LIKE ? OR r.content LIKE ? OR r.type LIKE ? OR r.comment LIKE ?)" for _ in terms)
+                params = [f"%{term}%" for term in terms for _ in range(4)]
+                rows = db.execute(f"SELECT {columns} FROM records r WHERE {condition} LIMIT ?",
+                                  params + [limit]).fetchall()
+        
+        keys = ('zone_id', 'id', 'account', 'zone', 'type', 'name', 'content', 'comment')
+        return [dict(zip(keys, row)) for row in rows]
+    
+    def record_count(self):
+        """本地缓存的记录数与域名数"""
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return 0, 0
+            return db.execute("SELECT COUNT(*), COUNT(DISTINCT zone_id) FROM records").fetchone()
+    
+    def load_zones(self, credential, account_id=None, max_age=LOCAL_CACHE_MAX_AGE):
+        """返回该凭据的域名列表 [Zone, ...]，没有同步过或已过期时返回 None"""
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return None
+            row = db.execute("SELECT synced_at FROM credentials WHERE credential = ?", (credential,)).fetchone()
+            if not row or time.time() - row[0] > max_age:
+                return None
+            
+            sql = "SELECT id, name, status, name_servers FROM zones WHERE credential = ?"
+            params = [credential]
+            if account_id:
+                sql += " AND account_id = ?"
+                params.append(account_id)
+            rows = db.execute(sql + " ORDER BY rowid", params).fetchall()
+        
+        return [Zone.from_api({'id': zone_id, 'name': name, 'status': status,
+                               'name_servers': json.loads(name_servers or '[]')})
+                for zone_id, name, status, name_servers in rows]
+    
+    def load_records(self, zone_id, max_age=LOCAL_CACHE_MAX_AGE):
+        """返回该域名的记录列表 [DnsRecord, ...]，没有同步过或已过期时返回 None"""
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return None
+            row = db.execute("SELECT records_synced_at FROM zone_sync WHERE zone_id = ?", (zone_id,)).fetchone()
+            if not row or time.time() - row[0] > max_age:
+                return None
+            rows = db.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM records WHERE zone_id = ? ORDER BY rowid",
+                              (zone_id,)).fetchall()
+        
+        records = []
+        for row in rows:
+            record = dict(zip(RECORD_COLUMNS, row))
+            record['data'] = json.loads(record['data']) if record['data'] else None
+            records.append(DnsRecord.from_api(record, zone_id))
+        return records
+    
+    def save_zones(self, credential, account_name, zones):
+        """保存某个凭据的完整域名列表（API 原始数据），返回与上次相比的变更
+        
+        变更为 [(zone_id, zone_name, 操作, 类型, 名称, 说明), ...]。
+        """
+        changes = []
+        now = time.time()
+        with self.lock:
+            db = self._db()
+            previous = {zone_id: (name, status) for zone_id, name, status in
+                        db.execute("SELECT id, name, status FROM zones WHERE credential = ?", (credential,))}
+            
+            for zone in zones:
+                old = previous.pop(zone['id'], None)
+                if old is None:
+                    changes.append((zone['id'], zone['name'], "新增", "域名", zone['name'], zone.get('status') or ''))
+                elif old[1] != zone.get('status'):
+                    changes.append((zone['id'], zone['name'], "修改", "域名", zone['name'],
+                                    f"status: {old[1]} → {zone.get('status')}"))
+                
+                account = zone.get('account') or {}
+                db.execute(
+                    "INSERT OR REPLACE INTO zones (credential, id, account_id, account_name, name, status, name_servers) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (credential, zone['id'], account.get('id', ''), account_name, zone['name'],
+                     zone.get('status') or '', json.dumps(zone.get('name_servers') or [])))
+            
+            for zone_id, (name, status) in previous.items():
+                changes.append((zone_id, name, "删除", "域名", name, status))
+                self._remove_zone(db, zone_id, credential)
+            
+            db.execute("INSERT OR REPLACE INTO credentials (credential, synced_at) VALUES (?, ?)", (credential, now))
+            db.commit()
+        return changes
+    
+    def save_records(self, zone_id, zone_name, records):
+        """保存域名的完整记录列表（API 原始数据），返回与上次相比的变更"""
+        changes = []
+        with self.lock:
+            db = self._db()
+            previous = {row[0]: row for row in db.execute(
+                f"SELECT {', '.join(RECORD_COLUMNS)} FROM records WHERE zone_id = ?", (zone_id,))}
+            
+            for record in records:
+                row = record_row(zone_id, record)
+                old = previous.pop(record['id'], None)
+                if old == row:
+                    continue
+                if old is None:
+                    changes.append((zone_id, zone_name, "新增", row[2], row[3], row[4]))
+                else:
+                    detail = ", ".join(f"{field}: {old[i]} → {row[i]}"
+                                       for i, field in enumerate(RECORD_COLUMNS) if old[i] != row[i])
+                    changes.append((zone_id, zone_name, "修改", row[2], row[3], detail))
+                db.execute(RECORD_UPSERT, row)
+            
+            for record_id, old in previous.items():
+                changes.append((zone_id, zone_name, "删除", old[2], old[3], old[4]))
+                db.execute("DELETE FROM records WHERE id = ?", (record_id,))
+            
+            db.execute("INSERT OR REPLACE INTO zone_sync (zone_id, records_synced_at) VALUES (?, ?)",
+                       (zone_id, time.time()))
+            db.commit()
+        return changes
+    
+    def zones_by_staleness(self, zone_ids):
+        """按记录同步时间从旧到新排列域名，返回 [(zone_id, 上次的记录数), ...]"""
+        with self.lock:
+            db = self._db()
+            known = {zone_id: (synced_at or 0, count) for zone_id, synced_at, count in db.execute(
+                "SELECT zone_id, records_synced_at, (SELECT COUNT(*) FROM records WHERE records.zone_id = zone_sync.zone_id) "
+                "FROM zone_sync")}
+        return sorted(((zone_id, known.get(zone_id, (0, 0))[1]) for zone_id in zone_ids),
+                      key=lambda item: known.get(item[0], (0, 0))[0])
+    
+    def add_sync_run(self, started_at, requests_sent, zone_count, skipped, errors, changes):
+        """记录一轮同步及其变更，返回该轮的摘要"""
+        finished_at = time.time()
+        with self.lock:
+            db = self._db()
+            run_id = db.execute(
+                "INSERT INTO sync_runs (started_at, finished_at, requests, zones, skipped, errors) VALUES (?, ?, ?, ?, ?, ?)",
+                (started_at, finished_at, requests_sent, zone_count, skipped, json.dumps(errors, ensure_ascii=False))
+            ).lastrowid
+            db.executemany("INSERT INTO sync_changes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           [(run_id,) + tuple(change) for change in changes])
+            db.commit()
+        return {'run_id': run_id, 'started_at': started_at, 'finished_at': finished_at, 'requests': requests_sent,
+                'zones': zone_count, 'skipped': skipped, 'errors': errors, 'changes': changes}
+    
+    def last_sync_run(self):
+        """返回最近一轮同步的摘要，从未同步过时返回 None"""
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return None
+            row = db.execute("SELECT id, started_at, finished_at, requests, zones, skipped, errors "
+                             "FROM sync_runs ORDER BY id DESC LIMIT 1").fetchone()
+            if not row:
+                return None
+            changes = db.execute("SELECT zone_id, zone_name, kind, record_type, name, detail "
+                                 "FROM sync_changes WHERE run_id = ?", (row[0],)).fetchall()
+        return {'run_id': row[0], 'started_at': row[1], 'finished_at': row[2], 'requests': row[3],
+                'zones': row[4], 'skipped': row[5], 'errors': json.loads(row[6] or '[]'), 'changes': changes}
+    
+    def _remove_zone(self, db, zone_id, credential=None):
+        """删除域名；指定 credential 时只删除该凭据下的这一行，没有其他凭据能看到时才删除记录"""
+        if credential is None:
+            db.execute("DELETE FROM zones WHERE id = ?", (zone_id,))
+        else:
+            db.execute("DELETE FROM zones WHERE credential = ? AND id = ?", (credential, zone_id))
+            if db.execute("SELECT 1 FROM zones WHERE id = ?", (zone_id,)).fetchone():
+                return
+        db.execute("DELETE FROM records WHERE zone_id = ?", (zone_id,))
+        db.execute("DELETE FROM zone_sync WHERE zone_id = ?", (zone_id,))
+    
+    def on_mutation(self, api, method, endpoint, data, result):
+        """写操作监听器：把本工具对记录的修改直接写入本地缓存（全文索引随之更新），
+        域名增删后标记域名列表过期"""
+        with self.lock:
+            db = self._db(create=False)
+            if db is None:
+                return
+            mutation = record_mutation(method, endpoint, result)
+            if mutation:
+                zone_id, deleted, upserted = mutation
+                if not db.execute("SELECT 1 FROM zone_sync WHERE zone_id = ?", (zone_id,)).fetchone():
+                    return  # 未同步过的域名不缓存
+                db.executemany("DELETE FROM records WHERE id = ?", [(record_id,) for record_id in deleted])
+                db.executemany(RECORD_UPSERT, [record_row(zone_id, record) for record in upserted])
+            elif endpoint == "/zones" or ZONE_ENDPOINT.match(endpoint):
+                if method == "DELETE":
+                    self._remove_zone(db, ZONE_ENDPOINT.match(endpoint).group(1))
+                db.execute("UPDATE credentials SET synced_at = 0")
+            else:
+                return
+            db.commit()
+
+
+# 全局本地缓存实例
+local_cache = LocalCache()
+CloudflareAPI.add_mutation_listener(local_cache.on_mutation)
+
+
+class SyncDaemon:
+    """后台同步：定期抓取所有已配置账号的域名和记录，把差异写入本地缓存
+    
+    每轮先获取各账号的域名列表，再按记录同步时间从旧到新抓取记录，
+    按估计的请求数（每 100 条记录一页）控制在 budget 以内，未轮到的域名留到下一轮。
+    每轮结束后调用 on_round(summary)（在同步线程中）。
+    """
+    def __init__(self, cache, accounts=None, interval=SYNC_INTERVAL, budget=SYNC_REQUEST_BUDGET, on_round=None):
+        self.cache = cache
+        self.accounts = accounts  # None 表示使用当前配置中的全部账号
+        self.interval = interval
+        self.budget = budget
+        self.on_round = on_round
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def run_once(self, cancel_event=None):
+        """执行一轮同步，返回摘要（见 LocalCache.add_sync_run）
+        
+        cancel_event 默认为 stop_event；被设置后尚未开始的域名不再抓取，留到下一轮。
+        """
+        if cancel_event is None:
+            cancel_event = self.stop_event
+        started_at = time.time()
+        accounts = list(config.accounts) if self.accounts is None else self.accounts
+        clients = {credential_key(account): registry.get_client(account) for account in accounts}
+        baseline = sum(api.requests_sent for api in clients.values())
+        
+        errors = []
+        changes = []
+        zones = {}  # zone_id -> (api, zone_name)
+        for account, api, zone_list, error in crawl_zones(accounts):
+            if error:
+                errors.append(f"{account['name']}: 获取域名列表失败: {error}")
+                continue
+            changes.extend(self.cache.save_zones(credential_id(account), account['name'], zone_list or []))
+            for zone in zone_list or []:
+                zones.setdefault(zone['id'], (api, zone['name']))
+        
+        # 最久未同步的域名优先，估计的请求数不超过预算
+        used = sum(api.requests_sent for api in clients.values()) - baseline
+        selected = []
+        for zone_id, record_count in self.cache.zones_by_staleness(list(zones)):
+            cost = max(1, -(-record_count // 100))
+            if used + cost > self.budget:
+                break
+            used += cost
+            selected.append(zone_id)
+        
+        def fetch_records(zone_id):
+            if cancel_event.is_set():
+                return None, "已取消"
+            return zones[zone_id][0].list_dns_records(zone_id, cancel_event=cancel_event)
+        
+        for zone_id, records, error in run_concurrently(fetch_records, selected):
+            if error and cancel_event.is_set():
+                continue
+            if error:
+                errors.append(f"{zones[zone_id][1]}: 获取DNS记录失败: {error}")
+                continue
+            changes.extend(self.cache.save_records(zone_id, zones[zone_id][1], records))
+        
+        requests_sent = sum(api.requests_sent for api in clients.values()) - baseline
+        return self.cache.add_sync_run(started_at, requests_sent, len(selected),
+                                       len(zones) - len(selected), errors, changes)
+    
+    def start(self):
+        """在后台线程中开始定期同步"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_forever, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """停止同步（当前这一轮会尽快结束）"""
+        self.stop_event.set()
+    
+    def is_running(self):
+        return bool(self.thread and self.thread.is_alive() and not self.stop_event.is_set())
+    
+    def run_forever(self):
+        """每隔 interval 秒同步一轮，直到 stop()"""
+        while not self.stop_event.is_set():
+            try:
+                summary = in_bulk_lane(self.run_once)
+            except Exception as e:
+                summary = {'errors': [f"同步出错: {e}"], 'changes': [], 'requests': 0, 'zones': 0, 'skipped': 0}
+            if self.on_round:
+                self.on_round(summary)
+            self.stop_event.wait(self.interval)
+
+
+def describe_sync_run(summary):
+    """同步摘要的一行说明"""
+    text = (f"同步 {summary['zones']} 个域名（{summary['skipped']} 个留到下一轮），"
+            f"请求 {summary['requests']} 次，变更 {len(summary['changes'])} 项")
+    if summary['errors']:
+        text += f"，失败 {len(summary['errors'])} 项"
+    return text
+
+
+# ==================== 变更日志 ====================
+
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_FIELDS = ('type', 'name', 'content', 'proxied', 'ttl', 'priority', 'data', 'comment', 'tags')
+JOURNAL_LABELS = {"POST": "添加记录", "PUT": "修改记录", "PATCH": "修改记录", "DELETE": "删除记录"}
+JOURNAL_SNAPSHOT_TTL = 300        # 获取到的记录状态在该时间（秒）内可直接作为修改前状态
+JOURNAL_SNAPSHOT_RECORDS = 100000 # 保留的记录状态总数上限（按域名最久未用淘汰）
+
+# 当前变更任务 (任务ID, 说明)，由 journaled 设置，run_concurrently / BackgroundRunner 会传给工作线程
+current_job = contextvars.ContextVar('current_job', default=None)
+
+
+def new_job_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+
+
+def journaled(label):
+    """装饰器：方法执行期间的所有记录写操作归入同一个变更任务，可整体撤销"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = current_job.set((new_job_id(), label))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_job.reset(token)
+        return wrapper
+    return decorator
+
+
+def snapshot_record(record):
+    """保存记录中撤销时需要的全部字段（空值也保留，以区分“为空”和“未记录”）
+    
+    record 必须是 API 返回的完整记录字典；精简模型 DnsRecord 没有 comment、tags 等字段，不能用来做快照。
+    """
+    snapshot = {'id': record['id']}
+    for field in JOURNAL_FIELDS:
+        snapshot[field] = record.get(field, [] if field == 'tags' else None)
+    return snapshot
+
+
+def api_credential_id(api):
+    """API 客户端对应的凭据标识（与 credential_id 一致）"""
+    return credential_id({'auth_type': api.auth_type, 'email': api.email,
+                          'api_token': api.api_token, 'account_id': api.account_id})
+
+
+class ChangeJournal:
+    """只追加的记录变更日志（JSON Lines），每行是一条记录的一次变更及其前后状态
+    
+    写请求发出前保存将被修改或删除的记录的当前状态：优先使用最近获取记录列表时保存的完整记录
+    （JOURNAL_SNAPSHOT_TTL 秒内有效），没有的才从 API 获取。请求成功后与返回的新状态一起追加到文件。
+    同一任务的变更可以整体撤销。
+    """
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.local = threading.local()  # 当前线程中待写入的修改前状态
+        self.known = OrderedDict()  # zone_id -> {record_id: (保存时间, snapshot)}，按最近使用排序
+        self.known_count = 0
+    
+    def remember(self, api, zone_id, records):
+        """保存 API 返回的完整记录的当前状态（记录列表监听器，任意线程）"""
+        now = time.time()
+        snapshots = {record['id']: (now, snapshot_record(record)) for record in records}
+        with self.lock:
+            self._remember(zone_id, snapshots)
+    
+    def _remember(self, zone_id, snapshots):
+        """合并记录状态并按域名淘汰最久未用的（调用方持有锁）"""
+        known = self.known.setdefault(zone_id, {})
+        self.known_count -= len(known)
+        known.update(snapshots)
+        self.known_count += len(known)
+        self.known.move_to_end(zone_id)
+        while self.known_count > JOURNAL_SNAPSHOT_RECORDS and len(self.known) > 1:
+            _, evicted = self.known.popitem(last=False)
+            self.known_count -= len(evicted)
+    
+    def before_mutation(self, api, method, endpoint, data):
+        """写请求发出前：保存将被修改或删除的记录的当前状态"""
+        self.local.before = {}
+        match = DNS_RECORD_ENDPOINT.match(endpoint)
+        if not match or not match.group(2):
+            return
+        zone_id, target = match.groups()
+        if target == 'batch':
+            ids = [item['id'] for kind in ('deletes', 'patches', 'puts') for item in (data or {}).get(kind) or []]
+        else:
+            ids = [target]
+        if ids:
+            self.local.before = self.lookup(api, zone_id, ids)
+    
+    def lookup(self, api, zone_id, ids):
+        """获取记录的当前状态 {record_id: snapshot}
+        
+        只使用 API 返回的完整记录（最近获取记录列表或写入时保存的状态，过期的不用；或现取），
+        不使用记录缓存中的精简模型，否则 comment、tags 会被当作空值记入日志。
+        """
+        found = {}
+        fresh_after = time.time() - JOURNAL_SNAPSHOT_TTL
+        with self.lock:
+            known = dict(self.known.get(zone_id) or {})
+        missing = set()
+        for record_id in ids:
+            saved_at, snapshot = known.get(record_id, (0, None))
+            if saved_at >= fresh_after:
+                found[record_id] = snapshot
+            else:
+                missing.add(record_id)
+        
+        if len(missing) == 1:
+            record_id = missing.pop()
+            result, error = api._request("GET", f"/zones/{zone_id}/dns_records/{record_id}")
+            if not error:
+                found[record_id] = snapshot_record(result)
+        elif missing:
+            # 缺少多条时获取整个域名（列表经 remember 保存），之后逐条提交（如批量接口失败后的退回）不必再逐条获取
+            records, error = api.list_dns_records(zone_id)
+            snapshots = {record['id']: snapshot_record(record) for record in records or []}
+            for record_id in missing:
+                if record_id in snapshots:
+                    found[record_id] = snapshots[record_id]
+        return found
+    
+    def on_mutation(self, api, method, endpoint, data, result):
+        """写操作成功后：追加每条记录的前后状态"""
+        match = DNS_RECORD_ENDPOINT.match(endpoint)
+        if not match:
+            return
+        zone_id, target = match.groups()
+        before = getattr(self.local, 'before', None) or {}
+        self.local.before = {}
+        
+        changes = []  # [(操作, record_id, before, after)]
+        if target == 'batch':
+            result = result or {}
+            for item in result.get('deletes') or []:
+                changes.append(("delete", item['id'], before.get(item['id']), None))
+            for kind in ('patches', 'puts'):
+                for item in result.get(kind) or []:
+                    changes.append(("update", item['id'], before.get(item['id']), snapshot_record(item)))
+            for item in result.get('posts') or []:
+                changes.append(("create", item['id'], None, snapshot_record(item)))
+        elif target:
+            if method == "DELETE":
+                changes.append(("delete", target, before.get(target), None))
+            else:
+                changes.append(("update", target, before.get(target), snapshot_record(result)))
+        elif result:
+            changes.append(("create", result['id'], None, snapshot_record(result)))
+        
+        job_id, label = current_job.get() or (new_job_id(), JOURNAL_LABELS.get(method, method))
+        credential = api_credential_id(api)
+        now = time.time()
+        lines = [json.dumps({'job': job_id, 'label': label, 'time': now, 'credential': credential,
+                             'zone_id': zone_id, 'record_id': record_id, 'op': op, 'before': old, 'after': new},
+                            ensure_ascii=False)
+                 for op, record_id, old, new in changes]
+        if lines:
+            with self.lock:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+                known = self.known.get(zone_id)
+                if known is not None:
+                    for _, record_id, _, new in changes:
+                        if new is None and record_id in known:
+                            del known[record_id]
+                            self.known_count -= 1
+                        elif new is not None:
+                            self._remember(zone_id, {record_id: (now, new)})
+    
+    def read(self):
+        """读取全部日志行，文件不存在时返回空列表（跳过损坏的行）"""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with self.lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return entries
+    
+    def jobs(self):
+        """按任务汇总，最新的在前：[{'job', 'label', 'time', 'count', 'zones'}, ...]"""
+        jobs = OrderedDict()
+        for entry in self.read():
+            job = jobs.get(entry['job'])
+            if job is None:
+                job = jobs[entry['job']] = {'job': entry['job'], 'label': entry['label'], 'time': entry['time'],
+                                            'count': 0, 'zones': set()}
+            job['count'] += 1
+            job['zones'].add(entry['zone_id'])
+        return list(reversed(jobs.values()))
+    
+    def inverse_changes(self, job_id):
+        """计算撤销某个任务所需的变更
+        
+        同一条记录在任务中被多次修改时，以最早的修改前状态和最终状态为准。
+        返回 ({zone_id: (credential, posts, patches, deletes)}, errors)。
+        """
+        states = OrderedDict()  # (zone_id, record_id) -> [credential, 第一次操作, before, after]
+        for entry in self.read():
+            if entry['job'] != job_id:
+                continue
+            key = (entry['zone_id'], entry['record_id'])
+            if key in states:
+                states[key][3] = entry['after']
+            else:
+                states[key] = [entry['credential'], entry['op'], entry['before'], entry['after']]
+        
+        zones = {}
+        errors = []
+        for (zone_id, record_id), (credential, op, old, new) in states.items():
+            _, posts, patches, deletes = zones.setdefault(zone_id, (credential, [], [], []))
+            if op == "create":
+                if new is not None:
+                    deletes.append({'id': record_id})  # 撤销新增
+            elif old is None:
+                errors.append(f"{record_id}: 缺少修改前的状态，无法撤销")
+            elif new is None:
+                # 撤销删除（重新创建，ID 会变化）
+                posts.append({k: v for k, v in old.items() if k != 'id' and v is not None and v != []})
+            else:
+                # 修改前状态中没有的字段（旧格式的日志省略了空值）无法确定原值，不撤销
+                changes = {field: old[field] for field in JOURNAL_FIELDS
+                           if field in old and old[field] != new.get(field, [] if field == 'tags' else None)}
+                if changes:
+                    patches.append(dict(changes, id=record_id))
+        return zones, errors
+    
+    def revert(self, job_id, label="", cancel_event=None):
+        """撤销一个任务：各域名并发提交逆向变更（走批量接口），撤销本身也记录为新任务
+        
+        逐个产出 (zone_id, outcome, error)，outcome 同 apply_record_changes。
+        cancel_event 被设置后尚未开始的域名不再提交，返回 "已取消"。
+        """
+        zones, errors = self.inverse_changes(job_id)
+        for error in errors:
+            yield None, None, error
+        
+        clients = {credential_id(account): registry.get_client(account) for account in config.accounts}
+        
+        job = (new_job_id(), f"撤销: {label or job_id}")
+        
+        def revert_zone(zone_id):
+            if cancel_event is not None and cancel_event.is_set():
+                return None, "已取消"
+            current_job.set(job)  # 只影响该工作线程的上下文副本
+            credential, posts, patches, deletes = zones[zone_id]
+            api = clients.get(credential)
+            if api is None:
+                return None, "该任务使用的账号已不在配置中"
+            return api.apply_record_changes(zone_id, posts=posts, patches=patches, deletes=deletes), None
+        
+        todo = [zone_id for zone_id, (_, posts, patches, deletes) in zones.items() if posts or patches or deletes]
+        yield from run_concurrently(revert_zone, todo)
+
+
+# 全局变更日志实例
+journal = ChangeJournal()
+CloudflareAPI.add_before_mutation_listener(journal.before_mutation)
+CloudflareAPI.add_mutation_listener(journal.on_mutation)
+CloudflareAPI.add_records_listener(journal.remember)
+
+
+# ==================== 可恢复的批量任务 ====================
+
+JOBS_DIR = "jobs"
+
+
+class BatchJob:
+    """可恢复的批量任务，保存为 JOBS_DIR 下的 JSON Lines 文件
+    
+    第一行是任务头（类型、参数、全部条目），之后每处理一条追加一行检查点
+    {"index", "state", "result", "error"}，崩溃时最多丢失最后一行。
+    重新打开时按检查点恢复各条目状态，只继续未完成的条目；已完成的条目不会重复提交，
+    已失败的条目（服务器明确拒绝）也不会重发，只在摘要中单独列出。
+    状态为 sending（已发出但不知道结果）的条目由调用方先核对是否已生效再决定是否重发。
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    def __init__(self, path, header, states=None):
+        self.path = path
+        self.header = header
+        self.items = header['items']
+        self.states = states or [{'state': self.PENDING, 'result': None, 'error': None} for _ in self.items]
+        self.abandoned = False
+        self.lock = threading.Lock()
+    
+    @property
+    def kind(self):
+        return self.header['kind']
+    
+    @property
+    def params(self):
+        return self.header['params']
+    
+    @classmethod
+    def create(cls, kind, label, params, items, directory=JOBS_DIR):
+        """新建任务并写入任务头"""
+        os.makedirs(directory, exist_ok=True)
+        job_id = new_job_id()
+        header = {'job': job_id, 'kind': kind, 'label': label, 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                  'params': params, 'items': items}
+        path = os.path.join(directory, f"{kind}-{job_id}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + '\n')
+        return cls(path, header)
+    
+    @classmethod
+    def load(cls, path):
+        """读取任务文件并重放检查点，返回 (job, error)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            header = json.loads(lines[0])
+        except (OSError, ValueError, IndexError) as e:
+            return None, f"读取任务文件失败: {str(e)}"
+        
+        job = cls(path, header)
+        for line in lines[1:]:
+            try:
+                checkpoint = json.loads(line)
+            except ValueError:
+                continue  # 中断时写了一半的行
+            if checkpoint.get('abandoned'):
+                job.abandoned = True
+                continue
+            job.states[checkpoint['index']] = {'state': checkpoint['state'], 'result': checkpoint.get('result'),
+                                               'error': checkpoint.get('error')}
+        return job, None
+    
+    @classmethod
+    def unfinished(cls, kind, directory=JOBS_DIR, **params):
+        """列出指定类型且参数匹配、仍有未完成条目的任务，最新的在前（已在任务队列中的除外）"""
+        if not os.path.isdir(directory):
+            return []
+        jobs = []
+        for filename in sorted(os.listdir(directory), reverse=True):
+            if not (filename.startswith(kind + '-') and filename.endswith('.jsonl')):
+                continue
+            job, error = cls.load(os.path.join(directory, filename))
+            if error or job.kind != kind or job.abandoned or scheduler.is_active(job.path) or not job.remaining():
+                continue
+            if all(job.params.get(key) == value for key, value in params.items()):
+                jobs.append(job)
+        return jobs
+    
+    def checkpoint(self, index, state, result=None, error=None):
+        """更新条目状态并追加一行检查点（立即写入磁盘）"""
+        with self.lock:
+            self.states[index] = {'state': state, 'result': result, 'error': error}
+            line = json.dumps({'index': index, 'state': state, 'result': result, 'error': error}, ensure_ascii=False)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def abandon(self):
+        """放弃任务：保留文件作为记录，但不再提示继续"""
+        with self.lock:
+            self.abandoned = True
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'abandoned': True}) + '\n')
+    
+    def remaining(self):
+        """未完成（待处理或结果未知）的条目序号；失败的条目不算在内"""
+        return [index for index, state in enumerate(self.states)
+                if state['state'] in (self.PENDING, self.SENDING)]
+    
+    def failed(self):
+        """已失败的条目序号"""
+        return [index for index, state in enumerate(self.states) if state['state'] == self.FAILED]
+    
+    def uncertain(self):
+        """已发出但没有记录结果的条目序号（中断发生在请求期间）"""
+        return [index for index, state in enumerate(self.states) if state['state'] == self.SENDING]
+    
+    def describe(self):
+        """任务摘要，用于提示继续"""
+        done = sum(1 for state in self.states if state['state'] == self.DONE)
+        summary = f"{self.header['label']}（{self.header['time']} 创建，已完成 {done}/{len(self.items)}"
+        failed = len(self.failed())
+        if failed:
+            summary += f"，失败 {failed} 条不会重试"
+        return summary + "）"
+
+
+def run_add_zones_job(api, job, control):
+    """在任务队列中执行批量添加域名任务（job 为 BatchJob，control 为 ScheduledJob）
+    
+    每个域名提交前后都写检查点；取消或暂停后关闭程序，未完成的域名留在任务文件中可继续。
+    """
+    domains = job.items
+    account_id = job.params.get('account_id') or None
+    
+    # 中断时正在添加的域名可能已经添加成功，先核对域名列表，避免重复提交
+    uncertain = job.uncertain()
+    if uncertain:
+        control.progress(message=f"正在核对中断时正在添加的 {len(uncertain)} 个域名...")
+        zone_list, error = api.get_zones(account_id)
+        if not error:
+            existing = {zone['name']: zone for zone in zone_list}
+            for index in uncertain:
+                zone = existing.get(domains[index].lower())
+                if zone:
+                    job.checkpoint(index, BatchJob.DONE, result=list(zone.get('name_servers') or []))
+    
+    remaining = job.remaining()
+    sent = set(remaining)
+    control.progress(0, len(remaining))
+    for i, index in enumerate(remaining, 1):
+        if control.is_set():
+            break
+        domain = domains[index]
+        control.progress(message=f"正在添加: {domain}")
+        
+        job.checkpoint(index, BatchJob.SENDING)
+        result, error = api.add_zone(domain, account_id)
+        
+        if error:
+            job.checkpoint(index, BatchJob.FAILED, error=error)
+        else:
+            job.checkpoint(index, BatchJob.DONE, result=list(result.get('name_servers', [])))
+        control.progress(done=i)
+    
+    success_count = 0
+    fail_count = 0
+    for index, domain in enumerate(domains):
+        state = job.states[index]
+        if state['state'] == BatchJob.DONE:
+            success_count += 1
+            name_servers = state['result'] or []
+            ns_info = ', '.join(name_servers) if name_servers else '无'
+            note = "" if index in sent else " (此前已完成)"
+            control.log(f"✓ {domain}: {ns_info}{note}")
+        elif state['state'] == BatchJob.FAILED:
+            fail_count += 1
+            note = "" if index in sent else " (此前已失败，未重试)"
+            control.log(f"❌ {domain}: {state['error']}{note}")
+        else:
+            control.log(f"… {domain}: 未处理")
+    
+    summary = f"成功: {success_count}, 失败: {fail_count}"
+    if job.remaining():
+        summary += "（未完成的域名可在批量添加域名中继续）"
+    control.progress(message=summary)
+    return summary, None
+
+
+def run_add_records_job(api, job, control):
+    """在任务队列中执行批量添加DNS记录任务（job 为 BatchJob，control 为 ScheduledJob）"""
+    zone_id = job.params['zone_id']
+    
+    # 中断时正在提交的记录可能已经添加成功：按 (type, name, content) 核对当前记录
+    uncertain = job.uncertain()
+    if uncertain:
+        control.progress(message=f"正在核对中断时正在提交的 {len(uncertain)} 条记录...")
+        zone, error = api.get_zone(zone_id)
+        current, list_error = api.list_dns_records(zone_id) if not error else (None, error)
+        if not list_error:
+            existing = {record_key(record): record for record in current}
+            for index in uncertain:
+                item = job.items[index]
+                record = (existing.get(record_key(dict(item, name=expand_record_name(item['name'], zone['name']))))
+                          or existing.get(record_key(item)))
+                if record:
+                    job.checkpoint(index, BatchJob.DONE, result=record['id'])
+    
+    remaining = job.remaining()
+    sent = set(remaining)
+    control.progress(0, len(remaining))
+    for i, index in enumerate(remaining, 1):
+        if control.is_set():
+            break
+        item = job.items[index]
+        control.progress(message=f"正在添加: {item['type']} {item['name']}")
+        
+        data = {
+            "type": item['type'],
+            "name": item['name'],
+            "content": item['content'],
+            "proxied": item['proxied'],
+            "ttl": item['ttl']
+        }
+        if item['priority'] is not None:
+            data["priority"] = item['priority']
+        
+        job.checkpoint(index, BatchJob.SENDING)
+        result, error = api._request("POST", f"/zones/{zone_id}/dns_records", data)
+        
+        if error:
+            job.checkpoint(index, BatchJob.FAILED, error=error)
+        else:
+            job.checkpoint(index, BatchJob.DONE, result=result.get('id'))
+        control.progress(done=i)
+    
+    success_count = 0
+    fail_count = 0
+    for index, item in enumerate(job.items):
+        state = job.states[index]
+        label = f"第{item['row']}行 ({item['type']} {item['name']})"
+        if state['state'] == BatchJob.DONE:
+            success_count += 1
+            note = "添加成功" if index in sent else "此前已完成"
+            control.log(f"[成功] {label}: {note}")
+        elif state['state'] == BatchJob.FAILED:
+            fail_count += 1
+            note = "" if index in sent else " (此前已失败，未重试)"
+            control.log(f"[失败] {label}: {state['error']}{note}")
+        else:
+            control.log(f"[未处理] {label}")
+    
+    summary = f"成功: {success_count}, 失败: {fail_count}"
+    if job.remaining():
+        summary += "（未完成的记录可在该域名的批量添加中继续）"
+    control.progress(message=summary)
+    return summary, None
+
+
+# ==================== 期望状态同步 ====================
+
+SYNC_FIELDS = ('ttl', 'proxied', 'priority', 'comment')
+RECORD_DEFAULTS = {'ttl': 1, 'proxied': False}
+
+
+def load_desired_state(path):
+    """读取期望状态文件（JSON；安装了 PyYAML 时也支持 YAML）
+    
+    格式: {"zones": {"example.com": {"prune": true, "records": [{"type": "A", "name": "www", ...}]}}}
+    域名下也可以直接写记录列表（prune 默认为 true，即删除文件中未列出的记录）。
+    记录名称可以写 "@"、相对名称或完整域名。返回 ({zone_name: {'prune', 'records'}}, error)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    return None, "读取 YAML 需要安装 PyYAML (pip install pyyaml)，或改用 JSON 格式"
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+    except Exception as e:
+        return None, f"读取期望状态文件失败: {str(e)}"
+    
+    zones = data.get('zones') if isinstance(data, dict) else None
+    if not isinstance(zones, dict):
+        return None, "期望状态文件格式错误：缺少 zones 字段"
+    
+    state = {}
+    for zone_name, zone_state in zones.items():
+        zone_name = str(zone_name).lower().rstrip('.')
+        if isinstance(zone_state, list):
+            zone_state = {'records': zone_state}
+        if not isinstance(zone_state, dict):
+            return None, f"{zone_name} 格式错误：应为记录列表或包含 records 的对象"
+        if not isinstance(zone_state.get('records') or [], list):
+            return None, f"{zone_name} 格式错误：records 应为列表"
+        
+        records = []
+        for i, record in enumerate(zone_state.get('records') or [], 1):
+            if not isinstance(record, dict):
+                return None, f"{zone_name} 第 {i} 条记录格式错误"
+            if not record.get('type') or not record.get('name') or record.get('content') is None:
+                return None, f"{zone_name} 第 {i} 条记录缺少 type/name/content"
+            if not isinstance(record['type'], str):
+                return None, f"{zone_name} 第 {i} 条记录格式错误：type 应为字符串"
+            record = dict(record)
+            record['type'] = record['type'].upper()
+            record['name'] = expand_record_name(record['name'], zone_name)
+            record['content'] = str(record['content'])
+            records.append(record)
+        
+        state[zone_name] = {'prune': zone_state.get('prune', True), 'records': records}
+    return state, None
+
+
+def expand_record_name(name, zone_name):
+    """将 "@" 或相对名称展开为完整域名"""
+    name = str(name).lower().rstrip('.')
+    if name in ('@', zone_name):
+        return zone_name
+    if name.endswith('.' + zone_name):
+        return name
+    return f"{name}.{zone_name}"
+
+
+def record_key(record):
+    """记录的身份标识 (type, name, content)，内容按类型规范化"""
+    record_type = record.get('type') or ''
+    content = record.get('content') or ''
+    if record_type in ('A', 'AAAA', 'CNAME', 'MX', 'NS', 'PTR'):
+        content = normalize_target(content)
+    elif record_type == 'TXT' and len(content) >= 2 and content[0] == content[-1] == '"':
+        content = content[1:-1]
+    return (record_type, (record.get('name') or '').lower().rstrip('.'), content)
+
+
+class SyncPlan:
+    """单个域名的变更计划"""
+    def __init__(self, zone_name, zone_id=None, api=None):
+        self.zone_name = zone_name
+        self.zone_id = zone_id
+        self.api = api
+        self.creates = []  # [desired_record, ...]
+        self.updates = []  # [(current_record, changes), ...]
+        self.deletes = []  # [current_record, ...]
+    
+    def is_empty(self):
+        return not (self.creates or self.updates or self.deletes)
+    
+    def summary(self):
+        return f"新增 {len(self.creates)}, 修改 {len(self.updates)}, 删除 {len(self.deletes)}"
+    
+    def apply(self):
+        """通过批量接口提交计划，返回 [(操作, 提交的数据, 结果, error), ...]"""
+        posts = [dict(RECORD_DEFAULTS, **record) for record in self.creates]
+        patches = [dict(changes, id=record['id']) for record, changes in self.updates]
+        deletes = [{'id': record['id']} for record in self.deletes]
+        return self.api.apply_record_changes(self.zone_id, posts=posts, patches=patches, deletes=deletes)
+
+
+def compute_sync_plan(zone_name, current_records, desired_records, prune=True):
+    """对比当前记录与期望记录，生成最小变更计划（线性时间）
+    
+    按 (type, name, content) 配对；配对成功的只比较期望中写明的字段。
+    剩余的新增与删除中，同 (type, name) 的两两合并为一次修改内容的 PATCH。
+    """
+    plan = SyncPlan(zone_name)
+    
+    current_by_key = {}
+    for record in current_records:
+        current_by_key.setdefault(record_key(record), []).append(record)
+    
+    unmatched = []
+    for desired in desired_records:
+        matches = current_by_key.get(record_key(desired))
+        if not matches:
+            unmatched.append(desired)
+            continue
+        current = matches.pop()
+        changes = diff_record(current, {f: desired[f] for f in SYNC_FIELDS if f in desired})
+        if changes:
+            plan.updates.append((current, changes))
+    
+    leftovers = {}  # (type, name) -> [current_record, ...]
+    if prune:
+        for records in current_by_key.values():
+            for record in records:
+                leftovers.setdefault(record_key(record)[:2], []).append(record)
+    
+    for desired in unmatched:
+        candidates = leftovers.get(record_key(desired)[:2])
+        if candidates:
+            current = candidates.pop()
+            wanted = {f: desired[f] for f in SYNC_FIELDS if f in desired}
+            wanted['content'] = desired['content']
+            plan.updates.append((current, diff_record(current, wanted)))
+        else:
+            plan.creates.append(desired)
+    
+    for records in leftovers.values():
+        plan.deletes.extend(records)
+    
+    return plan
+
+
+def describe_sync_plan(plan):
+    """将变更计划展开为 (操作, 类型, 名称, 说明) 行，供界面与命令行显示"""
+    for record in plan.creates:
+        yield "新增", record['type'], record['name'], record['content']
+    for record, changes in plan.updates:
+        detail = ", ".join(f"{field}: {record.get(field)} → {value}" for field, value in changes.items())
+        yield "修改", record.get('type'), record.get('name'), detail
+    for record in plan.deletes:
+        yield "删除", record.get('type'), record.get('name'), record.get('content')
+
+
+def build_sync_plans(state, accounts, max_workers=MAX_WORKERS, cancel_event=None):
+    """为期望状态中的每个域名生成变更计划
+    
+    并发获取各账号的域名列表定位域名，再并发获取这些域名的当前记录。
+    返回 (plans, errors)，plans 为 [SyncPlan, ...]。cancel_event 被设置后尚未开始的域名返回 "已取消"。
+    """
+    errors = []
+    located = {}  # zone_name -> (api, zone)
+    for account, api, zone_list, error in crawl_zones(accounts, max_workers):
+        if error:
+            errors.append(f"{account['name']}: 获取域名列表失败: {error}")
+            continue
+        for zone in zone_list or []:
+            if zone['name'] in state:
+                located.setdefault(zone['name'], (api, zone))
+    
+    for zone_name in state:
+        if zone_name not in located:
+            errors.append(f"{zone_name}: 在已配置的账号中未找到该域名")
+    
+    def fetch_records(zone_name):
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "已取消"
+        api, zone = located[zone_name]
+        return api.list_dns_records(zone['id'], cancel_event=cancel_event)
+    
+    plans = []
+    for zone_name, records, error in run_concurrently(fetch_records, list(located), max_workers):
+        if error:
+            errors.append(f"{zone_name}: 获取DNS记录失败: {error}")
+            continue
+        api, zone = located[zone_name]
+        plan = compute_sync_plan(zone_name, records or [], state[zone_name]['records'], state[zone_name]['prune'])
+        plan.zone_id = zone['id']
+        plan.api = api
+        plans.append(plan)
+    
+    plans.sort(key=lambda p: p.zone_name)
+    return plans, errors
+
+
+def apply_sync_plans(plans, max_workers=MAX_WORKERS, cancel_event=None):
+    """并发提交多个域名的变更计划，按完成顺序产出 (plan, outcome, error)
+    
+    cancel_event 被设置后尚未开始的域名不再提交，返回 "已取消"。
+    """
+    def apply_plan(plan):
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "已取消"
+        return plan.apply(), None
+    
+    for plan, outcome, error in run_concurrently(apply_plan, plans, max_workers):
+        yield plan, outcome, error
+
+
+# ==================== 记录模板 ====================
+
+TEMPLATE_VARIABLE = re.compile(r"\{(zone|zone_id|label|account)\}")
+
+
+def parse_template(text):
+    """解析模板文本，每行一条记录: 类型 名称 [优先级] 内容
+    
+    优先级只对 MX / SRV / URI 生效；内容为该行剩余部分（可包含空格）；空行和 # 开头的行忽略。
+    返回 (records, error)
+    """
+    records = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split(None, 2)
+        if len(parts) < 3:
+            return None, f"第 {line_number} 行格式错误，应为: 类型 名称 [优先级] 内容"
+        record_type, name, content = parts[0].upper(), parts[1], parts[2].strip()
+        record = {'type': record_type, 'name': name, 'content': content}
+        if record_type in ('MX', 'SRV', 'URI'):
+            priority, _, rest = content.partition(' ')
+            if priority.isdigit() and rest.strip():
+                record['priority'] = int(priority)
+                record['content'] = rest.strip()
+        records.append(record)
+    
+    if not records:
+        return None, "模板中没有记录"
+    return records, None
+
+
+def format_template(records):
+    """把模板记录格式化为可编辑的文本（parse_template 的逆操作）"""
+    lines = []
+    for record in records:
+        priority = f"{record['priority']} " if record.get('priority') is not None else ""
+        lines.append(f"{record['type']} {record['name']} {priority}{record['content']}")
+    return "\n".join(lines)
+
+
+def render_template(records, zone_name, zone_id='', account_name=''):
+    """把模板中的变量替换为该域名的值，并把名称展开为完整域名
+    
+    支持 {zone}（域名）、{zone_id}、{label}（域名第一段）、{account}（来源账号名），
+    其他花括号内容原样保留。
+    """
+    values = {'zone': zone_name, 'zone_id': zone_id, 'label': zone_name.split('.')[0], 'account': account_name}
+    
+    def substitute(value):
+        return TEMPLATE_VARIABLE.sub(lambda match: values[match.group(1)], value)
+    
+    rendered = []
+    for record in records:
+        record = dict(record)
+        record['name'] = expand_record_name(substitute(record['name']), zone_name)
+        record['content'] = substitute(str(record['content']))
+        rendered.append(record)
+    return rendered
+
+
+def apply_template(records, targets, dry_run=False, cancel_event=None, max_workers=MAX_WORKERS):
+    """把模板并发应用到多个域名，按完成顺序产出 (target, plan, outcome, error)
+    
+    targets 为 [(api, zone_id, zone_name, account_name), ...]。每个域名在同一个工作线程中
+    先获取当前记录，再通过批量接口只新增缺失的记录（已存在的记录按 (type, name, content)
+    识别并跳过，不修改也不删除）。dry_run 为 True 时只计算不提交，outcome 为空列表。
+    """
+    def provision(target):
+        api, zone_id, zone_name, account_name = target
+        if cancel_event and cancel_event.is_set():
+            return None, "已取消"
+        current, error = api.list_dns_records(zone_id, cancel_event=cancel_event)
+        if error:
+            return None, error
+        
+        plan = compute_sync_plan(zone_name, current or [], render_template(records, zone_name, zone_id, account_name),
+                                 prune=False)
+        plan.updates = []  # 模板只补充缺失的记录，已存在的记录保持原样
+        plan.zone_id = zone_id
+        plan.api = api
+        
+        if dry_run or plan.is_empty():
+            return (plan, []), None
+        return (plan, plan.apply()), None
+    
+    for target, result, error in run_concurrently(provision, targets, max_workers):
+        plan, outcome = result if result else (None, None)
+        yield target, plan, outcome, error
+
+
+def template_targets(accounts, max_workers=MAX_WORKERS):
+    """获取多个账号下的全部域名作为模板目标（按 zone_id 去重），返回 (targets, errors)"""
+    targets = {}
+    errors = []
+    for account, api, zone_list, error in crawl_zones(accounts, max_workers):
+        if error:
+            errors.append(f"{account['name']}: 获取域名列表失败: {error}")
+            continue
+        for zone in zone_list or []:
+            targets.setdefault(zone['id'], (api, zone['id'], zone['name'], account['name']))
+    return sorted(targets.values(), key=lambda target: target[2]), errors
+
+
+# ==================== 对话框界面 ====================
+
+class AccountManageDialog:
+    """账号管理对话框"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("账号管理")
+        self.dialog.geometry("700x500")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.setup_ui()
+        self.refresh_accounts()
+        
         # 居中显示
         center_window(self.dialog, parent)
     
@@ -395,7 +3476,8 @@ class AccountManageDialog:
         ttk.Button(btn_frame, text="编辑账号", command=self.edit_account).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="删除账号", command=self.delete_account).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="设为当前", command=self.set_current).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_frame, text="验证Token", command=self.verify_token).pack(side=tk.LEFT, padx=2)
+        self.verify_btn = ttk.Button(btn_frame, text="验证Token", command=self.verify_token)
+        self.verify_btn.pack(side=tk.LEFT, padx=2)
         
         # 账号列表
         columns = ("name", "account_id", "status")
@@ -435,7 +3517,7 @@ class AccountManageDialog:
     
     def add_account(self):
         """添加账号"""
-        dialog = AccountEditDialog(self.dialog, "添加账号")
+        dialog = AccountEditDialog(self.dialog, self.runner, "添加账号")
         self.dialog.wait_window(dialog.dialog)
         
         if dialog.result:
@@ -446,6 +3528,7 @@ class AccountManageDialog:
                 dialog.result.get('email', ''),
                 dialog.result.get('auth_type', 'token')
             )
+            registry.rebuild()
             self.refresh_accounts()
             messagebox.showinfo("成功", "账号添加成功")
     
@@ -459,7 +3542,7 @@ class AccountManageDialog:
         index = int(selection[0])
         account = config.accounts[index]
         
-        dialog = AccountEditDialog(self.dialog, "编辑账号", account)
+        dialog = AccountEditDialog(self.dialog, self.runner, "编辑账号", account)
         self.dialog.wait_window(dialog.dialog)
         
         if dialog.result:
@@ -471,6 +3554,7 @@ class AccountManageDialog:
                 dialog.result.get('email', ''),
                 dialog.result.get('auth_type', 'token')
             )
+            registry.rebuild()
             self.refresh_accounts()
             messagebox.showinfo("成功", "账号更新成功")
     
@@ -486,6 +3570,7 @@ class AccountManageDialog:
         
         if messagebox.askyesno("确认", f"确定要删除账号 {account['name']} 吗？"):
             config.delete_account(index)
+            registry.rebuild()
             self.refresh_accounts()
             messagebox.showinfo("成功", "账号删除成功")
     
@@ -502,7 +3587,7 @@ class AccountManageDialog:
         messagebox.showinfo("成功", "已切换当前账号")
     
     def verify_token(self):
-        """验证Token"""
+        """验证Token（后台请求）"""
         selection = self.account_tree.selection()
         if not selection:
             messagebox.showwarning("警告", "请先选择账号")
@@ -511,22 +3596,29 @@ class AccountManageDialog:
         index = int(selection[0])
         account = config.accounts[index]
         
-        api = CloudflareAPI(
-            account['api_token'], 
-            account.get('account_id', ''),
-            account.get('email', ''),
-            account.get('auth_type', 'token')
-        )
-        if api.verify_token():
+        api = registry.get_client(account)
+        self.verify_btn.config(state=tk.DISABLED)
+        self.runner.submit(lambda: (api.verify_token(), None),
+                           lambda result: self.on_token_verified(account, result))
+    
+    def on_token_verified(self, account, result):
+        """Token 验证完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.verify_btn.config(state=tk.NORMAL)
+        verified, error = result
+        if verified:
             auth_type_name = "Global API Key" if account.get('auth_type') == 'global_key' else "API Token"
-            messagebox.showinfo("成功", f"账号 {account['name']} 的 {auth_type_name} 验证成功")
+            messagebox.showinfo("成功", f"账号 {account['name']} 的 {auth_type_name} 验证成功", parent=self.dialog)
         else:
-            messagebox.showerror("错误", f"账号 {account['name']} 的认证验证失败")
+            messagebox.showerror("错误", f"账号 {account['name']} 的认证验证失败" + (f": {error}" if error else ""),
+                                 parent=self.dialog)
 
 
 class AccountEditDialog:
     """账号编辑对话框"""
-    def __init__(self, parent, title, account=None):
+    def __init__(self, parent, runner, title, account=None):
+        self.runner = runner
         self.result = None
         
         self.dialog = tk.Toplevel(parent)
@@ -593,7 +3685,8 @@ class AccountEditDialog:
         if account:
             self.account_id_entry.insert(0, account.get('account_id', ''))
         
-        ttk.Button(account_frame, text="获取", command=self.fetch_accounts).pack(side=tk.LEFT, padx=(5, 0))
+        self.fetch_btn = ttk.Button(account_frame, text="获取", command=self.fetch_accounts)
+        self.fetch_btn.pack(side=tk.LEFT, padx=(5, 0))
         
         ttk.Label(frame, text="(可选，留空则显示所有账号下的域名)", foreground="gray").grid(row=6, column=1, sticky=tk.W)
         
@@ -648,65 +3741,64 @@ class AccountEditDialog:
         
         if auth_type == "global_key" and not email:
             messagebox.showwarning("警告", "使用 Global API Key 需要输入邮箱")
-            return
-        
-        # 显示获取中提示
-        try:
-            self.dialog.config(cursor="wait")
-            self.dialog.update()
-        except:
-            pass
-        
-        success = False
-        try:
-            api = CloudflareAPI(token, email=email, auth_type=auth_type)
-            
-            # 先验证Token
-            if not api.verify_token():
-                messagebox.showerror("错误", "认证失败，请检查配置是否正确")
-                return
-            
-            # 获取账号列表
-            accounts, error = api.get_accounts()
-            
-            if error:
-                if auth_type == "global_key":
-                    error_detail = f"获取账号列表失败: {error}\n\n"
-                    error_detail += "请确认:\n"
-                    error_detail += "1. Global API Key 正确\n"
-                    error_detail += "2. Email 地址正确\n"
-                    error_detail += "3. 账号状态正常"
-                else:
-                    error_detail = f"获取账号列表失败: {error}\n\n"
-                    error_detail += "可能的原因:\n"
-                    error_detail += "1. Token 权限不足（需要 Account:Read 权限）\n"
-                    error_detail += "2. Token 未授权访问账号信息\n"
-                    error_detail += "3. 网络连接问题\n\n"
-                    error_detail += "建议:\n"
-                    error_detail += "• 重新创建 Token 时勾选 Account - Account - Read 权限\n"
-                    error_detail += "• 或直接在 Cloudflare 控制台复制 Account ID"
-                messagebox.showerror("错误", error_detail)
-                return
-            
-            if not accounts:
-                messagebox.showinfo("提示", "未找到账号信息\n\n可能是认证配置没有账号访问权限。\n你可以直接在 Cloudflare 控制台复制 Account ID。")
-                return
-            
-            success = True
-            # 显示账号选择对话框
-            AccountSelectDialog(self.dialog, accounts, self.account_id_entry)
-            
-        except Exception as e:
-            messagebox.showerror("错误", f"发生错误: {str(e)}")
-        finally:
-            # 恢复光标（无论成功与否）
+            return
+        
+        # 显示获取中提示，验证和分页获取账号列表都在后台进行
+        self.dialog.config(cursor="wait")
+        self.fetch_btn.config(state=tk.DISABLED)
+        
+        def fetch():
+            api = CloudflareAPI(token, email=email, auth_type=auth_type)
             try:
-                self.dialog.config(cursor="")
-                if not success:
-                    self.dialog.update()
-            except:
-                # 如果对话框已关闭，忽略错误
-                pass
+                # 先验证Token，返回 (是否验证通过, accounts, error)
+                if not api.verify_token():
+                    return False, None, None
+                return (True,) + api.get_accounts()
+            except Exception as e:
+                return True, None, f"发生错误: {str(e)}"
+            finally:
+                api.close()
+        
+        self.runner.submit(fetch, lambda result: self.on_accounts_fetched(auth_type, result))
+    
+    def on_accounts_fetched(self, auth_type, result):
+        """账号列表获取完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.dialog.config(cursor="")
+        self.fetch_btn.config(state=tk.NORMAL)
+        
+        verified, accounts, error = result
+        if not verified:
+            messagebox.showerror("错误", "认证失败，请检查配置是否正确", parent=self.dialog)
+            return
+        
+        if error:
+            if auth_type == "global_key":
+                error_detail = f"获取账号列表失败: {error}\n\n"
+                error_detail += "请确认:\n"
+                error_detail += "1. Global API Key 正确\n"
+                error_detail += "2. Email 地址正确\n"
+                error_detail += "3. 账号状态正常"
+            else:
+                error_detail = f"获取账号列表失败: {error}\n\n"
+                error_detail += "可能的原因:\n"
+                error_detail += "1. Token 权限不足（需要 Account:Read 权限）\n"
+                error_detail += "2. Token 未授权访问账号信息\n"
+                error_detail += "3. 网络连接问题\n\n"
+                error_detail += "建议:\n"
+                error_detail += "• 重新创建 Token 时勾选 Account - Account - Read 权限\n"
+                error_detail += "• 或直接在 Cloudflare 控制台复制 Account ID"
+            messagebox.showerror("错误", error_detail, parent=self.dialog)
+            return
+        
+        if not accounts:
+            messagebox.showinfo("提示", "未找到账号信息\n\n可能是认证配置没有账号访问权限。\n你可以直接在 Cloudflare 控制台复制 Account ID。",
+                                parent=self.dialog)
+            return
+        
+        # 显示账号选择对话框
+        AccountSelectDialog(self.dialog, accounts, self.account_id_entry)
     
     def save(self):
         """保存"""
@@ -804,9 +3896,11 @@ class AccountSelectDialog:
 
 class AddDomainDialog:
     """添加域名对话框"""
-    def __init__(self, parent, api):
+    def __init__(self, parent, api, runner):
         self.api = api
+        self.runner = runner
         self.success = False
+        self.adding = False  # 是否有尚未返回的添加请求
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("添加域名")
@@ -824,73 +3918,521 @@ class AddDomainDialog:
         frame = ttk.Frame(self.dialog, padding="20")
         frame.pack(fill=tk.BOTH, expand=True)
         
-        # 域名
-        ttk.Label(frame, text="域名:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.domain_entry = ttk.Entry(frame, width=40)
-        self.domain_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
-        self.domain_entry.focus()
+        # 域名
+        ttk.Label(frame, text="域名:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.domain_entry = ttk.Entry(frame, width=40)
+        self.domain_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        self.domain_entry.focus()
+        
+        ttk.Label(frame, text="示例: example.com", foreground="gray").grid(row=1, column=1, sticky=tk.W)
+        
+        # Account ID
+        ttk.Label(frame, text="Account ID:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.account_id_entry = ttk.Entry(frame, width=40)
+        self.account_id_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 默认填充当前账号的 Account ID
+        current_account = config.get_current_account()
+        if current_account and current_account.get('account_id'):
+            self.account_id_entry.insert(0, current_account['account_id'])
+        
+        ttk.Label(frame, text="(可选，留空则添加到默认账号)", foreground="gray").grid(row=3, column=1, sticky=tk.W)
+        
+        # 按钮
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        
+        self.add_btn = ttk.Button(btn_frame, text="添加", command=self.add_domain)
+        self.add_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
+        frame.columnconfigure(1, weight=1)
+        
+        self.domain_entry.bind("<Return>", lambda e: self.add_domain())
+    
+    def add_domain(self):
+        """添加域名"""
+        domain = self.domain_entry.get().strip()
+        account_id = self.account_id_entry.get().strip()
+        
+        if not domain:
+            messagebox.showwarning("警告", "请输入域名")
+            return
+        
+        if self.adding:
+            return  # 上一次提交还没有结果（回车键不受按钮禁用的限制）
+        
+        self.adding = True
+        self.add_btn.config(state=tk.DISABLED)
+        api = self.api
+        self.runner.submit(lambda: api.add_zone(domain, account_id if account_id else None),
+                           lambda result: self.on_domain_added(domain, result))
+    
+    def on_domain_added(self, domain, result):
+        """添加域名完成（主线程）"""
+        self.adding = False
+        if not self.dialog.winfo_exists():
+            return
+        self.add_btn.config(state=tk.NORMAL)
+        result, error = result
+        
+        if error:
+            messagebox.showerror("错误", f"添加域名失败: {error}", parent=self.dialog)
+        else:
+            self.success = True
+            name_servers = result.get('name_servers', [])
+            
+            msg = f"域名 {domain} 添加成功!\n\n"
+            if name_servers:
+                msg += "请将域名的DNS服务器更改为:\n\n"
+                for ns in name_servers:
+                    msg += f"  • {ns}\n"
+            
+            messagebox.showinfo("成功", msg, parent=self.dialog)
+            self.dialog.destroy()
+
+
+class BatchAddDialog:
+    """批量添加域名对话框：任务保存为可恢复的任务文件，提交到任务队列在后台执行"""
+    def __init__(self, parent, api, on_done=None):
+        self.api = api
+        self.on_done = on_done  # 任务结束时调用 on_done(ScheduledJob)（工作线程）
+        self.job = None  # 提交到任务队列的 ScheduledJob
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("批量添加域名")
+        self.dialog.geometry("700x600")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+        
+        self.dialog.after_idle(self.offer_resume)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Account ID
+        account_frame = ttk.Frame(frame)
+        account_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(account_frame, text="Account ID:").pack(side=tk.LEFT)
+        self.account_id_entry = ttk.Entry(account_frame, width=40)
+        self.account_id_entry.pack(side=tk.LEFT, padx=(10, 0), fill=tk.X, expand=True)
+        
+        # 默认填充当前账号的 Account ID
+        current_account = config.get_current_account()
+        if current_account and current_account.get('account_id'):
+            self.account_id_entry.insert(0, current_account['account_id'])
+        
+        ttk.Label(frame, text="域名列表 (每行一个):").pack(anchor=tk.W, pady=(0, 5))
+        
+        self.domain_text = scrolledtext.ScrolledText(frame, width=70, height=15)
+        self.domain_text.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(frame, text="示例:\nexample.com\ntest.com\nmysite.org", 
+                 foreground="gray", justify=tk.LEFT).pack(anchor=tk.W, pady=(5, 0))
+        
+        # 按钮
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(pady=10)
+        
+        ttk.Button(btn_frame, text="开始添加", command=self.batch_add).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def offer_resume(self):
+        """当前账号有未完成的批量添加任务时提示继续"""
+        account = config.get_current_account()
+        if not account:
+            return
+        jobs = BatchJob.unfinished("add_zones", credential=credential_id(account))
+        if not jobs:
+            return
+        if messagebox.askyesno("继续未完成的任务",
+                               f"发现未完成的批量任务:\n\n{jobs[0].describe()}\n\n"
+                               "是否继续？已添加成功的域名不会重复提交；选择“否”将放弃该任务。",
+                               parent=self.dialog):
+            self.submit(jobs[0])
+        else:
+            jobs[0].abandon()
+    
+    def batch_add(self):
+        """批量添加域名"""
+        content = self.domain_text.get(1.0, tk.END).strip()
+        account_id = self.account_id_entry.get().strip()
+        
+        if not content:
+            messagebox.showwarning("警告", "请输入域名")
+            return
+        
+        domains = [line.strip() for line in content.split('\n') if line.strip()]
+        
+        if not domains:
+            messagebox.showwarning("警告", "没有有效的域名")
+            return
+        
+        if not messagebox.askyesno("确认", f"确定要添加 {len(domains)} 个域名吗?"):
+            return
+        
+        account = config.get_current_account()
+        job = BatchJob.create("add_zones", "批量添加域名",
+                              {'credential': credential_id(account) if account else None, 'account_id': account_id},
+                              domains)
+        self.submit(job)
+    
+    def submit(self, job):
+        """把任务提交到任务队列并关闭对话框（进度和结果在任务队列中查看）"""
+        self.job = scheduler.submit(f"批量添加域名 ({len(job.items)} 个)",
+                                    lambda control: run_add_zones_job(self.api, job, control),
+                                    on_done=self.on_done, key=job.path)
+        self.dialog.destroy()
+
+
+class AddRecordDialog:
+    """添加DNS记录对话框"""
+    def __init__(self, parent, api, zone_id, runner):
+        self.api = api
+        self.zone_id = zone_id
+        self.runner = runner
+        self.success = False
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("添加DNS记录")
+        self.dialog.geometry("500x300")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 类型
+        ttk.Label(frame, text="类型:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.type_combo = ttk.Combobox(frame, width=15, state="readonly")
+        self.type_combo['values'] = ('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SRV')
+        self.type_combo.current(0)
+        self.type_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
+        # 名称
+        ttk.Label(frame, text="名称:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.name_entry = ttk.Entry(frame, width=40)
+        self.name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 内容
+        ttk.Label(frame, text="内容:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.content_entry = ttk.Entry(frame, width=40)
+        self.content_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 代理
+        self.proxy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="启用代理 (仅支持A、AAAA、CNAME记录)", 
+                       variable=self.proxy_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        # TTL
+        ttk.Label(frame, text="TTL:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        self.ttl_combo = ttk.Combobox(frame, width=15, state="readonly")
+        self.ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
+        self.ttl_combo.current(0)
+        self.ttl_combo.grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
+        # 按钮
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
+        
+        self.add_btn = ttk.Button(btn_frame, text="添加", command=self.add_record)
+        self.add_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
+        frame.columnconfigure(1, weight=1)
+    
+    def add_record(self):
+        """添加DNS记录"""
+        record_type = self.type_combo.get()
+        name = self.name_entry.get().strip()
+        content = self.content_entry.get().strip()
+        proxied = self.proxy_var.get()
+        ttl_str = self.ttl_combo.get()
+        ttl = 1 if ttl_str == 'Auto' else int(ttl_str)
+        
+        if not name or not content:
+            messagebox.showwarning("警告", "请填写所有必填字段")
+            return
+        
+        self.add_btn.config(state=tk.DISABLED)
+        api = self.api
+        zone_id = self.zone_id
+        self.runner.submit(lambda: api.add_dns_record(zone_id, record_type, name, content, proxied, ttl),
+                           self.on_record_added)
+    
+    def on_record_added(self, result):
+        """添加DNS记录完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.add_btn.config(state=tk.NORMAL)
+        _, error = result
+        
+        if error:
+            messagebox.showerror("错误", f"添加DNS记录失败: {error}", parent=self.dialog)
+        else:
+            self.success = True
+            messagebox.showinfo("成功", "DNS记录添加成功", parent=self.dialog)
+            self.dialog.destroy()
+
+
+class EditRecordDialog:
+    """修改DNS记录对话框（记录数据在后台获取，获取到后再显示编辑界面）"""
+    def __init__(self, parent, api, zone_id, record_id, runner):
+        self.api = api
+        self.zone_id = zone_id
+        self.record_id = record_id
+        self.runner = runner
+        self.success = False
+        self.record_data = None
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("修改DNS记录")
+        self.dialog.geometry("500x300")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.loading_label = ttk.Label(self.dialog, text="正在获取记录信息...", foreground="gray")
+        self.loading_label.pack(pady=40)
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+        
+        # 先获取记录数据
+        self.load_record_data()
+    
+    def load_record_data(self):
+        """在后台加载记录数据"""
+        api = self.api
+        endpoint = f"/zones/{self.zone_id}/dns_records/{self.record_id}"
+        self.runner.submit(lambda: api._request("GET", endpoint), self.on_record_data_loaded)
+    
+    def on_record_data_loaded(self, result):
+        """记录数据获取完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        result, error = result
+        if error:
+            messagebox.showerror("错误", f"获取记录信息失败: {error}", parent=self.dialog)
+            self.dialog.destroy()
+        else:
+            self.loading_label.destroy()
+            self.record_data = result
+            self.setup_ui()
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 类型（只读，显示为标签）
+        ttk.Label(frame, text="类型:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        record_type = self.record_data.get('type', '')
+        type_label = ttk.Label(frame, text=record_type, 
+                              foreground="blue", font=('TkDefaultFont', 10, 'bold'))
+        type_label.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
-        ttk.Label(frame, text="示例: example.com", foreground="gray").grid(row=1, column=1, sticky=tk.W)
+        # 名称
+        ttk.Label(frame, text="名称:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.name_entry = ttk.Entry(frame, width=40)
+        self.name_entry.insert(0, self.record_data.get('name', ''))
+        self.name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
         
-        # Account ID
-        ttk.Label(frame, text="Account ID:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.account_id_entry = ttk.Entry(frame, width=40)
-        self.account_id_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        # 内容
+        ttk.Label(frame, text="内容:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.content_entry = ttk.Entry(frame, width=40)
+        self.content_entry.insert(0, self.record_data.get('content', ''))
+        self.content_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
         
-        # 默认填充当前账号的 Account ID
-        current_account = config.get_current_account()
-        if current_account and current_account.get('account_id'):
-            self.account_id_entry.insert(0, current_account['account_id'])
+        current_row = 3
         
-        ttk.Label(frame, text="(可选，留空则添加到默认账号)", foreground="gray").grid(row=3, column=1, sticky=tk.W)
+        # MX记录的优先级
+        if record_type == 'MX':
+            ttk.Label(frame, text="优先级:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+            self.priority_entry = ttk.Entry(frame, width=15)
+            priority = self.record_data.get('priority', 10)
+            self.priority_entry.insert(0, str(priority))
+            self.priority_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+            current_row += 1
+        else:
+            self.priority_entry = None
+        
+        # SRV记录的额外字段
+        if record_type == 'SRV':
+            # 优先级
+            ttk.Label(frame, text="优先级:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+            self.priority_entry = ttk.Entry(frame, width=15)
+            self.priority_entry.insert(0, str(self.record_data.get('priority', 0)))
+            self.priority_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+            current_row += 1
+            
+            # 权重
+            ttk.Label(frame, text="权重:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+            self.weight_entry = ttk.Entry(frame, width=15)
+            srv_data = self.record_data.get('data', {})
+            self.weight_entry.insert(0, str(srv_data.get('weight', 0)))
+            self.weight_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+            current_row += 1
+            
+            # 端口
+            ttk.Label(frame, text="端口:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+            self.port_entry = ttk.Entry(frame, width=15)
+            self.port_entry.insert(0, str(srv_data.get('port', 0)))
+            self.port_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+            current_row += 1
+        else:
+            self.weight_entry = None
+            self.port_entry = None
+        
+        # 代理选项（只对A、AAAA和CNAME记录显示）
+        if record_type in PROXIABLE_TYPES:
+            self.proxy_var = tk.BooleanVar(value=self.record_data.get('proxied', False))
+            proxy_text = "启用代理" if record_type in ['A', 'AAAA'] else "启用代理 (CNAME记录)"
+            ttk.Checkbutton(frame, text=proxy_text, 
+                           variable=self.proxy_var).grid(row=current_row, column=0, columnspan=2, sticky=tk.W, pady=5)
+        else:
+            self.proxy_var = None
+            ttk.Label(frame, text=f"({record_type} 记录不支持代理)", 
+                     foreground="gray").grid(row=current_row, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        current_row += 1
+        
+        # TTL
+        ttl_label = "TTL:" if record_type != 'A' and record_type != 'AAAA' else "TTL (代理开启时自动为Auto):"
+        ttk.Label(frame, text=ttl_label).grid(row=current_row, column=0, sticky=tk.W, pady=5)
+        self.ttl_combo = ttk.Combobox(frame, width=15, state="readonly")
+        self.ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
+        
+        current_ttl = self.record_data.get('ttl', 1)
+        if current_ttl == 1:
+            self.ttl_combo.current(0)  # Auto
+        elif str(current_ttl) in self.ttl_combo['values']:
+            self.ttl_combo.set(str(current_ttl))
+        else:
+            self.ttl_combo.current(0)
+        
+        self.ttl_combo.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        current_row += 1
         
         # 按钮
         btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        btn_frame.grid(row=current_row, column=0, columnspan=2, pady=20)
         
-        ttk.Button(btn_frame, text="添加", command=self.add_domain).pack(side=tk.LEFT, padx=5)
+        self.save_btn = ttk.Button(btn_frame, text="保存", command=self.save_record)
+        self.save_btn.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
         
         frame.columnconfigure(1, weight=1)
-        
-        self.domain_entry.bind("<Return>", lambda e: self.add_domain())
     
-    def add_domain(self):
-        """添加域名"""
-        domain = self.domain_entry.get().strip()
-        account_id = self.account_id_entry.get().strip()
+    def save_record(self):
+        """保存修改"""
+        name = self.name_entry.get().strip()
+        content = self.content_entry.get().strip()
+        ttl_str = self.ttl_combo.get()
+        ttl = 1 if ttl_str == 'Auto' else int(ttl_str)
+        record_type = self.record_data.get('type')
         
-        if not domain:
-            messagebox.showwarning("警告", "请输入域名")
+        if not name or not content:
+            messagebox.showwarning("警告", "名称和内容不能为空")
             return
         
-        result, error = self.api.add_zone(domain, account_id if account_id else None)
+        # 构建更新数据
+        data = {
+            "type": record_type,
+            "name": name,
+            "content": content,
+            "ttl": ttl
+        }
+        
+        # 如果支持代理，添加代理状态
+        if self.proxy_var:
+            data["proxied"] = self.proxy_var.get()
+            # 如果开启代理，TTL必须为1
+            if data["proxied"]:
+                data["ttl"] = 1
+        else:
+            data["proxied"] = self.record_data.get('proxied', False)
+        
+        # MX记录的优先级
+        if record_type == 'MX' and self.priority_entry:
+            try:
+                priority = int(self.priority_entry.get().strip())
+                data['priority'] = priority
+            except ValueError:
+                messagebox.showwarning("警告", "优先级必须是数字")
+                return
+        
+        # SRV记录的额外字段
+        if record_type == 'SRV':
+            try:
+                if self.priority_entry:
+                    data['priority'] = int(self.priority_entry.get().strip())
+                
+                srv_data = {}
+                if self.weight_entry:
+                    srv_data['weight'] = int(self.weight_entry.get().strip())
+                if self.port_entry:
+                    srv_data['port'] = int(self.port_entry.get().strip())
+                
+                # SRV记录还需要service、proto和target
+                if self.record_data.get('data'):
+                    old_data = self.record_data.get('data', {})
+                    srv_data['service'] = old_data.get('service', '_service')
+                    srv_data['proto'] = old_data.get('proto', '_tcp')
+                    srv_data['name'] = name
+                    srv_data['target'] = content
+                
+                data['data'] = srv_data
+            except ValueError:
+                messagebox.showwarning("警告", "优先级、权重和端口必须是数字")
+                return
+        
+        # 在后台发送更新请求
+        self.save_btn.config(state=tk.DISABLED)
+        api = self.api
+        endpoint = f"/zones/{self.zone_id}/dns_records/{self.record_id}"
+        self.runner.submit(lambda: api._request("PATCH", endpoint, data), self.on_record_saved)
+    
+    def on_record_saved(self, result):
+        """更新请求完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.save_btn.config(state=tk.NORMAL)
+        _, error = result
         
         if error:
-            messagebox.showerror("错误", f"添加域名失败: {error}")
+            messagebox.showerror("错误", f"更新DNS记录失败: {error}", parent=self.dialog)
         else:
             self.success = True
-            name_servers = result.get('name_servers', [])
-            
-            msg = f"域名 {domain} 添加成功!\n\n"
-            if name_servers:
-                msg += "请将域名的DNS服务器更改为:\n\n"
-                for ns in name_servers:
-                    msg += f"  • {ns}\n"
-            
-            messagebox.showinfo("成功", msg)
+            messagebox.showinfo("成功", "DNS记录更新成功", parent=self.dialog)
             self.dialog.destroy()
 
 
-class BatchAddDialog:
-    """批量添加域名对话框"""
-    def __init__(self, parent, api):
+class BatchAddRecordsDialog:
+    """批量添加DNS记录对话框：任务保存为可恢复的任务文件，提交到任务队列在后台执行"""
+    def __init__(self, parent, api, zone_id):
         self.api = api
-        self.success = False
+        self.zone_id = zone_id
+        self.job = None  # 提交到任务队列的 ScheduledJob
+        self.record_rows = []  # 存储所有记录行
         
         self.dialog = tk.Toplevel(parent)
-        self.dialog.title("批量添加域名")
-        self.dialog.geometry("700x600")
+        self.dialog.title("批量添加DNS记录")
+        self.dialog.geometry("1000x700")
         self.dialog.transient(parent)
         self.dialog.grab_set()
         
@@ -898,414 +4440,517 @@ class BatchAddDialog:
         
         # 居中显示
         center_window(self.dialog, parent)
+        
+        self.dialog.after_idle(self.offer_resume)
     
     def setup_ui(self):
         """设置界面"""
-        frame = ttk.Frame(self.dialog, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Account ID
-        account_frame = ttk.Frame(frame)
-        account_frame.pack(fill=tk.X, pady=(0, 10))
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
         
-        ttk.Label(account_frame, text="Account ID:").pack(side=tk.LEFT)
-        self.account_id_entry = ttk.Entry(account_frame, width=40)
-        self.account_id_entry.pack(side=tk.LEFT, padx=(10, 0), fill=tk.X, expand=True)
+        # 顶部说明
+        instruction = ttk.Label(main_frame, 
+                               text="批量添加DNS记录 - 使用表格方式输入多条记录",
+                               font=('TkDefaultFont', 10, 'bold'),
+                               foreground="blue")
+        instruction.pack(anchor=tk.W, pady=(0, 10))
         
-        # 默认填充当前账号的 Account ID
-        current_account = config.get_current_account()
-        if current_account and current_account.get('account_id'):
-            self.account_id_entry.insert(0, current_account['account_id'])
+        # 按钮栏
+        btn_top_frame = ttk.Frame(main_frame)
+        btn_top_frame.pack(fill=tk.X, pady=(0, 5))
         
-        ttk.Label(frame, text="域名列表 (每行一个):").pack(anchor=tk.W, pady=(0, 5))
+        ttk.Button(btn_top_frame, text="➕ 添加一行", command=self.add_row).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_top_frame, text="➕ 添加5行", command=lambda: self.add_multiple_rows(5)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_top_frame, text="🗑️ 删除选中行", command=self.delete_selected_rows).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_top_frame, text="🧹 清空所有", command=self.clear_all_rows).pack(side=tk.LEFT, padx=2)
         
-        self.domain_text = scrolledtext.ScrolledText(frame, width=70, height=15)
-        self.domain_text.pack(fill=tk.BOTH, expand=True)
+        # 创建滚动区域
+        scroll_frame = ttk.Frame(main_frame)
+        scroll_frame.pack(fill=tk.BOTH, expand=True)
         
-        ttk.Label(frame, text="示例:\nexample.com\ntest.com\nmysite.org", 
-                 foreground="gray", justify=tk.LEFT).pack(anchor=tk.W, pady=(5, 0))
+        # 创建Canvas和Scrollbar
+        canvas = tk.Canvas(scroll_frame, height=500)
+        scrollbar_y = ttk.Scrollbar(scroll_frame, orient=tk.VERTICAL, command=canvas.yview)
+        scrollbar_x = ttk.Scrollbar(scroll_frame, orient=tk.HORIZONTAL, command=canvas.xview)
         
-        # 按钮
-        btn_frame = ttk.Frame(frame)
-        btn_frame.pack(pady=10)
+        self.records_frame = ttk.Frame(canvas)
         
-        ttk.Button(btn_frame, text="开始添加", command=self.batch_add).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        # 配置Canvas
+        canvas.create_window((0, 0), window=self.records_frame, anchor=tk.NW)
+        canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
         
-        # 进度
-        self.progress_label = ttk.Label(frame, text="")
-        self.progress_label.pack()
-    
-    def batch_add(self):
-        """批量添加域名"""
-        content = self.domain_text.get(1.0, tk.END).strip()
-        account_id = self.account_id_entry.get().strip()
+        # 布局
+        canvas.grid(row=0, column=0, sticky=(tk.N, tk.S, tk.E, tk.W))
+        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        scrollbar_x.grid(row=1, column=0, sticky=(tk.E, tk.W))
         
-        if not content:
-            messagebox.showwarning("警告", "请输入域名")
-            return
+        scroll_frame.grid_rowconfigure(0, weight=1)
+        scroll_frame.grid_columnconfigure(0, weight=1)
         
-        domains = [line.strip() for line in content.split('\n') if line.strip()]
+        self.canvas = canvas
         
-        if not domains:
-            messagebox.showwarning("警告", "没有有效的域名")
-            return
+        # 表头
+        self.create_header()
         
-        if not messagebox.askyesno("确认", f"确定要添加 {len(domains)} 个域名吗?"):
-            return
+        # 添加初始行
+        self.add_multiple_rows(5)
         
-        success_count = 0
-        fail_count = 0
-        results = []
+        # 更新滚动区域
+        self.records_frame.update_idletasks()
+        canvas.configure(scrollregion=canvas.bbox("all"))
         
-        for i, domain in enumerate(domains, 1):
-            self.progress_label.config(text=f"正在添加 {i}/{len(domains)}: {domain}")
-            self.dialog.update()
-            
-            result, error = self.api.add_zone(domain, account_id if account_id else None)
-            
-            if error:
-                fail_count += 1
-                results.append(f"❌ {domain}: {error}")
-            else:
-                success_count += 1
-                name_servers = result.get('name_servers', [])
-                ns_info = ', '.join(name_servers) if name_servers else '无'
-                results.append(f"✓ {domain}: {ns_info}")
+        # 底部按钮
+        bottom_frame = ttk.Frame(main_frame)
+        bottom_frame.pack(fill=tk.X, pady=(10, 0))
         
-        self.success = success_count > 0
+        ttk.Button(bottom_frame, text="✅ 开始添加", 
+                  command=self.batch_add, 
+                  style='Accent.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(bottom_frame, text="❌ 取消", 
+                  command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def create_header(self):
+        """创建表头"""
+        header_frame = ttk.Frame(self.records_frame, relief=tk.RAISED, borderwidth=1)
+        header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=2, pady=2)
         
-        # 显示结果
-        result_dialog = tk.Toplevel(self.dialog)
-        result_dialog.title("批量添加结果")
-        result_dialog.geometry("800x500")
-        result_dialog.transient(self.dialog)
+        headers = [
+            ("☑", 3),      # 选择框
+            ("类型", 10),
+            ("名称", 20),
+            ("内容", 30),
+            ("代理", 8),
+            ("TTL", 10),
+            ("优先级", 8)
+        ]
         
-        result_frame = ttk.Frame(result_dialog, padding="20")
-        result_frame.pack(fill=tk.BOTH, expand=True)
+        for col, (text, width) in enumerate(headers):
+            label = ttk.Label(header_frame, text=text, font=('TkDefaultFont', 9, 'bold'), width=width)
+            label.grid(row=0, column=col, padx=2, pady=5, sticky=tk.W)
+    
+    def add_row(self):
+        """添加一行输入"""
+        row_num = len(self.record_rows) + 1  # +1 因为第0行是表头
         
-        summary = f"成功: {success_count}, 失败: {fail_count}\n\n"
-        ttk.Label(result_frame, text=summary, font=('TkDefaultFont', 10, 'bold')).pack(anchor=tk.W)
+        row_frame = ttk.Frame(self.records_frame)
+        row_frame.grid(row=row_num, column=0, sticky=(tk.W, tk.E), padx=2, pady=1)
         
-        result_text = scrolledtext.ScrolledText(result_frame, width=90, height=20)
-        result_text.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        # 选择框
+        selected_var = tk.BooleanVar(value=False)
+        cb = ttk.Checkbutton(row_frame, variable=selected_var, width=3)
+        cb.grid(row=0, column=0, padx=2)
         
-        for line in results:
-            result_text.insert(tk.END, line + '\n')
+        # 类型下拉框
+        type_combo = ttk.Combobox(row_frame, width=8, state="readonly")
+        type_combo['values'] = ('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SRV', 'CAA')
+        type_combo.current(0)
+        type_combo.grid(row=0, column=1, padx=2)
         
-        result_text.config(state=tk.DISABLED)
+        # 名称输入框
+        name_entry = ttk.Entry(row_frame, width=18)
+        name_entry.insert(0, "@")
+        name_entry.grid(row=0, column=2, padx=2)
         
-        ttk.Button(result_frame, text="关闭", 
-                  command=lambda: [result_dialog.destroy(), self.dialog.destroy()]).pack(pady=(10, 0))
-
-
-class AddRecordDialog:
-    """添加DNS记录对话框"""
-    def __init__(self, parent, api, zone_id):
-        self.api = api
-        self.zone_id = zone_id
-        self.success = False
+        # 内容输入框
+        content_entry = ttk.Entry(row_frame, width=28)
+        content_entry.grid(row=0, column=3, padx=2)
         
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title("添加DNS记录")
-        self.dialog.geometry("500x300")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
+        # 代理下拉框
+        proxy_combo = ttk.Combobox(row_frame, width=6, state="readonly")
+        proxy_combo['values'] = ('关闭', '开启')
+        proxy_combo.current(0)
+        proxy_combo.grid(row=0, column=4, padx=2)
         
-        self.setup_ui()
+        # TTL下拉框
+        ttl_combo = ttk.Combobox(row_frame, width=8, state="readonly")
+        ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
+        ttl_combo.current(0)
+        ttl_combo.grid(row=0, column=5, padx=2)
         
-        # 居中显示
-        center_window(self.dialog, parent)
-    
-    def setup_ui(self):
-        """设置界面"""
-        frame = ttk.Frame(self.dialog, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
+        # 优先级输入框（仅MX和SRV需要）
+        priority_entry = ttk.Entry(row_frame, width=6)
+        priority_entry.grid(row=0, column=6, padx=2)
         
-        # 类型
-        ttk.Label(frame, text="类型:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.type_combo = ttk.Combobox(frame, width=15, state="readonly")
-        self.type_combo['values'] = ('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SRV')
-        self.type_combo.current(0)
-        self.type_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        # 保存行数据
+        row_data = {
+            'frame': row_frame,
+            'selected': selected_var,
+            'type': type_combo,
+            'name': name_entry,
+            'content': content_entry,
+            'proxy': proxy_combo,
+            'ttl': ttl_combo,
+            'priority': priority_entry
+        }
         
-        # 名称
-        ttk.Label(frame, text="名称:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.name_entry = ttk.Entry(frame, width=40)
-        self.name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        self.record_rows.append(row_data)
         
-        # 内容
-        ttk.Label(frame, text="内容:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.content_entry = ttk.Entry(frame, width=40)
-        self.content_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        # 更新Canvas滚动区域
+        self.records_frame.update_idletasks()
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    
+    def add_multiple_rows(self, count):
+        """添加多行"""
+        for _ in range(count):
+            self.add_row()
+    
+    def delete_selected_rows(self):
+        """删除选中的行"""
+        # 从后向前删除，避免索引问题
+        for i in range(len(self.record_rows) - 1, -1, -1):
+            if self.record_rows[i]['selected'].get():
+                self.record_rows[i]['frame'].destroy()
+                self.record_rows.pop(i)
         
-        # 代理
-        self.proxy_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(frame, text="启用代理 (仅支持A、AAAA、CNAME记录)", 
-                       variable=self.proxy_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+        # 重新编号
+        for i, row_data in enumerate(self.record_rows):
+            row_data['frame'].grid(row=i + 1, column=0, sticky=(tk.W, tk.E), padx=2, pady=1)
         
-        # TTL
-        ttk.Label(frame, text="TTL:").grid(row=4, column=0, sticky=tk.W, pady=5)
-        self.ttl_combo = ttk.Combobox(frame, width=15, state="readonly")
-        self.ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
-        self.ttl_combo.current(0)
-        self.ttl_combo.grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        # 更新Canvas滚动区域
+        self.records_frame.update_idletasks()
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    
+    def clear_all_rows(self):
+        """清空所有行"""
+        if not messagebox.askyesno("确认", "确定要清空所有记录吗？"):
+            return
         
-        # 按钮
-        btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
+        for row_data in self.record_rows:
+            row_data['frame'].destroy()
         
-        ttk.Button(btn_frame, text="添加", command=self.add_record).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        self.record_rows.clear()
         
-        frame.columnconfigure(1, weight=1)
+        # 更新Canvas滚动区域
+        self.records_frame.update_idletasks()
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
     
-    def add_record(self):
-        """添加DNS记录"""
-        record_type = self.type_combo.get()
-        name = self.name_entry.get().strip()
-        content = self.content_entry.get().strip()
-        proxied = self.proxy_var.get()
-        ttl_str = self.ttl_combo.get()
-        ttl = 1 if ttl_str == 'Auto' else int(ttl_str)
+    @journaled("批量添加DNS记录")
+    def batch_add(self):
+        """批量添加DNS记录"""
+        # 收集所有非空行
+        records_to_add = []
         
-        if not name or not content:
-            messagebox.showwarning("警告", "请填写所有必填字段")
+        for i, row_data in enumerate(self.record_rows):
+            record_type = row_data['type'].get()
+            name = row_data['name'].get().strip()
+            content = row_data['content'].get().strip()
+            
+            # 跳过空行
+            if not name and not content:
+                continue
+            
+            # 验证必填字段
+            if not name or not content:
+                messagebox.showwarning("警告", f"第 {i+1} 行：名称和内容不能为空！")
+                return
+            
+            # 获取代理状态
+            proxy_text = row_data['proxy'].get()
+            proxied = (proxy_text == '开启')
+            
+            # 获取TTL
+            ttl_text = row_data['ttl'].get()
+            if ttl_text.lower() in ['auto', 'automatic']:
+                ttl = 1
+            else:
+                try:
+                    ttl = int(ttl_text)
+                except ValueError:
+                    ttl = 1
+            
+            # 获取优先级
+            priority_text = row_data['priority'].get().strip()
+            priority = None
+            if priority_text and record_type in ['MX', 'SRV', 'URI']:
+                try:
+                    priority = int(priority_text)
+                except ValueError:
+                    pass
+            
+            records_to_add.append((i + 1, record_type, name, content, proxied, ttl, priority))
+        
+        if not records_to_add:
+            messagebox.showwarning("警告", "请至少输入一条DNS记录！")
             return
         
-        result, error = self.api.add_dns_record(self.zone_id, record_type, name, content, proxied, ttl)
+        # 确认
+        if not messagebox.askyesno("确认", f"确定要添加 {len(records_to_add)} 条DNS记录吗？"):
+            return
         
-        if error:
-            messagebox.showerror("错误", f"添加DNS记录失败: {error}")
+        items = [{'row': row_num, 'type': record_type, 'name': name, 'content': content,
+                  'proxied': proxied, 'ttl': ttl, 'priority': priority}
+                 for row_num, record_type, name, content, proxied, ttl, priority in records_to_add]
+        account = config.get_current_account()
+        job = BatchJob.create("add_records", "批量添加DNS记录",
+                              {'credential': credential_id(account) if account else None, 'zone_id': self.zone_id},
+                              items)
+        self.submit(job)
+    
+    def offer_resume(self):
+        """当前账号在该域名下有未完成的批量添加任务时提示继续"""
+        account = config.get_current_account()
+        if not account:
+            return
+        jobs = BatchJob.unfinished("add_records", credential=credential_id(account), zone_id=self.zone_id)
+        if not jobs:
+            return
+        if messagebox.askyesno("继续未完成的任务",
+                               f"发现该域名未完成的批量任务:\n\n{jobs[0].describe()}\n\n"
+                               "是否继续？已添加成功的记录不会重复提交；选择“否”将放弃该任务。",
+                               parent=self.dialog):
+            self.resume(jobs[0])
         else:
-            self.success = True
-            messagebox.showinfo("成功", "DNS记录添加成功")
-            self.dialog.destroy()
+            jobs[0].abandon()
+    
+    @journaled("批量添加DNS记录（继续）")
+    def resume(self, job):
+        self.submit(job)
+    
+    def submit(self, job):
+        """把任务提交到任务队列并关闭对话框（进度和结果在任务队列中查看）"""
+        self.job = scheduler.submit(f"批量添加DNS记录 ({len(job.items)} 条)",
+                                    lambda control: run_add_records_job(self.api, job, control),
+                                    key=job.path)
+        self.dialog.destroy()
 
 
-class EditRecordDialog:
-    """修改DNS记录对话框"""
-    def __init__(self, parent, api, zone_id, record_id):
+class BatchEditRecordsDialog:
+    """批量修改DNS记录对话框"""
+    def __init__(self, parent, api, zone_id, selected_records, on_done=None):
         self.api = api
         self.zone_id = zone_id
-        self.record_id = record_id
-        self.success = False
-        self.record_data = None
+        self.selected_records = selected_records  # [(record_id, record_data), ...]
+        self.on_done = on_done  # 任务结束时调用 on_done(ScheduledJob)（工作线程）
+        self.job = None  # 提交到任务队列的 ScheduledJob
         
         self.dialog = tk.Toplevel(parent)
-        self.dialog.title("修改DNS记录")
-        self.dialog.geometry("500x300")
+        self.dialog.title(f"批量修改DNS记录 (已选择 {len(selected_records)} 条)")
+        self.dialog.geometry("700x500")
         self.dialog.transient(parent)
         self.dialog.grab_set()
         
-        # 先获取记录数据
-        self.load_record_data()
+        self.setup_ui()
         
-        if self.record_data:
-            self.setup_ui()
-            
-            # 居中显示
-            center_window(self.dialog, parent)
-    
-    def load_record_data(self):
-        """加载记录数据"""
-        result, error = self.api._request("GET", f"/zones/{self.zone_id}/dns_records/{self.record_id}")
-        if error:
-            messagebox.showerror("错误", f"获取记录信息失败: {error}")
-            self.dialog.destroy()
-        else:
-            self.record_data = result
+        # 居中显示
+        center_window(self.dialog, parent)
     
     def setup_ui(self):
         """设置界面"""
         frame = ttk.Frame(self.dialog, padding="20")
         frame.pack(fill=tk.BOTH, expand=True)
         
-        # 类型（只读，显示为标签）
-        ttk.Label(frame, text="类型:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        record_type = self.record_data.get('type', '')
-        type_label = ttk.Label(frame, text=record_type, 
-                              foreground="blue", font=('TkDefaultFont', 10, 'bold'))
-        type_label.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        # 说明
+        ttk.Label(frame, text="批量修改选中的DNS记录", 
+                 font=('TkDefaultFont', 10, 'bold')).pack(anchor=tk.W, pady=(0, 10))
         
-        # 名称
-        ttk.Label(frame, text="名称:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.name_entry = ttk.Entry(frame, width=40)
-        self.name_entry.insert(0, self.record_data.get('name', ''))
-        self.name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        # 显示选中的记录
+        list_frame = ttk.LabelFrame(frame, text="选中的记录", padding="10")
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        # 内容
-        ttk.Label(frame, text="内容:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.content_entry = ttk.Entry(frame, width=40)
-        self.content_entry.insert(0, self.record_data.get('content', ''))
-        self.content_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        list_text = scrolledtext.ScrolledText(list_frame, height=8, wrap=tk.WORD)
+        list_text.pack(fill=tk.BOTH, expand=True)
         
-        current_row = 3
+        for record_id, record_data in self.selected_records:
+            record_type = record_data.get('type', '')
+            name = record_data.get('name', '')
+            content = record_data.get('content', '')
+            list_text.insert(tk.END, f"{record_type} | {name} | {content}\n")
         
-        # MX记录的优先级
-        if record_type == 'MX':
-            ttk.Label(frame, text="优先级:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
-            self.priority_entry = ttk.Entry(frame, width=15)
-            priority = self.record_data.get('priority', 10)
-            self.priority_entry.insert(0, str(priority))
-            self.priority_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-            current_row += 1
-        else:
-            self.priority_entry = None
+        list_text.config(state=tk.DISABLED)
         
-        # SRV记录的额外字段
-        if record_type == 'SRV':
-            # 优先级
-            ttk.Label(frame, text="优先级:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
-            self.priority_entry = ttk.Entry(frame, width=15)
-            self.priority_entry.insert(0, str(self.record_data.get('priority', 0)))
-            self.priority_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-            current_row += 1
-            
-            # 权重
-            ttk.Label(frame, text="权重:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
-            self.weight_entry = ttk.Entry(frame, width=15)
-            srv_data = self.record_data.get('data', {})
-            self.weight_entry.insert(0, str(srv_data.get('weight', 0)))
-            self.weight_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-            current_row += 1
-            
-            # 端口
-            ttk.Label(frame, text="端口:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
-            self.port_entry = ttk.Entry(frame, width=15)
-            self.port_entry.insert(0, str(srv_data.get('port', 0)))
-            self.port_entry.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-            current_row += 1
-        else:
-            self.weight_entry = None
-            self.port_entry = None
+        # 修改选项
+        options_frame = ttk.LabelFrame(frame, text="修改选项", padding="10")
+        options_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # 代理选项（只对A、AAAA和CNAME记录显示）
-        if record_type in ['A', 'AAAA', 'CNAME']:
-            self.proxy_var = tk.BooleanVar(value=self.record_data.get('proxied', False))
-            proxy_text = "启用代理" if record_type in ['A', 'AAAA'] else "启用代理 (CNAME记录)"
-            ttk.Checkbutton(frame, text=proxy_text, 
-                           variable=self.proxy_var).grid(row=current_row, column=0, columnspan=2, sticky=tk.W, pady=5)
-        else:
-            self.proxy_var = None
-            ttk.Label(frame, text=f"({record_type} 记录不支持代理)", 
-                     foreground="gray").grid(row=current_row, column=0, columnspan=2, sticky=tk.W, pady=5)
+        # TTL修改
+        ttl_frame = ttk.Frame(options_frame)
+        ttl_frame.pack(fill=tk.X, pady=5)
         
-        current_row += 1
+        self.change_ttl_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(ttl_frame, text="修改TTL为:", 
+                       variable=self.change_ttl_var).pack(side=tk.LEFT)
         
-        # TTL
-        ttl_label = "TTL:" if record_type != 'A' and record_type != 'AAAA' else "TTL (代理开启时自动为Auto):"
-        ttk.Label(frame, text=ttl_label).grid(row=current_row, column=0, sticky=tk.W, pady=5)
-        self.ttl_combo = ttk.Combobox(frame, width=15, state="readonly")
+        self.ttl_combo = ttk.Combobox(ttl_frame, width=15, state="readonly")
         self.ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
+        self.ttl_combo.current(0)
+        self.ttl_combo.pack(side=tk.LEFT, padx=(10, 0))
         
-        current_ttl = self.record_data.get('ttl', 1)
-        if current_ttl == 1:
-            self.ttl_combo.current(0)  # Auto
-        elif str(current_ttl) in self.ttl_combo['values']:
-            self.ttl_combo.set(str(current_ttl))
-        else:
-            self.ttl_combo.current(0)
+        # 代理修改
+        proxy_frame = ttk.Frame(options_frame)
+        proxy_frame.pack(fill=tk.X, pady=5)
         
-        self.ttl_combo.grid(row=current_row, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        current_row += 1
+        self.change_proxy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(proxy_frame, text="修改代理状态为:", 
+                       variable=self.change_proxy_var).pack(side=tk.LEFT)
+        
+        self.proxy_combo = ttk.Combobox(proxy_frame, width=15, state="readonly")
+        self.proxy_combo['values'] = ('开启', '关闭')
+        self.proxy_combo.current(0)
+        self.proxy_combo.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # 内容替换
+        replace_frame = ttk.Frame(options_frame)
+        replace_frame.pack(fill=tk.X, pady=5)
+        
+        self.replace_content_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(replace_frame, text="内容替换:", 
+                       variable=self.replace_content_var).pack(side=tk.LEFT)
+        
+        ttk.Label(replace_frame, text="查找:").pack(side=tk.LEFT, padx=(10, 5))
+        self.find_entry = ttk.Entry(replace_frame, width=15)
+        self.find_entry.pack(side=tk.LEFT)
+        
+        ttk.Label(replace_frame, text="替换为:").pack(side=tk.LEFT, padx=(10, 5))
+        self.replace_entry = ttk.Entry(replace_frame, width=15)
+        self.replace_entry.pack(side=tk.LEFT)
+        
+        # 提示
+        ttk.Label(options_frame, text=f"注意：只有{'、'.join(PROXIABLE_TYPES)}记录支持代理功能", 
+                 foreground="orange", font=('TkDefaultFont', 8)).pack(anchor=tk.W, pady=(5, 0))
         
         # 按钮
         btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=current_row, column=0, columnspan=2, pady=20)
+        btn_frame.pack(pady=(10, 0))
         
-        ttk.Button(btn_frame, text="保存", command=self.save_record).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="开始修改", command=self.batch_edit).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
-        
-        frame.columnconfigure(1, weight=1)
     
-    def save_record(self):
-        """保存修改"""
-        name = self.name_entry.get().strip()
-        content = self.content_entry.get().strip()
-        ttl_str = self.ttl_combo.get()
-        ttl = 1 if ttl_str == 'Auto' else int(ttl_str)
-        record_type = self.record_data.get('type')
-        
-        if not name or not content:
-            messagebox.showwarning("警告", "名称和内容不能为空")
+    @journaled("批量修改DNS记录")
+    def batch_edit(self):
+        """批量修改DNS记录"""
+        # 检查是否选择了任何修改选项
+        if not (self.change_ttl_var.get() or self.change_proxy_var.get() or self.replace_content_var.get()):
+            messagebox.showwarning("警告", "请至少选择一个修改选项")
             return
         
-        # 构建更新数据
-        data = {
-            "type": record_type,
-            "name": name,
-            "content": content,
-            "ttl": ttl
-        }
+        # 确认
+        modifications = []
+        if self.change_ttl_var.get():
+            modifications.append(f"TTL修改为 {self.ttl_combo.get()}")
+        if self.change_proxy_var.get():
+            modifications.append(f"代理状态修改为 {self.proxy_combo.get()}")
+        if self.replace_content_var.get():
+            modifications.append(f"内容替换：'{self.find_entry.get()}' → '{self.replace_entry.get()}'")
         
-        # 如果支持代理，添加代理状态
-        if self.proxy_var:
-            data["proxied"] = self.proxy_var.get()
-            # 如果开启代理，TTL必须为1
-            if data["proxied"]:
-                data["ttl"] = 1
-        else:
-            data["proxied"] = self.record_data.get('proxied', False)
+        confirm_msg = f"确定要对 {len(self.selected_records)} 条记录进行以下修改吗？\n\n" + "\n".join(modifications)
         
-        # MX记录的优先级
-        if record_type == 'MX' and self.priority_entry:
-            try:
-                priority = int(self.priority_entry.get().strip())
-                data['priority'] = priority
-            except ValueError:
-                messagebox.showwarning("警告", "优先级必须是数字")
-                return
+        if not messagebox.askyesno("确认", confirm_msg):
+            return
         
-        # SRV记录的额外字段
-        if record_type == 'SRV':
+        results = []
+        fail_count = 0
+        pending = []  # [(record_id, record_data, changes), ...]
+        
+        # 先在本地计算每条记录的字段级差异，无变化的记录不发送请求
+        for record_id, record_data in self.selected_records:
+            record_type = record_data.get('type')
+            name = record_data.get('name')
+            content = record_data.get('content')
+            
             try:
-                if self.priority_entry:
-                    data['priority'] = int(self.priority_entry.get().strip())
+                desired = {}
                 
-                srv_data = {}
-                if self.weight_entry:
-                    srv_data['weight'] = int(self.weight_entry.get().strip())
-                if self.port_entry:
-                    srv_data['port'] = int(self.port_entry.get().strip())
+                # TTL修改
+                if self.change_ttl_var.get():
+                    ttl_str = self.ttl_combo.get()
+                    desired['ttl'] = 1 if ttl_str == 'Auto' else int(ttl_str)
                 
-                # SRV记录还需要service、proto和target
-                if self.record_data.get('data'):
-                    old_data = self.record_data.get('data', {})
-                    srv_data['service'] = old_data.get('service', '_service')
-                    srv_data['proto'] = old_data.get('proto', '_tcp')
-                    srv_data['name'] = name
-                    srv_data['target'] = content
+                # 代理修改
+                if self.change_proxy_var.get():
+                    if record_type not in PROXIABLE_TYPES:
+                        results.append(f"[跳过] {record_type} {name}: 不支持代理")
+                        continue
+                    
+                    desired['proxied'] = self.proxy_combo.get() == '开启'
+                    if desired['proxied']:
+                        desired['ttl'] = 1  # 代理开启时TTL必须为1
                 
-                data['data'] = srv_data
-            except ValueError:
-                messagebox.showwarning("警告", "优先级、权重和端口必须是数字")
-                return
+                # 内容替换
+                if self.replace_content_var.get():
+                    find_text = self.find_entry.get()
+                    replace_text = self.replace_entry.get()
+                    if find_text and content and find_text in content:
+                        desired['content'] = content.replace(find_text, replace_text)
+                
+                changes = diff_record(record_data, desired)
+            except Exception as e:
+                results.append(f"[错误] {name}: {str(e)}")
+                fail_count += 1
+                continue
+            
+            if not changes:
+                results.append(f"[跳过] {record_type} {name}: 无需修改")
+                continue
+            
+            pending.append((record_id, record_data, changes))
+        
+        if not pending:
+            # 没有记录需要修改时不提交任务，对话框保持打开以便调整选项
+            show = messagebox.showwarning if fail_count else messagebox.showinfo
+            show("提示", "选中的记录无需修改\n\n" + "\n".join(results[:20]), parent=self.dialog)
+            return
+        
+        # 提交到任务队列并关闭对话框（进度和结果在任务队列中查看）
+        self.job = scheduler.submit(f"批量修改DNS记录 ({len(self.selected_records)} 条)",
+                                    lambda control: self.run(pending, results, fail_count, control),
+                                    on_done=self.on_done)
+        self.dialog.destroy()
+    
+    def run(self, pending, results, fail_count, control):
+        """任务线程：分批提交修改；暂停或取消后不再提交新的批次"""
+        for line in results:
+            control.log(line)
         
-        # 发送更新请求
-        result, error = self.api._request("PATCH", f"/zones/{self.zone_id}/dns_records/{self.record_id}", data)
+        success_count = 0
+        total = len(pending)
+        done = 0
+        control.progress(0, total)
         
-        if error:
-            messagebox.showerror("错误", f"更新DNS记录失败: {error}")
-        else:
-            self.success = True
-            messagebox.showinfo("成功", "DNS记录更新成功")
-            self.dialog.destroy()
+        for chunk in chunked(pending, BATCH_SIZE):
+            if control.is_set():
+                break
+            
+            patches = [dict(changes, id=record_id) for record_id, _, changes in chunk]
+            try:
+                outcome = self.api.apply_record_patches(self.zone_id, patches)
+            except Exception as e:
+                # 一批出错只影响这一批，其余批次继续提交
+                outcome = {record_id: f"请求错误: {str(e)}" for record_id, _, _ in chunk}
+            
+            for record_id, record_data, changes in chunk:
+                record_type = record_data.get('type')
+                name = record_data.get('name')
+                error = outcome.get(record_id)
+                if error:
+                    control.log(f"[失败] {record_type} {name}: {error}")
+                    fail_count += 1
+                else:
+                    control.log(f"[成功] {record_type} {name}: 修改成功 ({', '.join(changes)})")
+                    success_count += 1
+            
+            done += len(chunk)
+            control.progress(done, total, f"正在修改 {done}/{total}")
+        
+        control.progress(message=f"成功: {success_count}, 失败: {fail_count}")
+        return success_count, None
 
 
-class BatchAddRecordsDialog:
-    """批量添加DNS记录对话框"""
-    def __init__(self, parent, api, zone_id):
-        self.api = api
-        self.zone_id = zone_id
+class BulkReplaceDialog:
+    """跨域名、跨账号批量查找替换记录内容对话框（扫描在任务队列中进行，不阻塞界面）"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.plan = []  # 待修改的记录 [{'account', 'api', 'zone_id', 'zone_name', 'record', 'new_content'}, ...]
         self.success = False
-        self.record_rows = []  # 存储所有记录行
+        self.scan_job = None  # 正在进行的扫描任务（ScheduledJob）
+        self.apply_job = None  # 正在进行的修改任务（ScheduledJob），关闭对话框不会取消
+        self.scanned = 0
+        self.scan_errors = []
         
         self.dialog = tk.Toplevel(parent)
-        self.dialog.title("批量添加DNS记录")
-        self.dialog.geometry("1000x700")
+        self.dialog.title("跨域名批量替换")
+        self.dialog.geometry("1000x650")
         self.dialog.transient(parent)
-        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
         
         self.setup_ui()
         
@@ -1314,320 +4959,599 @@ class BatchAddRecordsDialog:
     
     def setup_ui(self):
         """设置界面"""
-        main_frame = ttk.Frame(self.dialog, padding="10")
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
         
-        # 顶部说明
-        instruction = ttk.Label(main_frame, 
-                               text="批量添加DNS记录 - 使用表格方式输入多条记录",
-                               font=('TkDefaultFont', 10, 'bold'),
-                               foreground="blue")
-        instruction.pack(anchor=tk.W, pady=(0, 10))
+        top_frame = ttk.Frame(frame)
+        top_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # 按钮栏
-        btn_top_frame = ttk.Frame(main_frame)
-        btn_top_frame.pack(fill=tk.X, pady=(0, 5))
+        # 账号选择（可多选）
+        account_frame = ttk.LabelFrame(top_frame, text="扫描账号 (可多选)", padding="5")
+        account_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
         
-        ttk.Button(btn_top_frame, text="➕ 添加一行", command=self.add_row).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_top_frame, text="➕ 添加5行", command=lambda: self.add_multiple_rows(5)).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_top_frame, text="🗑️ 删除选中行", command=self.delete_selected_rows).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_top_frame, text="🧹 清空所有", command=self.clear_all_rows).pack(side=tk.LEFT, padx=2)
+        self.account_listbox = tk.Listbox(account_frame, selectmode=tk.EXTENDED, height=6, width=30, exportselection=False)
+        self.account_listbox.pack(fill=tk.BOTH, expand=True)
+        for account in config.accounts:
+            self.account_listbox.insert(tk.END, account.get('name', '未命名'))
+        self.account_listbox.select_set(0, tk.END)
         
-        # 创建滚动区域
-        scroll_frame = ttk.Frame(main_frame)
-        scroll_frame.pack(fill=tk.BOTH, expand=True)
+        # 查找替换选项
+        options_frame = ttk.LabelFrame(top_frame, text="查找替换", padding="5")
+        options_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # 创建Canvas和Scrollbar
-        canvas = tk.Canvas(scroll_frame, height=500)
-        scrollbar_y = ttk.Scrollbar(scroll_frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollbar_x = ttk.Scrollbar(scroll_frame, orient=tk.HORIZONTAL, command=canvas.xview)
+        ttk.Label(options_frame, text="查找:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        self.find_entry = ttk.Entry(options_frame, width=40)
+        self.find_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=2, padx=(5, 0))
         
-        self.records_frame = ttk.Frame(canvas)
+        ttk.Label(options_frame, text="替换为:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.replace_entry = ttk.Entry(options_frame, width=40)
+        self.replace_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=2, padx=(5, 0))
         
-        # 配置Canvas
-        canvas.create_window((0, 0), window=self.records_frame, anchor=tk.NW)
-        canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        ttk.Label(options_frame, text="记录类型:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.type_combo = ttk.Combobox(options_frame, width=10, state="readonly")
+        self.type_combo['values'] = ('全部', 'A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SRV', 'CAA')
+        self.type_combo.current(0)
+        self.type_combo.grid(row=2, column=1, sticky=tk.W, pady=2, padx=(5, 0))
         
-        # 布局
-        canvas.grid(row=0, column=0, sticky=(tk.N, tk.S, tk.E, tk.W))
-        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        scrollbar_x.grid(row=1, column=0, sticky=(tk.E, tk.W))
+        self.regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="使用正则表达式 (替换内容可引用 \\1 等分组)",
+                       variable=self.regex_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=2)
         
-        scroll_frame.grid_rowconfigure(0, weight=1)
-        scroll_frame.grid_columnconfigure(0, weight=1)
+        options_frame.columnconfigure(1, weight=1)
         
-        self.canvas = canvas
+        # 按钮
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Button(btn_frame, text="扫描 (预览修改)", command=self.scan).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="移除选中", command=self.remove_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="应用修改", command=self.apply).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="关闭", command=self.close).pack(side=tk.LEFT, padx=2)
+        
+        self.progress_label = ttk.Label(btn_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        
+        # 预览列表
+        columns = ("account", "zone", "type", "name", "old", "new")
+        self.plan_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        self.plan_tree.heading("account", text="账号")
+        self.plan_tree.heading("zone", text="域名")
+        self.plan_tree.heading("type", text="类型")
+        self.plan_tree.heading("name", text="名称")
+        self.plan_tree.heading("old", text="原内容")
+        self.plan_tree.heading("new", text="新内容")
+        
+        self.plan_tree.column("account", width=120)
+        self.plan_tree.column("zone", width=150)
+        self.plan_tree.column("type", width=60, stretch=False)
+        self.plan_tree.column("name", width=200)
+        self.plan_tree.column("old", width=200)
+        self.plan_tree.column("new", width=200)
+        
+        self.plan_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.plan_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.plan_tree.configure(yscrollcommand=scrollbar.set)
+    
+    def build_replacer(self):
+        """根据选项构造替换函数，返回 new_content 或 None（不匹配）
         
-        # 表头
-        self.create_header()
+        正则表达式或替换模板无效时抛出 re.error。
+        """
+        find_text = self.find_entry.get()
+        replace_text = self.replace_entry.get()
         
-        # 添加初始行
-        self.add_multiple_rows(5)
+        if self.regex_var.get():
+            pattern = re.compile(find_text)
+            try:
+                pattern.sub(replace_text, '')  # 提前检查替换模板（如 \9、\g<x> 引用了不存在的分组）
+            except IndexError as e:  # Python 3.12 之前未知的分组名抛出 IndexError
+                raise re.error(str(e)) from e
+            
+            def replacer(content):
+                if not pattern.search(content):
+                    return None
+                return pattern.sub(replace_text, content)
+        else:
+            def replacer(content):
+                if find_text not in content:
+                    return None
+                return content.replace(find_text, replace_text)
         
-        # 更新滚动区域
-        self.records_frame.update_idletasks()
-        canvas.configure(scrollregion=canvas.bbox("all"))
+        return replacer
+    
+    def scan(self):
+        """提交扫描任务：并发抓取所选账号的全部域名，逐个域名生成修改预览"""
+        if self.scan_job:
+            messagebox.showwarning("警告", "正在扫描，请稍候", parent=self.dialog)
+            return
         
-        # 底部按钮
-        bottom_frame = ttk.Frame(main_frame)
-        bottom_frame.pack(fill=tk.X, pady=(10, 0))
+        if not self.find_entry.get():
+            messagebox.showwarning("警告", "请输入查找内容", parent=self.dialog)
+            return
         
-        ttk.Button(bottom_frame, text="✅ 开始添加", 
-                  command=self.batch_add, 
-                  style='Accent.TButton').pack(side=tk.LEFT, padx=5)
-        ttk.Button(bottom_frame, text="❌ 取消", 
-                  command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
-    
-    def create_header(self):
-        """创建表头"""
-        header_frame = ttk.Frame(self.records_frame, relief=tk.RAISED, borderwidth=1)
-        header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=2, pady=2)
+        indexes = self.account_listbox.curselection()
+        if not indexes:
+            messagebox.showwarning("警告", "请至少选择一个账号", parent=self.dialog)
+            return
         
-        headers = [
-            ("☑", 3),      # 选择框
-            ("类型", 10),
-            ("名称", 20),
-            ("内容", 30),
-            ("代理", 8),
-            ("TTL", 10),
-            ("优先级", 8)
-        ]
+        try:
+            replacer = self.build_replacer()
+        except re.error as e:
+            messagebox.showerror("错误", f"正则表达式或替换内容无效: {str(e)}", parent=self.dialog)
+            return
         
-        for col, (text, width) in enumerate(headers):
-            label = ttk.Label(header_frame, text=text, font=('TkDefaultFont', 9, 'bold'), width=width)
-            label.grid(row=0, column=col, padx=2, pady=5, sticky=tk.W)
+        record_type = self.type_combo.get()
+        
+        for item in self.plan_tree.get_children():
+            self.plan_tree.delete(item)
+        self.plan.clear()
+        self.scanned = 0
+        self.scan_errors = []
+        self.progress_label.config(text="正在获取域名列表...")
+        
+        accounts = [config.accounts[i] for i in indexes]
+        self.scan_job = scheduler.submit(
+            f"跨域名批量替换扫描 ({len(accounts)} 个账号)",
+            lambda control: self.run_scan(accounts, replacer, record_type, control),
+            on_done=lambda job: self.runner.call_soon(self.on_scan_finished, job))
     
-    def add_row(self):
-        """添加一行输入"""
-        row_num = len(self.record_rows) + 1  # +1 因为第0行是表头
+    def run_scan(self, accounts, replacer, record_type, control):
+        """任务线程：抓取记录并计算替换结果，每完成一个域名转交主线程显示"""
+        scanned = 0
+        for account, api, zone, records, error in crawl_records(accounts, cancel_event=control):
+            if zone is None:
+                self.runner.call_soon(self.on_zone_scanned, account, api, None, [],
+                                      f"{account['name']}: 获取域名列表失败: {error}")
+                continue
+            
+            scanned += 1
+            control.progress(scanned)
+            if error:
+                self.runner.call_soon(self.on_zone_scanned, account, api, zone, [],
+                                      f"{zone['name']}: 获取DNS记录失败: {error}")
+                continue
+            
+            record_index.update_zone(zone['id'], records, account['name'], zone['name'])
+            matches = []
+            for record in records or []:
+                if record_type != '全部' and record.get('type') != record_type:
+                    continue
+                content = record.get('content') or ''
+                new_content = replacer(content)
+                if new_content is not None and new_content != content:
+                    matches.append((record, new_content))
+            self.runner.call_soon(self.on_zone_scanned, account, api, zone, matches, None)
+        return scanned, None
+    
+    def on_zone_scanned(self, account, api, zone, matches, error):
+        """单个域名扫描完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        if error:
+            self.scan_errors.append(error)
+        if zone is None:
+            return
         
-        row_frame = ttk.Frame(self.records_frame)
-        row_frame.grid(row=row_num, column=0, sticky=(tk.W, tk.E), padx=2, pady=1)
+        self.scanned += 1
+        for record, new_content in matches:
+            item_id = str(len(self.plan))
+            self.plan.append({
+                'account': account,
+                'api': api,
+                'zone_id': zone['id'],
+                'zone_name': zone['name'],
+                'record': record,
+                'new_content': new_content
+            })
+            self.plan_tree.insert("", tk.END, iid=item_id, values=(
+                account['name'], zone['name'], record.get('type'), record.get('name'),
+                record.get('content') or '', new_content))
+        self.progress_label.config(text=f"已扫描 {self.scanned} 个域名，匹配 {len(self.plan)} 条记录")
+    
+    def on_scan_finished(self, job):
+        """扫描任务结束（主线程）"""
+        self.scan_job = None
+        if not self.dialog.winfo_exists():
+            return
+        if job.state == ScheduledJob.CANCELLED:
+            self.progress_label.config(text=f"扫描已取消: 已扫描 {self.scanned} 个域名，匹配 {len(self.plan)} 条记录")
+        elif job.error:
+            self.scan_errors.append(job.error)
+        if self.scan_errors:
+            messagebox.showwarning("警告", "部分扫描失败:\n\n" + "\n".join(self.scan_errors[:20]), parent=self.dialog)
+    
+    def close(self):
+        """关闭对话框，同时取消仍在进行的扫描"""
+        if self.scan_job:
+            scheduler.cancel(self.scan_job)
+        self.dialog.destroy()
+    
+    def remove_selected(self):
+        """从修改计划中移除选中的记录"""
+        for item_id in self.plan_tree.selection():
+            self.plan_tree.delete(item_id)
+    
+    @journaled("跨域名批量替换")
+    def apply(self):
+        """按域名分组提交到任务队列并发修改，结果按域名汇报"""
+        if self.apply_job:
+            messagebox.showwarning("警告", "正在提交修改，请稍候", parent=self.dialog)
+            return
         
-        # 选择框
-        selected_var = tk.BooleanVar(value=False)
-        cb = ttk.Checkbutton(row_frame, variable=selected_var, width=3)
-        cb.grid(row=0, column=0, padx=2)
+        item_ids = self.plan_tree.get_children()
+        if not item_ids:
+            messagebox.showwarning("警告", "没有需要修改的记录，请先扫描", parent=self.dialog)
+            return
         
-        # 类型下拉框
-        type_combo = ttk.Combobox(row_frame, width=8, state="readonly")
-        type_combo['values'] = ('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SRV', 'CAA')
-        type_combo.current(0)
-        type_combo.grid(row=0, column=1, padx=2)
+        # 按域名分组
+        by_zone = {}
+        for item_id in item_ids:
+            change = self.plan[int(item_id)]
+            by_zone.setdefault(change['zone_id'], []).append(change)
         
-        # 名称输入框
-        name_entry = ttk.Entry(row_frame, width=18)
-        name_entry.insert(0, "@")
-        name_entry.grid(row=0, column=2, padx=2)
+        if not messagebox.askyesno("确认", f"确定要修改 {len(by_zone)} 个域名下的 {len(item_ids)} 条记录吗？",
+                                   parent=self.dialog):
+            return
         
-        # 内容输入框
-        content_entry = ttk.Entry(row_frame, width=28)
-        content_entry.grid(row=0, column=3, padx=2)
+        # 已提交的记录从计划中移除，避免重复提交
+        for item_id in item_ids:
+            self.plan_tree.delete(item_id)
+        self.progress_label.config(text=f"正在修改 {len(by_zone)} 个域名下的 {len(item_ids)} 条记录...")
         
-        # 代理下拉框
-        proxy_combo = ttk.Combobox(row_frame, width=6, state="readonly")
-        proxy_combo['values'] = ('关闭', '开启')
-        proxy_combo.current(0)
-        proxy_combo.grid(row=0, column=4, padx=2)
+        self.apply_job = scheduler.submit(
+            f"跨域名批量替换 ({len(by_zone)} 个域名, {len(item_ids)} 条记录)",
+            lambda control: self.run_apply(by_zone, control),
+            on_done=lambda job: self.runner.call_soon(self.on_apply_finished, job))
+    
+    def run_apply(self, by_zone, control):
+        """任务线程：按域名并发提交修改；暂停或取消后不再提交新的域名"""
+        def apply_zone(zone_id):
+            if control.is_set():
+                return None, "已取消"
+            changes = by_zone[zone_id]
+            patches = [{'id': c['record']['id'], 'content': c['new_content']} for c in changes]
+            return changes[0]['api'].apply_record_patches(zone_id, patches), None
         
-        # TTL下拉框
-        ttl_combo = ttk.Combobox(row_frame, width=8, state="readonly")
-        ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
-        ttl_combo.current(0)
-        ttl_combo.grid(row=0, column=5, padx=2)
+        success_count = 0
+        fail_count = 0
+        done = 0
+        control.progress(0, len(by_zone))
         
-        # 优先级输入框（仅MX和SRV需要）
-        priority_entry = ttk.Entry(row_frame, width=6)
-        priority_entry.grid(row=0, column=6, padx=2)
+        for zone_id, outcome, error in run_concurrently(apply_zone, list(by_zone)):
+            changes = by_zone[zone_id]
+            zone_name = changes[0]['zone_name']
+            done += 1
+            
+            if error:
+                fail_count += len(changes)
+                control.log(f"[失败] {zone_name}: {error}")
+            else:
+                failed = [(c, outcome.get(c['record']['id'])) for c in changes if outcome.get(c['record']['id'])]
+                ok = len(changes) - len(failed)
+                success_count += ok
+                fail_count += len(failed)
+                control.log(f"[{'成功' if not failed else '部分失败'}] {zone_name}: 成功 {ok} 条, 失败 {len(failed)} 条")
+                for change, record_error in failed:
+                    control.log(f"    {change['record'].get('type')} {change['record'].get('name')}: {record_error}")
+            
+            control.progress(done, message=f"已完成 {done}/{len(by_zone)} 个域名")
         
-        # 保存行数据
-        row_data = {
-            'frame': row_frame,
-            'selected': selected_var,
-            'type': type_combo,
-            'name': name_entry,
-            'content': content_entry,
-            'proxy': proxy_combo,
-            'ttl': ttl_combo,
-            'priority': priority_entry
-        }
+        summary = f"域名: {len(by_zone)}, 成功: {success_count}, 失败: {fail_count}"
+        control.progress(message=summary)
+        return (success_count, fail_count), None
+    
+    def on_apply_finished(self, job):
+        """修改任务结束（主线程）：显示汇总，详细结果在任务队列中查看"""
+        self.apply_job = None
+        if job.result:
+            self.success = self.success or job.result[0] > 0
+        if not self.dialog.winfo_exists():
+            return
+        summary = job.message or job.state
+        if job.state == ScheduledJob.CANCELLED:
+            summary = f"已取消 ({summary})"
+        self.progress_label.config(text=summary)
+        show = messagebox.showwarning if job.error or (job.result and job.result[1]) else messagebox.showinfo
+        show("批量替换结果", f"{summary}\n\n详细结果可在任务队列中查看", parent=self.dialog)
+
+
+class ReverseLookupDialog:
+    """反向查找对话框：查找指向某个 IP 或主机名的所有记录（重建索引在任务队列中进行）"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.rebuild_job = None  # 正在重建索引的任务（ScheduledJob）
+        self.scanned = 0
+        self.rebuild_errors = []
         
-        self.record_rows.append(row_data)
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("反向查找")
+        self.dialog.geometry("1000x600")
+        self.dialog.transient(parent)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
         
-        # 更新Canvas滚动区域
-        self.records_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-    
-    def add_multiple_rows(self, count):
-        """添加多行"""
-        for _ in range(count):
-            self.add_row()
-    
-    def delete_selected_rows(self):
-        """删除选中的行"""
-        # 从后向前删除，避免索引问题
-        for i in range(len(self.record_rows) - 1, -1, -1):
-            if self.record_rows[i]['selected'].get():
-                self.record_rows[i]['frame'].destroy()
-                self.record_rows.pop(i)
+        self.setup_ui()
+        self.update_stats()
         
-        # 重新编号
-        for i, row_data in enumerate(self.record_rows):
-            row_data['frame'].grid(row=i + 1, column=0, sticky=(tk.W, tk.E), padx=2, pady=1)
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
         
-        # 更新Canvas滚动区域
-        self.records_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # 查询栏
+        query_frame = ttk.Frame(frame)
+        query_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(query_frame, text="IP / 主机名:").pack(side=tk.LEFT)
+        self.query_entry = ttk.Entry(query_frame, width=40)
+        self.query_entry.pack(side=tk.LEFT, padx=5)
+        self.query_entry.bind("<Return>", lambda e: self.lookup())
+        self.query_entry.focus()
+        
+        ttk.Button(query_frame, text="查找", command=self.lookup).pack(side=tk.LEFT, padx=2)
+        self.rebuild_btn = ttk.Button(query_frame, text="重建索引", command=self.rebuild)
+        self.rebuild_btn.pack(side=tk.LEFT, padx=2)
+        ttk.Button(query_frame, text="关闭", command=self.close).pack(side=tk.LEFT, padx=2)
+        
+        self.stats_label = ttk.Label(frame, text="", foreground="gray")
+        self.stats_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        # 结果列表
+        columns = ("account", "zone", "type", "name", "content")
+        self.result_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        self.result_tree.heading("account", text="账号")
+        self.result_tree.heading("zone", text="域名")
+        self.result_tree.heading("type", text="类型")
+        self.result_tree.heading("name", text="名称")
+        self.result_tree.heading("content", text="内容")
+        
+        self.result_tree.column("account", width=120)
+        self.result_tree.column("zone", width=180)
+        self.result_tree.column("type", width=60, stretch=False)
+        self.result_tree.column("name", width=250)
+        self.result_tree.column("content", width=300)
+        
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.result_tree.configure(yscrollcommand=scrollbar.set)
     
-    def clear_all_rows(self):
-        """清空所有行"""
-        if not messagebox.askyesno("确认", "确定要清空所有记录吗？"):
+    def update_stats(self, extra=""):
+        """更新索引统计信息"""
+        zone_count, record_count, target_count = record_index.stats()
+        text = f"索引: {zone_count} 个域名, {record_count} 条记录, {target_count} 个目标"
+        if record_index.built_at:
+            text += f" (重建于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record_index.built_at))})"
+        elif not zone_count:
+            text += "，请先点击 \"重建索引\""
+        self.stats_label.config(text=text + extra)
+    
+    def lookup(self):
+        """查找"""
+        query = self.query_entry.get().strip()
+        if not query:
             return
         
-        for row_data in self.record_rows:
-            row_data['frame'].destroy()
+        for item in self.result_tree.get_children():
+            self.result_tree.delete(item)
         
-        self.record_rows.clear()
+        started = time.perf_counter()
+        results = record_index.lookup(query)
+        elapsed = (time.perf_counter() - started) * 1000
         
-        # 更新Canvas滚动区域
-        self.records_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        for entry in results:
+            self.result_tree.insert("", tk.END, values=(
+                entry['account'], entry['zone'], entry['type'], entry['name'], entry['content']))
+        
+        self.update_stats(f" | 找到 {len(results)} 条记录，用时 {elapsed:.2f} ms")
     
-    def batch_add(self):
-        """批量添加DNS记录"""
-        # 收集所有非空行
-        records_to_add = []
+    def rebuild(self):
+        """提交重建索引的任务：并发抓取所有配置账号的全部域名"""
+        if self.rebuild_job:
+            return
         
-        for i, row_data in enumerate(self.record_rows):
-            record_type = row_data['type'].get()
-            name = row_data['name'].get().strip()
-            content = row_data['content'].get().strip()
-            
-            # 跳过空行
-            if not name and not content:
-                continue
-            
-            # 验证必填字段
-            if not name or not content:
-                messagebox.showwarning("警告", f"第 {i+1} 行：名称和内容不能为空！")
-                return
-            
-            # 获取代理状态
-            proxy_text = row_data['proxy'].get()
-            proxied = (proxy_text == '开启')
+        self.scanned = 0
+        self.rebuild_errors = []
+        self.rebuild_btn.config(state=tk.DISABLED)
+        self.stats_label.config(text="正在获取域名列表...")
+        
+        accounts = list(config.accounts)
+        self.rebuild_job = scheduler.submit(
+            f"重建反向查找索引 ({len(accounts)} 个账号)",
+            lambda control: self.run_rebuild(accounts, control),
+            on_done=lambda job: self.runner.call_soon(self.on_rebuilt, job))
+    
+    def run_rebuild(self, accounts, control):
+        """任务线程：抓取记录并更新索引，每完成一个域名转交主线程显示进度"""
+        scanned = 0
+        for account, api, zone, records, error in crawl_records(accounts, cancel_event=control):
+            if zone is None:
+                self.runner.call_soon(self.on_zone_indexed, 0, f"{account['name']}: 获取域名列表失败: {error}")
+                continue
             
-            # 获取TTL
-            ttl_text = row_data['ttl'].get()
-            if ttl_text.lower() in ['auto', 'automatic']:
-                ttl = 1
+            scanned += 1
+            control.progress(scanned)
+            if error:
+                self.runner.call_soon(self.on_zone_indexed, 1, f"{zone['name']}: 获取DNS记录失败: {error}")
             else:
-                try:
-                    ttl = int(ttl_text)
-                except ValueError:
-                    ttl = 1
-            
-            # 获取优先级
-            priority_text = row_data['priority'].get().strip()
-            priority = None
-            if priority_text and record_type in ['MX', 'SRV', 'URI']:
-                try:
-                    priority = int(priority_text)
-                except ValueError:
-                    pass
-            
-            records_to_add.append((i + 1, record_type, name, content, proxied, ttl, priority))
+                record_index.update_zone(zone['id'], records, account['name'], zone['name'])
+                self.runner.call_soon(self.on_zone_indexed, 1, None)
         
-        if not records_to_add:
-            messagebox.showwarning("警告", "请至少输入一条DNS记录！")
+        if not control.is_set():
+            record_index.built_at = time.time()
+        return scanned, None
+    
+    def on_zone_indexed(self, zone_count, error):
+        """单个域名（zone_count 为 1）或账号的域名列表（为 0）抓取完成（主线程）"""
+        if error:
+            self.rebuild_errors.append(error)
+        self.scanned += zone_count
+        if self.dialog.winfo_exists():
+            self.stats_label.config(text=f"正在建立索引: 已抓取 {self.scanned} 个域名")
+    
+    def on_rebuilt(self, job):
+        """重建索引任务结束（主线程）"""
+        self.rebuild_job = None
+        if not self.dialog.winfo_exists():
             return
+        self.rebuild_btn.config(state=tk.NORMAL)
+        self.update_stats(" | 已取消重建" if job.state == ScheduledJob.CANCELLED else "")
         
-        # 确认
-        if not messagebox.askyesno("确认", f"确定要添加 {len(records_to_add)} 条DNS记录吗？"):
-            return
+        errors = self.rebuild_errors + ([job.error] if job.error else [])
+        if errors and job.state != ScheduledJob.CANCELLED:
+            messagebox.showwarning("警告", "部分抓取失败:\n\n" + "\n".join(errors[:20]), parent=self.dialog)
+    
+    def close(self):
+        """关闭对话框，同时取消仍在进行的重建"""
+        if self.rebuild_job:
+            scheduler.cancel(self.rebuild_job)
+        self.dialog.destroy()
+
+
+class RecordSearchDialog:
+    """全文搜索对话框：在本地缓存的全部记录中按任意片段搜索（名称、内容、类型、备注）"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.sync_job = None  # 正在进行的同步任务（ScheduledJob），关闭对话框不会取消
         
-        success_count = 0
-        fail_count = 0
-        results = []
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("全文搜索记录")
+        self.dialog.geometry("1000x600")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
         
-        for row_num, record_type, name, content, proxied, ttl, priority in records_to_add:
-            try:
-                # 添加记录
-                if record_type == 'MX' and priority is not None:
-                    # MX记录需要特殊处理
-                    data = {
-                        "type": record_type,
-                        "name": name,
-                        "content": content,
-                        "proxied": proxied,
-                        "ttl": ttl,
-                        "priority": priority
-                    }
-                    result, error = self.api._request("POST", f"/zones/{self.zone_id}/dns_records", data)
-                else:
-                    result, error = self.api.add_dns_record(
-                        self.zone_id, 
-                        record_type, 
-                        name, 
-                        content, 
-                        proxied, 
-                        ttl
-                    )
-                
-                if error:
-                    results.append(f"[失败] 第{row_num}行 ({record_type} {name}): {error}")
-                    fail_count += 1
-                else:
-                    results.append(f"[成功] 第{row_num}行 ({record_type} {name}): 添加成功")
-                    success_count += 1
-                    
-            except Exception as e:
-                results.append(f"[错误] 第{row_num}行：{str(e)}")
-                fail_count += 1
+        self.setup_ui()
+        self.update_stats()
         
-        # 显示结果
-        self.show_results(success_count, fail_count, results)
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
         
-        if success_count > 0:
-            self.success = True
+        # 查询栏
+        query_frame = ttk.Frame(frame)
+        query_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(query_frame, text="关键字:").pack(side=tk.LEFT)
+        self.query_entry = ttk.Entry(query_frame, width=40)
+        self.query_entry.pack(side=tk.LEFT, padx=5)
+        self.query_entry.bind("<Return>", lambda e: self.search())
+        self.query_entry.focus()
+        
+        ttk.Button(query_frame, text="搜索", command=self.search).pack(side=tk.LEFT, padx=2)
+        self.sync_btn = ttk.Button(query_frame, text="同步全部记录", command=self.sync_all)
+        self.sync_btn.pack(side=tk.LEFT, padx=2)
+        ttk.Button(query_frame, text="关闭", command=self.dialog.destroy).pack(side=tk.LEFT, padx=2)
+        
+        self.stats_label = ttk.Label(frame, text="", foreground="gray")
+        self.stats_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        # 结果列表
+        columns = ("account", "zone", "type", "name", "content", "comment")
+        self.result_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        self.result_tree.heading("account", text="账号")
+        self.result_tree.heading("zone", text="域名")
+        self.result_tree.heading("type", text="类型")
+        self.result_tree.heading("name", text="名称")
+        self.result_tree.heading("content", text="内容")
+        self.result_tree.heading("comment", text="备注")
+        
+        self.result_tree.column("account", width=110)
+        self.result_tree.column("zone", width=160)
+        self.result_tree.column("type", width=60, stretch=False)
+        self.result_tree.column("name", width=220)
+        self.result_tree.column("content", width=280)
+        self.result_tree.column("comment", width=150)
+        
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.result_tree.configure(yscrollcommand=scrollbar.set)
     
-    def show_results(self, success_count, fail_count, results):
-        """显示批量操作结果"""
-        result_dialog = tk.Toplevel(self.dialog)
-        result_dialog.title("批量添加结果")
-        result_dialog.geometry("900x500")
-        result_dialog.transient(self.dialog)
+    def update_stats(self, extra=""):
+        """更新本地缓存统计信息"""
+        record_count, zone_count = local_cache.record_count()
+        text = f"本地缓存: {zone_count} 个域名, {record_count} 条记录"
+        if not record_count:
+            text += "，请先点击 \"同步全部记录\" 或开启后台同步"
+        self.stats_label.config(text=text + extra)
+    
+    def search(self):
+        """搜索"""
+        query = self.query_entry.get().strip()
+        if not query:
+            return
         
-        result_frame = ttk.Frame(result_dialog, padding="20")
-        result_frame.pack(fill=tk.BOTH, expand=True)
+        for item in self.result_tree.get_children():
+            self.result_tree.delete(item)
         
-        summary = f"成功: {success_count}, 失败: {fail_count}\n\n"
-        ttk.Label(result_frame, text=summary, font=('TkDefaultFont', 10, 'bold')).pack(anchor=tk.W)
+        started = time.perf_counter()
+        results = local_cache.search(query)
+        elapsed = (time.perf_counter() - started) * 1000
         
-        result_text = scrolledtext.ScrolledText(result_frame, width=100, height=20)
-        result_text.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        for entry in results:
+            self.result_tree.insert("", tk.END, values=(
+                entry['account'] or "", entry['zone'] or entry['zone_id'], entry['type'],
+                entry['name'], entry['content'], entry['comment'] or ""))
         
-        for line in results:
-            result_text.insert(tk.END, line + '\n')
+        more = f"（只显示前 {SEARCH_LIMIT} 条）" if len(results) >= SEARCH_LIMIT else ""
+        self.update_stats(f" | 找到 {len(results)} 条记录{more}，用时 {elapsed:.2f} ms")
+    
+    def sync_all(self):
+        """把不限预算地同步一轮所有配置账号的记录提交到任务队列，完成后更新统计"""
+        if self.sync_job:
+            return
         
-        result_text.config(state=tk.DISABLED)
+        self.sync_btn.config(state=tk.DISABLED)
+        self.stats_label.config(text="正在同步全部账号的记录...")
+        daemon = SyncDaemon(local_cache, budget=float('inf'))
+        self.sync_job = scheduler.submit(
+            "同步全部账号的记录到本地缓存",
+            lambda control: (daemon.run_once(cancel_event=control), None),
+            on_done=lambda job: self.runner.call_soon(self.on_synced, job))
+    
+    def on_synced(self, job):
+        """同步任务结束（主线程）"""
+        self.sync_job = None
+        if not self.dialog.winfo_exists():
+            return
         
-        ttk.Button(result_frame, text="关闭", 
-                  command=lambda: [result_dialog.destroy(), self.dialog.destroy()]).pack(pady=(10, 0))
+        self.sync_btn.config(state=tk.NORMAL)
+        summary = job.result
+        if job.state == ScheduledJob.CANCELLED:
+            extra = " | 同步已取消"
+        elif summary:
+            extra = f" | {describe_sync_run(summary)}"
+        else:
+            extra = f" | 同步失败: {job.error}"
+        self.update_stats(extra)
+        if summary and summary['errors']:
+            messagebox.showwarning("警告", "部分同步失败:\n\n" + "\n".join(summary['errors'][:20]), parent=self.dialog)
 
 
-class BatchEditRecordsDialog:
-    """批量修改DNS记录对话框"""
-    def __init__(self, parent, api, zone_id, selected_records):
-        self.api = api
-        self.zone_id = zone_id
-        self.selected_records = selected_records  # [(record_id, record_data), ...]
+class SyncDialog:
+    """期望状态同步对话框：按文件中的期望记录计算并提交最小变更（计算和提交在任务队列中进行，不阻塞界面）"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.plans = []
         self.success = False
+        self.compute_job = None  # 正在计算变更计划的任务（ScheduledJob）
+        self.apply_job = None  # 正在提交变更的任务（ScheduledJob），关闭对话框不会取消
         
         self.dialog = tk.Toplevel(parent)
-        self.dialog.title(f"批量修改DNS记录 (已选择 {len(selected_records)} 条)")
-        self.dialog.geometry("700x500")
+        self.dialog.title("期望状态同步")
+        self.dialog.geometry("1000x650")
         self.dialog.transient(parent)
-        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
         
         self.setup_ui()
         
@@ -1636,218 +5560,667 @@ class BatchEditRecordsDialog:
     
     def setup_ui(self):
         """设置界面"""
-        frame = ttk.Frame(self.dialog, padding="20")
+        frame = ttk.Frame(self.dialog, padding="10")
         frame.pack(fill=tk.BOTH, expand=True)
         
-        # 说明
-        ttk.Label(frame, text="批量修改选中的DNS记录", 
-                 font=('TkDefaultFont', 10, 'bold')).pack(anchor=tk.W, pady=(0, 10))
+        # 文件选择
+        file_frame = ttk.Frame(frame)
+        file_frame.pack(fill=tk.X, pady=(0, 5))
         
-        # 显示选中的记录
-        list_frame = ttk.LabelFrame(frame, text="选中的记录", padding="10")
-        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        ttk.Label(file_frame, text="期望状态文件:").pack(side=tk.LEFT)
+        self.file_entry = ttk.Entry(file_frame, width=60)
+        self.file_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(file_frame, text="浏览", command=self.browse).pack(side=tk.LEFT, padx=2)
         
-        list_text = scrolledtext.ScrolledText(list_frame, height=8, wrap=tk.WORD)
-        list_text.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text="格式: {\"zones\": {\"example.com\": {\"prune\": true, \"records\": "
+                             "[{\"type\": \"A\", \"name\": \"www\", \"content\": \"192.0.2.1\", \"proxied\": true}]}}}",
+                 foreground="gray").pack(anchor=tk.W, pady=(0, 5))
         
-        for record_id, record_data in self.selected_records:
-            record_type = record_data.get('type', '')
-            name = record_data.get('name', '')
-            content = record_data.get('content', '')
-            list_text.insert(tk.END, f"{record_type} | {name} | {content}\n")
+        # 按钮
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(0, 5))
         
-        list_text.config(state=tk.DISABLED)
+        ttk.Button(btn_frame, text="计算变更计划", command=self.compute).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="应用变更", command=self.apply).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="关闭", command=self.close).pack(side=tk.LEFT, padx=2)
         
-        # 修改选项
-        options_frame = ttk.LabelFrame(frame, text="修改选项", padding="10")
-        options_frame.pack(fill=tk.X, pady=(0, 10))
+        self.progress_label = ttk.Label(btn_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
         
-        # TTL修改
-        ttl_frame = ttk.Frame(options_frame)
-        ttl_frame.pack(fill=tk.X, pady=5)
+        # 计划列表
+        columns = ("operation", "type", "name", "detail")
+        self.plan_tree = ttk.Treeview(frame, columns=columns, show="tree headings", height=20)
+        self.plan_tree.heading("#0", text="域名")
+        self.plan_tree.heading("operation", text="操作")
+        self.plan_tree.heading("type", text="类型")
+        self.plan_tree.heading("name", text="名称")
+        self.plan_tree.heading("detail", text="内容 / 变化")
         
-        self.change_ttl_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(ttl_frame, text="修改TTL为:", 
-                       variable=self.change_ttl_var).pack(side=tk.LEFT)
+        self.plan_tree.column("#0", width=200)
+        self.plan_tree.column("operation", width=60, stretch=False)
+        self.plan_tree.column("type", width=60, stretch=False)
+        self.plan_tree.column("name", width=250)
+        self.plan_tree.column("detail", width=350)
         
-        self.ttl_combo = ttk.Combobox(ttl_frame, width=15, state="readonly")
-        self.ttl_combo['values'] = ('Auto', '120', '300', '600', '1800', '3600', '7200', '18000', '43200', '86400')
-        self.ttl_combo.current(0)
-        self.ttl_combo.pack(side=tk.LEFT, padx=(10, 0))
+        self.plan_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # 代理修改
-        proxy_frame = ttk.Frame(options_frame)
-        proxy_frame.pack(fill=tk.X, pady=5)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.plan_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.plan_tree.configure(yscrollcommand=scrollbar.set)
+    
+    def browse(self):
+        """选择期望状态文件"""
+        from tkinter import filedialog
         
-        self.change_proxy_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(proxy_frame, text="修改代理状态为:", 
-                       variable=self.change_proxy_var).pack(side=tk.LEFT)
+        filename = filedialog.askopenfilename(
+            parent=self.dialog,
+            title="选择期望状态文件",
+            filetypes=[("JSON / YAML", "*.json *.yaml *.yml"), ("所有文件", "*.*")]
+        )
+        if filename:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, filename)
+    
+    def compute(self):
+        """提交计算变更计划的任务（不提交变更）"""
+        if self.compute_job:
+            messagebox.showwarning("警告", "正在计算变更计划，请稍候", parent=self.dialog)
+            return
         
-        self.proxy_combo = ttk.Combobox(proxy_frame, width=15, state="readonly")
-        self.proxy_combo['values'] = ('开启', '关闭')
-        self.proxy_combo.current(0)
-        self.proxy_combo.pack(side=tk.LEFT, padx=(10, 0))
+        path = self.file_entry.get().strip()
+        if not path:
+            messagebox.showwarning("警告", "请选择期望状态文件", parent=self.dialog)
+            return
         
-        # 内容替换
-        replace_frame = ttk.Frame(options_frame)
-        replace_frame.pack(fill=tk.X, pady=5)
+        state, error = load_desired_state(path)
+        if error:
+            messagebox.showerror("错误", error, parent=self.dialog)
+            return
         
-        self.replace_content_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(replace_frame, text="内容替换:", 
-                       variable=self.replace_content_var).pack(side=tk.LEFT)
+        for item in self.plan_tree.get_children():
+            self.plan_tree.delete(item)
+        self.plans = []
         
-        ttk.Label(replace_frame, text="查找:").pack(side=tk.LEFT, padx=(10, 5))
-        self.find_entry = ttk.Entry(replace_frame, width=15)
-        self.find_entry.pack(side=tk.LEFT)
+        self.progress_label.config(text=f"正在获取 {len(state)} 个域名的当前记录...")
         
-        ttk.Label(replace_frame, text="替换为:").pack(side=tk.LEFT, padx=(10, 5))
-        self.replace_entry = ttk.Entry(replace_frame, width=15)
-        self.replace_entry.pack(side=tk.LEFT)
+        accounts = list(config.accounts)
+        self.compute_job = scheduler.submit(
+            f"计算同步变更计划 ({len(state)} 个域名)",
+            lambda control: (build_sync_plans(state, accounts, cancel_event=control), None),
+            on_done=lambda job: self.runner.call_soon(self.on_computed, job))
+    
+    def on_computed(self, job):
+        """变更计划计算完成（主线程）"""
+        self.compute_job = None
+        if not self.dialog.winfo_exists():
+            return
+        if job.state == ScheduledJob.CANCELLED:
+            self.progress_label.config(text="已取消计算变更计划")
+            return
+        if job.error:
+            self.progress_label.config(text="")
+            messagebox.showerror("错误", job.error, parent=self.dialog)
+            return
         
-        # 提示
-        ttk.Label(options_frame, text="注意：只有A和AAAA记录支持代理功能", 
-                 foreground="orange", font=('TkDefaultFont', 8)).pack(anchor=tk.W, pady=(5, 0))
+        self.plans, errors = job.result
+        elapsed = job.finished_at - job.started_at
+        
+        change_count = 0
+        for plan in self.plans:
+            parent_id = self.plan_tree.insert("", tk.END, text=plan.zone_name,
+                                              values=("", "", "", plan.summary()), open=not plan.is_empty())
+            for row in describe_sync_plan(plan):
+                self.plan_tree.insert(parent_id, tk.END, values=row)
+                change_count += 1
+        
+        self.progress_label.config(text=f"{len(self.plans)} 个域名，共 {change_count} 项变更 (用时 {elapsed:.1f} 秒)")
+        
+        if errors:
+            messagebox.showwarning("警告", "部分域名无法同步:\n\n" + "\n".join(errors[:20]), parent=self.dialog)
+    
+    @journaled("期望状态同步")
+    def apply(self):
+        """把各域名的变更计划提交到任务队列并发执行，按域名汇报结果"""
+        if self.compute_job or self.apply_job:
+            messagebox.showwarning("警告", "任务进行中，请稍候", parent=self.dialog)
+            return
+        
+        plans = [plan for plan in self.plans if not plan.is_empty()]
+        if not plans:
+            messagebox.showinfo("提示", "没有需要提交的变更，请先计算变更计划", parent=self.dialog)
+            return
+        
+        if not messagebox.askyesno("确认", f"确定要对 {len(plans)} 个域名提交变更吗？", parent=self.dialog):
+            return
+        
+        # 计划提交后即作废，避免重复提交；需要再次同步时重新计算
+        self.plans = []
+        for item in self.plan_tree.get_children():
+            self.plan_tree.delete(item)
+        self.progress_label.config(text=f"正在提交 {len(plans)} 个域名的变更...")
+        
+        self.apply_job = scheduler.submit(
+            f"期望状态同步 ({len(plans)} 个域名)",
+            lambda control: self.run_apply(plans, control),
+            on_done=lambda job: self.runner.call_soon(self.on_applied, job))
+    
+    def run_apply(self, plans, control):
+        """任务线程：并发提交各域名的变更计划；暂停或取消后不再提交新的域名"""
+        success_count = 0
+        fail_count = 0
+        done = 0
+        control.progress(0, len(plans))
+        
+        for plan, outcome, error in apply_sync_plans(plans, cancel_event=control):
+            done += 1
+            if error:
+                fail_count += 1
+                control.log(f"[失败] {plan.zone_name}: {error}")
+            else:
+                failed = [(kind, item, item_error) for kind, item, _, item_error in outcome if item_error]
+                success_count += len(outcome) - len(failed)
+                fail_count += len(failed)
+                control.log(f"[{'成功' if not failed else '部分失败'}] {plan.zone_name}: {plan.summary()}, 失败 {len(failed)} 项")
+                for kind, item, item_error in failed:
+                    control.log(f"    {kind} {item.get('type', '')} {item.get('name', item.get('id'))}: {item_error}")
+            
+            control.progress(done, message=f"已完成 {done}/{len(plans)} 个域名")
+        
+        control.progress(message=f"成功: {success_count}, 失败: {fail_count}")
+        return (success_count, fail_count), None
+    
+    def on_applied(self, job):
+        """变更提交完成（主线程）：显示汇总，详细结果在任务队列中查看"""
+        self.apply_job = None
+        if job.result:
+            self.success = self.success or job.result[0] > 0
+        if not self.dialog.winfo_exists():
+            return
+        summary = job.message or job.state
+        if job.state == ScheduledJob.CANCELLED:
+            summary = f"已取消 ({summary})"
+        self.progress_label.config(text=summary)
+        show = messagebox.showwarning if job.error or (job.result and job.result[1]) else messagebox.showinfo
+        show("同步结果", f"{summary}\n\n详细结果可在任务队列中查看", parent=self.dialog)
+    
+    def close(self):
+        """关闭对话框，同时取消仍在进行的计算（已提交的变更继续在任务队列中执行）"""
+        if self.compute_job:
+            scheduler.cancel(self.compute_job)
+        self.dialog.destroy()
+
+
+class TemplateDialog:
+    """记录模板：保存常用的基础记录，并发应用到选中的域名或账号下的全部域名（跳过已存在的记录）"""
+    def __init__(self, parent, runner, api=None, zones=(), account_name=''):
+        self.runner = runner
+        self.api = api
+        self.zones = list(zones)  # 主窗口中选中的域名 [Zone, ...]
+        self.account_name = account_name
+        self.job = None  # 提交到任务队列的 ScheduledJob
+        self.template_size = 0
+        self.total = 0
+        self.done = 0
+        self.created = 0
+        self.skipped = 0
+        self.fail_count = 0
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("记录模板")
+        self.dialog.geometry("900x700")
+        self.dialog.transient(parent)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 模板选择与保存
+        template_frame = ttk.Frame(frame)
+        template_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(template_frame, text="模板:").pack(side=tk.LEFT)
+        self.template_var = tk.StringVar()
+        self.template_combo = ttk.Combobox(template_frame, textvariable=self.template_var, width=30)
+        self.template_combo['values'] = sorted(config.templates)
+        self.template_combo.pack(side=tk.LEFT, padx=5)
+        self.template_combo.bind("<<ComboboxSelected>>", lambda e: self.load_template())
+        
+        ttk.Button(template_frame, text="保存模板", command=self.save_template).pack(side=tk.LEFT, padx=2)
+        ttk.Button(template_frame, text="删除模板", command=self.delete_template).pack(side=tk.LEFT, padx=2)
+        
+        ttk.Label(frame, text="每行一条记录: 类型 名称 [优先级] 内容    可用变量: {zone} 域名, {label} 域名第一段, "
+                             "{zone_id}, {account} 账号名", foreground="gray").pack(anchor=tk.W)
+        ttk.Label(frame, text="例如: MX @ 10 mx.{zone}    TXT @ v=spf1 include:_spf.{zone} ~all    "
+                             "CNAME verify.{zone} verify.example.net", foreground="gray").pack(anchor=tk.W, pady=(0, 5))
+        
+        self.template_text = scrolledtext.ScrolledText(frame, width=100, height=10)
+        self.template_text.pack(fill=tk.X)
+        
+        # 应用目标
+        target_frame = ttk.LabelFrame(frame, text="应用到", padding="5")
+        target_frame.pack(fill=tk.X, pady=(10, 5))
+        
+        self.target_var = tk.StringVar(value="zones" if self.zones else "accounts")
+        zones_radio = ttk.Radiobutton(target_frame, text=f"主窗口中选中的域名 ({len(self.zones)} 个)",
+                                      variable=self.target_var, value="zones")
+        zones_radio.pack(anchor=tk.W)
+        if not self.zones:
+            zones_radio.config(state=tk.DISABLED)
+        ttk.Radiobutton(target_frame, text="以下账号的全部域名（可多选）",
+                        variable=self.target_var, value="accounts").pack(anchor=tk.W)
+        
+        self.account_listbox = tk.Listbox(target_frame, selectmode=tk.EXTENDED, height=4, exportselection=False)
+        for account in config.accounts:
+            self.account_listbox.insert(tk.END, account['name'])
+        self.account_listbox.pack(fill=tk.X, pady=(5, 0))
         
         # 按钮
         btn_frame = ttk.Frame(frame)
-        btn_frame.pack(pady=(10, 0))
+        btn_frame.pack(fill=tk.X, pady=(5, 5))
         
-        ttk.Button(btn_frame, text="开始修改", command=self.batch_edit).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="取消", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="预览", command=lambda: self.start(dry_run=True)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="应用模板", command=self.apply).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="停止", command=self.stop).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="关闭", command=self.close).pack(side=tk.LEFT, padx=2)
+        
+        self.progress_label = ttk.Label(btn_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        
+        # 结果
+        self.result_text = scrolledtext.ScrolledText(frame, width=100, height=15)
+        self.result_text.pack(fill=tk.BOTH, expand=True)
+        self.result_text.config(state=tk.DISABLED)
     
-    def batch_edit(self):
-        """批量修改DNS记录"""
-        # 检查是否选择了任何修改选项
-        if not (self.change_ttl_var.get() or self.change_proxy_var.get() or self.replace_content_var.get()):
-            messagebox.showwarning("警告", "请至少选择一个修改选项")
+    def load_template(self):
+        """把选中的模板载入编辑框"""
+        records = config.templates.get(self.template_var.get())
+        if records is None:
+            return
+        self.template_text.delete(1.0, tk.END)
+        self.template_text.insert(tk.END, format_template(records))
+    
+    def save_template(self):
+        """保存编辑框中的模板"""
+        name = self.template_var.get().strip()
+        if not name:
+            messagebox.showwarning("警告", "请输入模板名称", parent=self.dialog)
+            return
+        records, error = parse_template(self.template_text.get(1.0, tk.END))
+        if error:
+            messagebox.showerror("错误", error, parent=self.dialog)
+            return
+        if not config.save_template(name, records):
+            messagebox.showerror("错误", "保存模板失败", parent=self.dialog)
+            return
+        self.template_combo['values'] = sorted(config.templates)
+        messagebox.showinfo("成功", f"模板 {name} 已保存 ({len(records)} 条记录)", parent=self.dialog)
+    
+    def delete_template(self):
+        """删除选中的模板"""
+        name = self.template_var.get().strip()
+        if name not in config.templates:
+            messagebox.showwarning("警告", "请先选择模板", parent=self.dialog)
+            return
+        if not messagebox.askyesno("确认", f"确定要删除模板 {name} 吗？", parent=self.dialog):
+            return
+        config.delete_template(name)
+        self.template_combo['values'] = sorted(config.templates)
+        self.template_var.set("")
+        self.template_text.delete(1.0, tk.END)
+    
+    @journaled("应用记录模板")
+    def apply(self):
+        """提交模板（归入同一个变更任务，可在变更日志中撤销）"""
+        self.start(dry_run=False)
+    
+    def start(self, dry_run):
+        """提交到任务队列：解析目标域名并并发应用模板"""
+        if self.job:
+            messagebox.showwarning("警告", "上一次任务尚未完成", parent=self.dialog)
             return
         
-        # 确认
-        modifications = []
-        if self.change_ttl_var.get():
-            modifications.append(f"TTL修改为 {self.ttl_combo.get()}")
-        if self.change_proxy_var.get():
-            modifications.append(f"代理状态修改为 {self.proxy_combo.get()}")
-        if self.replace_content_var.get():
-            modifications.append(f"内容替换：'{self.find_entry.get()}' → '{self.replace_entry.get()}'")
+        records, error = parse_template(self.template_text.get(1.0, tk.END))
+        if error:
+            messagebox.showerror("错误", error, parent=self.dialog)
+            return
+        
+        targets = accounts = None
+        if self.target_var.get() == "zones":
+            targets = [(self.api, zone.id, zone.name, self.account_name) for zone in self.zones]
+            description = f"{len(targets)} 个域名"
+        else:
+            accounts = [config.accounts[index] for index in self.account_listbox.curselection()]
+            if not accounts:
+                messagebox.showwarning("警告", "请选择至少一个账号", parent=self.dialog)
+                return
+            description = f"{len(accounts)} 个账号的全部域名"
+        
+        if not dry_run and not messagebox.askyesno(
+                "确认", f"确定要把 {len(records)} 条模板记录应用到{description}吗？\n\n已存在的记录会被跳过。",
+                parent=self.dialog):
+            return
+        
+        self.template_size = len(records)
+        self.total = len(targets) if targets is not None else 0
+        self.done = self.created = self.skipped = self.fail_count = 0
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.config(state=tk.DISABLED)
+        self.progress_label.config(text="正在预览..." if dry_run else "正在应用...")
+        
+        self.job = scheduler.submit(
+            f"{'预览' if dry_run else '应用'}记录模板 ({description})",
+            lambda control: self.run(records, targets, accounts, dry_run, control),
+            on_done=lambda job: self.runner.call_soon(self.on_finished, dry_run))
+    
+    def run(self, records, targets, accounts, dry_run, control):
+        """任务线程：需要时先获取账号下的域名，再并发应用，每完成一个域名转交主线程显示
+        
+        control 是任务队列中的 ScheduledJob，同时作为 cancel_event（暂停/取消点）。
+        """
+        if targets is None:
+            targets, errors = template_targets(accounts)
+            for error in errors:
+                control.log(f"❌ {error}")
+                self.runner.call_soon(self.log, f"❌ {error}")
+            self.runner.call_soon(self.set_total, len(targets))
+        control.progress(0, len(targets))
+        
+        done = 0
+        for target, plan, outcome, error in apply_template(records, targets, dry_run, control):
+            done += 1
+            failed = error or any(item_error for _, _, _, item_error in outcome)
+            control.log(f"{'❌' if failed else '✓'} {target[2]}" + (f": {error}" if error else ""))
+            control.progress(done)
+            self.runner.call_soon(self.on_zone_done, target, plan, outcome, error, dry_run)
+        return True, None
+    
+    def set_total(self, total):
+        self.total = total
+    
+    def log(self, line):
+        """追加一行结果"""
+        if not self.dialog.winfo_exists():
+            return
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.insert(tk.END, line + "\n")
+        self.result_text.see(tk.END)
+        self.result_text.config(state=tk.DISABLED)
+    
+    def on_zone_done(self, target, plan, outcome, error, dry_run):
+        """单个域名完成（主线程）"""
+        zone_name = target[2]
+        self.done += 1
+        if error:
+            self.fail_count += 1
+            self.log(f"❌ {zone_name}: {error}")
+        else:
+            failed = [(item, item_error) for _, item, _, item_error in outcome if item_error]
+            created = len(plan.creates) if dry_run else len(outcome) - len(failed)
+            existing = self.template_size - len(plan.creates)
+            self.created += created
+            self.skipped += existing
+            self.fail_count += len(failed)
+            action = "将新增" if dry_run else "新增"
+            self.log(f"{'❌' if failed else '✓'} {zone_name}: {action} {created}, 已存在跳过 {existing}"
+                     + (f", 失败 {len(failed)}" if failed else ""))
+            for item, item_error in failed:
+                self.log(f"    {item.get('type', '')} {item.get('name', '')}: {item_error}")
+        
+        if self.dialog.winfo_exists():
+            self.progress_label.config(text=f"已完成 {self.done}/{self.total} 个域名")
+    
+    def on_finished(self, dry_run):
+        """全部完成（主线程）"""
+        self.job = None
+        if not self.dialog.winfo_exists():
+            return
+        action = "将新增" if dry_run else "新增"
+        self.progress_label.config(
+            text=f"{self.done} 个域名: {action} {self.created} 条, 已存在跳过 {self.skipped} 条, 失败 {self.fail_count}")
+    
+    def stop(self):
+        """停止尚未开始的域名"""
+        if self.job:
+            scheduler.cancel(self.job)
+    
+    def close(self):
+        """关闭对话框，同时停止任务"""
+        self.stop()
+        self.dialog.destroy()
+
+
+class AllZonesDialog:
+    """全部账号域名总览：在后台并发获取所有已配置账号的域名，按 zone_id 去重并标注来源账号"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.rows = {}  # zone_id -> (Zone, 来源账号名)
+        self.sort_column = None
+        self.sort_reverse = False
+        self.loading = False
+        self.load_errors = []
+        self.accounts_done = 0
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("全部账号域名总览")
+        self.dialog.geometry("900x600")
+        self.dialog.transient(parent)
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+        
+        self.dialog.after_idle(self.load)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
         
-        confirm_msg = f"确定要对 {len(self.selected_records)} 条记录进行以下修改吗？\n\n" + "\n".join(modifications)
+        # 搜索栏
+        search_frame = ttk.Frame(frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
         
-        if not messagebox.askyesno("确认", confirm_msg):
+        ttk.Label(search_frame, text="搜索:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<KeyRelease>", lambda e: self.apply_filter())
+        
+        self.refresh_btn = ttk.Button(search_frame, text="刷新", command=self.load)
+        self.refresh_btn.pack(side=tk.LEFT, padx=2)
+        ttk.Button(search_frame, text="导出域名", command=self.export).pack(side=tk.LEFT, padx=2)
+        ttk.Button(search_frame, text="关闭", command=self.dialog.destroy).pack(side=tk.LEFT, padx=2)
+        
+        self.status_label = ttk.Label(frame, text="", foreground="gray")
+        self.status_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        # 域名列表
+        columns = ("domain", "status", "account")
+        self.zone_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        self.zone_tree.heading("domain", text="域名", command=lambda: self.sort_by("domain"))
+        self.zone_tree.heading("status", text="状态", command=lambda: self.sort_by("status"))
+        self.zone_tree.heading("account", text="来源账号", command=lambda: self.sort_by("account"))
+        
+        self.zone_tree.column("domain", width=350)
+        self.zone_tree.column("status", width=80, stretch=False)
+        self.zone_tree.column("account", width=250)
+        
+        self.zone_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.zone_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.zone_tree.configure(yscrollcommand=scrollbar.set)
+    
+    def load(self):
+        """在后台并发获取所有配置账号的域名，每个账号完成后转交主线程追加显示"""
+        if self.loading:
             return
         
-        success_count = 0
-        fail_count = 0
-        results = []
+        self.loading = True
+        self.rows.clear()
+        for item in self.zone_tree.get_children():
+            self.zone_tree.delete(item)
+        self.load_errors = []
+        self.accounts_done = 0
+        self.refresh_btn.config(state=tk.DISABLED)
         
-        for record_id, record_data in self.selected_records:
-            try:
-                record_type = record_data.get('type')
-                name = record_data.get('name')
-                content = record_data.get('content')
-                
-                # 构建更新数据
-                data = {
-                    "type": record_type,
-                    "name": name,
-                    "content": content,
-                    "ttl": record_data.get('ttl', 1),
-                    "proxied": record_data.get('proxied', False)
-                }
-                
-                # 应用修改
-                modified = False
-                
-                # TTL修改
-                if self.change_ttl_var.get():
-                    ttl_str = self.ttl_combo.get()
-                    data['ttl'] = 1 if ttl_str == 'Auto' else int(ttl_str)
-                    modified = True
-                
-                # 代理修改
-                if self.change_proxy_var.get():
-                    if record_type not in ['A', 'AAAA', 'CNAME']:
-                        results.append(f"[跳过] {record_type} {name}: 不支持代理")
-                        continue
-                    
-                    data['proxied'] = self.proxy_combo.get() == '开启'
-                    if data['proxied']:
-                        data['ttl'] = 1  # 代理开启时TTL必须为1
-                    modified = True
-                
-                # 内容替换
-                if self.replace_content_var.get():
-                    find_text = self.find_entry.get()
-                    replace_text = self.replace_entry.get()
-                    if find_text and find_text in content:
-                        data['content'] = content.replace(find_text, replace_text)
-                        modified = True
-                
-                if not modified:
-                    results.append(f"[跳过] {record_type} {name}: 无需修改")
-                    continue
-                
-                # 保留其他字段
-                if record_data.get('priority') is not None:
-                    data['priority'] = record_data.get('priority')
-                
-                # 发送更新请求
-                result, error = self.api._request("PATCH", 
-                                                 f"/zones/{self.zone_id}/dns_records/{record_id}", 
-                                                 data)
-                
-                if error:
-                    results.append(f"[失败] {record_type} {name}: {error}")
-                    fail_count += 1
-                else:
-                    results.append(f"[成功] {record_type} {name}: 修改成功")
-                    success_count += 1
-                    
-            except Exception as e:
-                results.append(f"[错误] {name}: {str(e)}")
-                fail_count += 1
+        accounts = list(config.accounts)
+        self.status_label.config(text=f"正在获取 {len(accounts)} 个账号的域名列表...")
         
-        # 显示结果
-        self.show_results(success_count, fail_count, results)
+        def fetch():
+            for account, api, zone_list, error in crawl_zones(accounts):
+                zones = [Zone.from_api(data) for data in zone_list or []]
+                self.runner.call_soon(self.on_account_loaded, account, len(accounts), zones, error)
         
-        if success_count > 0:
-            self.success = True
+        self.runner.submit(fetch, lambda _: self.on_loaded())
     
-    def show_results(self, success_count, fail_count, results):
-        """显示批量操作结果"""
-        result_dialog = tk.Toplevel(self.dialog)
-        result_dialog.title("批量修改结果")
-        result_dialog.geometry("900x500")
-        result_dialog.transient(self.dialog)
+    def on_account_loaded(self, account, account_count, zones, error):
+        """单个账号的域名获取完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.accounts_done += 1
+        if error:
+            self.load_errors.append(f"{account['name']}: {error}")
+        for zone in zones:
+            if zone.id in self.rows:
+                continue  # 多个凭据能看到同一个域名时只保留一行
+            self.rows[zone.id] = (zone, account['name'])
+            if self.matches(zone, account['name']):
+                self.zone_tree.insert("", tk.END, iid=zone.id, values=(zone.name, zone.status, account['name']))
+        
+        self.status_label.config(text=f"已完成 {self.accounts_done}/{account_count} 个账号，共 {len(self.rows)} 个域名")
+    
+    def on_loaded(self):
+        """全部账号获取完成（主线程）"""
+        self.loading = False
+        if not self.dialog.winfo_exists():
+            return
+        self.refresh_btn.config(state=tk.NORMAL)
+        if self.sort_column:
+            self.sort_items()
+        self.update_status()
+        
+        if self.load_errors:
+            messagebox.showwarning("警告", "部分账号获取失败:\n\n" + "\n".join(self.load_errors[:20]),
+                                   parent=self.dialog)
+    
+    def matches(self, zone, account_name):
+        """判断域名是否符合搜索条件（匹配域名或来源账号）"""
+        keyword = self.search_var.get().strip().lower()
+        return not keyword or keyword in zone.name.lower() or keyword in account_name.lower()
+    
+    def apply_filter(self):
+        """按搜索条件重新填充列表"""
+        for item in self.zone_tree.get_children():
+            self.zone_tree.delete(item)
+        
+        for zone, account_name in self.rows.values():
+            if self.matches(zone, account_name):
+                self.zone_tree.insert("", tk.END, iid=zone.id, values=(zone.name, zone.status, account_name))
+        
+        if self.sort_column:
+            self.sort_items()
+        self.update_status()
+    
+    def update_status(self):
+        """更新统计信息"""
+        shown = len(self.zone_tree.get_children())
+        text = f"共 {len(self.rows)} 个域名（已去重）"
+        if shown != len(self.rows):
+            text += f"，显示 {shown} 个"
+        self.status_label.config(text=text)
+    
+    def sort_by(self, column):
+        """点击列标题排序，再次点击反转顺序"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self.sort_items()
+    
+    def sort_items(self):
+        """按当前排序列重新排列"""
+        items = [(item_id, self.zone_tree.item(item_id)['values']) for item_id in self.zone_tree.get_children()]
+        
+        if self.sort_column == "status":
+            # 状态排序：pending -> active -> 其他
+            status_priority = {"pending": 0, "active": 1}
+            items.sort(key=lambda x: (status_priority.get(x[1][1], 2), x[1][1].lower()), reverse=self.sort_reverse)
+        else:
+            index = 0 if self.sort_column == "domain" else 2
+            items.sort(key=lambda x: str(x[1][index]).lower(), reverse=self.sort_reverse)
         
-        result_frame = ttk.Frame(result_dialog, padding="20")
-        result_frame.pack(fill=tk.BOTH, expand=True)
+        for index, (item_id, values) in enumerate(items):
+            self.zone_tree.move(item_id, "", index)
+    
+    def export(self):
+        """导出当前显示的域名（域名<Tab>来源账号）"""
+        items = self.zone_tree.get_children()
+        if not items:
+            messagebox.showwarning("警告", "当前没有域名可以导出")
+            return
         
-        summary = f"成功: {success_count}, 失败: {fail_count}\n\n"
-        ttk.Label(result_frame, text=summary, font=('TkDefaultFont', 10, 'bold')).pack(anchor=tk.W)
+        from tkinter import filedialog
+        import datetime
         
-        result_text = scrolledtext.ScrolledText(result_frame, width=100, height=20)
-        result_text.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        default_filename = f"全部账号域名_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         
-        for line in results:
-            result_text.insert(tk.END, line + '\n')
+        filepath = filedialog.asksaveasfilename(
+            parent=self.dialog,
+            title="导出域名列表",
+            defaultextension=".txt",
+            initialfile=default_filename,
+            filetypes=[
+                ("文本文件", "*.txt"),
+                ("所有文件", "*.*")
+            ]
+        )
+        
+        if not filepath:
+            return  # 用户取消
         
-        result_text.config(state=tk.DISABLED)
+        try:
+            # 按当前显示顺序写入
+            with open(filepath, 'w', encoding='utf-8') as f:
+                for item_id in items:
+                    zone, account_name = self.rows[item_id]
+                    f.write(f"{zone.name}\t{account_name}\n")
+            
+            messagebox.showinfo("成功", f"成功导出 {len(items)} 个域名到:\n{filepath}")
         
-        ttk.Button(result_frame, text="关闭", 
-                  command=lambda: [result_dialog.destroy(), self.dialog.destroy()]).pack(pady=(10, 0))
+        except Exception as e:
+            messagebox.showerror("错误", f"导出失败: {str(e)}")
 
 
 class PendingDomainsDialog:
     """Pending状态域名列表对话框"""
-    def __init__(self, parent, pending_domains):
+    def __init__(self, parent, pending_domains, api=None, runner=None, account_id=None, on_status_change=None):
         self.pending_domains = pending_domains
+        self.api = api
+        self.runner = runner
+        self.account_id = account_id
+        self.on_status_change = on_status_change  # 域名状态变化时回调 (zone_id, status)
+        self.watch_cancel = None
+        self.names = {}  # zone_id -> 域名
+        self.checked = 0
+        self.activated = 0
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(f"Pending状态域名列表 (共 {len(pending_domains)} 个)")
-        self.dialog.geometry("900x600")
+        self.dialog.geometry("900x650")
         self.dialog.transient(parent)
         self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
         
         self.setup_ui()
         
@@ -1888,9 +6261,92 @@ class PendingDomainsDialog:
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(pady=(10, 0))
         
+        if self.api and self.runner:
+            self.check_btn = ttk.Button(btn_frame, text="检查激活状态", command=self.start_activation_check)
+            self.check_btn.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="复制全部", command=self.copy_all).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="导出到文件", command=self.export_to_file).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="关闭", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="关闭", command=self.close).pack(side=tk.LEFT, padx=5)
+        
+        # 激活检查进度
+        self.check_label = ttk.Label(frame, text="", foreground="gray")
+        self.check_label.pack(anchor=tk.W, pady=(10, 0))
+        
+        self.check_log = scrolledtext.ScrolledText(frame, height=6, wrap=tk.WORD, font=('Consolas', 10))
+        self.check_log.pack(fill=tk.X, pady=(5, 0))
+        self.check_log.config(state=tk.DISABLED)
+    
+    def close(self):
+        """关闭对话框，停止激活状态轮询"""
+        if self.watch_cancel:
+            self.watch_cancel.set()
+        self.dialog.destroy()
+    
+    def start_activation_check(self):
+        """并发触发所有 pending 域名的激活检查，并在后台轮询状态变化"""
+        zone_ids = {info['zone_id']: info['domain'] for info in self.pending_domains if info.get('zone_id')}
+        if not zone_ids:
+            return
+        
+        self.names = zone_ids
+        self.checked = 0
+        self.activated = 0
+        self.check_btn.config(state=tk.DISABLED)
+        self.update_check_label()
+        
+        cancel_event = threading.Event()
+        self.watch_cancel = cancel_event
+        
+        def report(zone_id, status, error):
+            self.runner.call_soon(self.on_activation_report, cancel_event, zone_id, status, error)
+        
+        self.runner.submit(
+            lambda: (watch_activation(self.api, list(zone_ids), report, cancel_event, self.account_id), None),
+            lambda result: self.on_activation_finished(cancel_event, result))
+    
+    def on_activation_report(self, cancel_event, zone_id, status, error):
+        """激活检查的进度（主线程）"""
+        if cancel_event.is_set():
+            return
+        
+        domain = self.names.get(zone_id, zone_id)
+        if status is None:
+            self.checked += 1
+            if error:
+                self.append_check_log(f"✗ {domain}: {error}")
+        else:
+            self.append_check_log(f"✓ {domain}: {status}")
+            if status == 'active':
+                self.activated += 1
+            if self.on_status_change:
+                self.on_status_change(zone_id, status)
+        self.update_check_label()
+    
+    def on_activation_finished(self, cancel_event, result):
+        """轮询结束（主线程）"""
+        if cancel_event.is_set():
+            return
+        
+        self.watch_cancel = None
+        self.check_btn.config(state=tk.NORMAL)
+        remaining, error = result
+        if error:
+            self.append_check_log(f"激活检查出错: {error}")
+        self.update_check_label(" - 已结束")
+    
+    def update_check_label(self, extra=""):
+        """更新激活检查统计"""
+        total = len(self.names)
+        self.check_label.config(
+            text=f"激活检查: 已触发 {self.checked}/{total}，已激活 {self.activated}，"
+                 f"仍为 pending {total - self.activated}{extra}")
+    
+    def append_check_log(self, line):
+        """追加一行激活检查日志"""
+        self.check_log.config(state=tk.NORMAL)
+        self.check_log.insert(tk.END, line + "\n")
+        self.check_log.see(tk.END)
+        self.check_log.config(state=tk.DISABLED)
     
     def populate_content(self):
         """填充内容"""
@@ -1952,6 +6408,426 @@ class PendingDomainsDialog:
                 messagebox.showerror("错误", f"导出失败: {str(e)}")
 
 
+class JournalDialog:
+    """变更日志对话框：按任务列出本工具做过的记录变更，可整体撤销（撤销在任务队列中进行）"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.success = False
+        self.jobs = {}
+        self.revert_job = None  # 正在进行的撤销任务（ScheduledJob），关闭对话框不会取消
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("变更日志")
+        self.dialog.geometry("800x500")
+        self.dialog.transient(parent)
+        
+        self.setup_ui()
+        self.load()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Button(btn_frame, text="撤销所选任务", command=self.revert_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="刷新", command=self.load).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="关闭", command=self.dialog.destroy).pack(side=tk.LEFT, padx=2)
+        
+        self.status_label = ttk.Label(frame, text=f"日志文件: {os.path.abspath(journal.path)}", foreground="gray")
+        self.status_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        columns = ("time", "label", "count", "zones")
+        self.job_tree = ttk.Treeview(frame, columns=columns, show="headings", height=18, selectmode="browse")
+        self.job_tree.heading("time", text="时间")
+        self.job_tree.heading("label", text="操作")
+        self.job_tree.heading("count", text="记录数")
+        self.job_tree.heading("zones", text="域名数")
+        
+        self.job_tree.column("time", width=150, stretch=False)
+        self.job_tree.column("label", width=400)
+        self.job_tree.column("count", width=80, stretch=False)
+        self.job_tree.column("zones", width=80, stretch=False)
+        
+        self.job_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.job_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.job_tree.configure(yscrollcommand=scrollbar.set)
+    
+    def load(self):
+        """读取日志并按任务列出"""
+        for item in self.job_tree.get_children():
+            self.job_tree.delete(item)
+        
+        self.jobs = {job['job']: job for job in journal.jobs()}
+        for job in self.jobs.values():
+            self.job_tree.insert("", tk.END, iid=job['job'], values=(
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(job['time'])),
+                job['label'], job['count'], len(job['zones'])))
+    
+    def revert_selected(self):
+        """把撤销所选任务提交到任务队列"""
+        if self.revert_job:
+            messagebox.showwarning("警告", "正在撤销，请稍候", parent=self.dialog)
+            return
+        
+        selection = self.job_tree.selection()
+        if not selection:
+            messagebox.showwarning("警告", "请先选择要撤销的任务", parent=self.dialog)
+            return
+        
+        job = self.jobs[selection[0]]
+        if not messagebox.askyesno("确认", f"确定要撤销 \"{job['label']}\" 涉及的 {job['count']} 条记录变更吗?\n\n"
+                                           "被删除的记录会重新创建（记录 ID 会变化）。", parent=self.dialog):
+            return
+        
+        self.status_label.config(text=f"正在撤销 \"{job['label']}\"...")
+        self.revert_job = scheduler.submit(f"撤销: {job['label']}",
+                                           lambda control: self.run_revert(job, control),
+                                           on_done=lambda scheduled: self.runner.call_soon(self.on_reverted, scheduled))
+    
+    def run_revert(self, job, control):
+        """任务线程：各域名并发提交逆向变更；暂停或取消后不再提交新的域名"""
+        done = 0
+        success_count = 0
+        failures = []
+        control.progress(0, len(job['zones']))
+        for zone_id, outcome, error in journal.revert(job['job'], job['label'], cancel_event=control):
+            if zone_id is None or error:
+                failures.append(error if zone_id is None else f"{zone_id}: {error}")
+                control.log(f"❌ {failures[-1]}")
+                continue
+            for kind, item, result, item_error in outcome:
+                if item_error:
+                    failures.append(f"{zone_id} {item.get('id') or item.get('name')}: {item_error}")
+                    control.log(f"❌ {failures[-1]}")
+                else:
+                    success_count += 1
+            done += 1
+            control.progress(done, message=f"正在撤销: 已完成 {done}/{len(job['zones'])} 个域名")
+        
+        control.progress(message=f"成功: {success_count}, 失败: {len(failures)}")
+        return (success_count, failures), None
+    
+    def on_reverted(self, scheduled):
+        """撤销任务结束（主线程）"""
+        self.revert_job = None
+        success_count, failures = scheduled.result or (0, [])
+        self.success = self.success or success_count > 0
+        if not self.dialog.winfo_exists():
+            return
+        self.load()
+        
+        elapsed = scheduled.finished_at - (scheduled.started_at or scheduled.finished_at)
+        message = f"成功: {success_count}, 失败: {len(failures)}，用时 {elapsed:.1f} 秒"
+        if scheduled.state == ScheduledJob.CANCELLED:
+            message = f"已取消 ({message})"
+        elif scheduled.error:
+            failures = failures + [scheduled.error]
+        self.status_label.config(text=message)
+        if failures:
+            messagebox.showwarning("撤销完成", message + "\n\n" + "\n".join(failures[:20]), parent=self.dialog)
+        else:
+            messagebox.showinfo("撤销完成", message, parent=self.dialog)
+
+
+class BulkDeleteZonesDialog:
+    """批量删除域名：提交到任务队列并发删除（受限速控制），逐个显示结果"""
+    def __init__(self, parent, api, runner, zones, on_deleted=None):
+        self.api = api
+        self.zones = {zone.id: zone for zone in zones}
+        self.on_deleted = on_deleted  # 每删除成功一个域名时在主线程回调 (zone_id)
+        self.done = 0
+        self.fail_count = 0
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"批量删除域名 (共 {len(zones)} 个)")
+        self.dialog.geometry("700x450")
+        self.dialog.transient(parent)
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+        
+        self.job = scheduler.submit(f"批量删除域名 ({len(zones)} 个)",
+                                    lambda control: self.run(runner, control),
+                                    on_done=lambda job: runner.call_soon(self.on_finished, job.result))
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.progress_label = ttk.Label(frame, text="正在删除...", font=('TkDefaultFont', 10, 'bold'))
+        self.progress_label.pack(anchor=tk.W)
+        
+        self.result_text = scrolledtext.ScrolledText(frame, width=80, height=20)
+        self.result_text.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        self.result_text.config(state=tk.DISABLED)
+        
+        self.close_btn = ttk.Button(frame, text="关闭", command=self.dialog.destroy, state=tk.DISABLED)
+        self.close_btn.pack(pady=(10, 0))
+    
+    def run(self, runner, control):
+        """任务线程：并发删除，每完成一个转交主线程显示；暂停或取消后不再发送新的删除请求"""
+        def delete(zone_id):
+            if control.is_set():
+                return None, "已取消"
+            return self.api.delete_zone(zone_id)
+        
+        control.progress(0, len(self.zones))
+        done = 0
+        for zone_id, result, error in run_concurrently(delete, list(self.zones)):
+            done += 1
+            control.log(f"❌ {self.zones[zone_id].name}: {error}" if error else f"✓ {self.zones[zone_id].name}")
+            control.progress(done)
+            runner.call_soon(self.on_result, zone_id, error)
+        return True, None
+    
+    def on_result(self, zone_id, error):
+        """单个域名删除完成（主线程）"""
+        self.done += 1
+        zone = self.zones[zone_id]
+        if error:
+            self.fail_count += 1
+            line = f"❌ {zone.name}: {error}"
+        else:
+            line = f"✓ {zone.name}"
+            if self.on_deleted:
+                self.on_deleted(zone_id)
+        
+        if not self.dialog.winfo_exists():
+            return
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.insert(tk.END, line + "\n")
+        self.result_text.see(tk.END)
+        self.result_text.config(state=tk.DISABLED)
+        self.progress_label.config(text=f"正在删除: {self.done}/{len(self.zones)}，失败 {self.fail_count}")
+    
+    def on_finished(self, result):
+        """全部完成（主线程）"""
+        if not self.dialog.winfo_exists():
+            return
+        self.progress_label.config(
+            text=f"成功: {self.done - self.fail_count}, 失败: {self.fail_count}")
+        self.close_btn.config(state=tk.NORMAL)
+
+
+class JobQueueDialog:
+    """任务队列面板：列出排队中、运行中和已结束的批量任务，可暂停、取消和调整优先级"""
+    def __init__(self, parent, runner):
+        self.runner = runner
+        self.dirty = set()  # 状态有变化、等待刷新的任务
+        self.flush_pending = False
+        self.dirty_lock = threading.Lock()  # 保护 dirty 和 flush_pending（监听器在工作线程中调用）
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("任务队列")
+        self.dialog.geometry("900x450")
+        self.dialog.transient(parent)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.setup_ui()
+        for job in list(scheduler.jobs):
+            self.update_row(job)
+        scheduler.add_listener(self.on_job_changed)
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Button(btn_frame, text="暂停", command=lambda: self.each_selected(scheduler.pause)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="继续", command=lambda: self.each_selected(scheduler.resume)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="取消", command=self.cancel_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="提高优先级", command=lambda: self.shift_priority(1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="降低优先级", command=lambda: self.shift_priority(-1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="查看结果", command=self.show_lines).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="清除已结束", command=self.clear_finished).pack(side=tk.LEFT, padx=2)
+        
+        ttk.Label(btn_frame, text="同时运行:").pack(side=tk.LEFT, padx=(15, 2))
+        self.concurrency_var = tk.IntVar(value=scheduler.concurrency)
+        ttk.Spinbox(btn_frame, from_=1, to=8, width=4, textvariable=self.concurrency_var,
+                    command=self.set_concurrency).pack(side=tk.LEFT)
+        
+        columns = ("id", "label", "status", "priority", "progress", "message")
+        self.job_tree = ttk.Treeview(frame, columns=columns, show="headings", height=16)
+        self.job_tree.heading("id", text="#")
+        self.job_tree.heading("label", text="任务")
+        self.job_tree.heading("status", text="状态")
+        self.job_tree.heading("priority", text="优先级")
+        self.job_tree.heading("progress", text="进度")
+        self.job_tree.heading("message", text="信息")
+        
+        self.job_tree.column("id", width=40, stretch=False)
+        self.job_tree.column("label", width=300)
+        self.job_tree.column("status", width=70, stretch=False)
+        self.job_tree.column("priority", width=60, stretch=False)
+        self.job_tree.column("progress", width=120, stretch=False)
+        self.job_tree.column("message", width=250)
+        
+        self.job_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.job_tree.bind("<Double-1>", lambda e: self.show_lines())
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.job_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.job_tree.configure(yscrollcommand=scrollbar.set)
+    
+    def on_job_changed(self, job):
+        """调度器监听器（任意线程）：合并短时间内的多次变化，只转交主线程刷新一次"""
+        with self.dirty_lock:
+            self.dirty.add(job)
+            if self.flush_pending:
+                return
+            self.flush_pending = True
+        self.runner.call_soon(self.flush)
+    
+    def flush(self):
+        """刷新有变化的任务行（主线程）"""
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, set()
+            self.flush_pending = False
+        if not self.dialog.winfo_exists():
+            return
+        for job in sorted(dirty, key=lambda job: job.id):
+            self.update_row(job)
+    
+    def update_row(self, job):
+        values = (job.id, job.label, job.status_text(), job.priority, job.progress_text(), job.message)
+        iid = str(job.id)
+        if self.job_tree.exists(iid):
+            self.job_tree.item(iid, values=values)
+        elif job in scheduler.jobs:
+            self.job_tree.insert("", tk.END, iid=iid, values=values)
+    
+    def selected_jobs(self):
+        selection = set(self.job_tree.selection())
+        return [job for job in scheduler.jobs if str(job.id) in selection]
+    
+    def each_selected(self, action):
+        jobs = self.selected_jobs()
+        if not jobs:
+            messagebox.showwarning("警告", "请先选择任务", parent=self.dialog)
+            return
+        for job in jobs:
+            action(job)
+    
+    def cancel_selected(self):
+        """取消选中的任务；可恢复的批量任务下次打开对应对话框时可继续"""
+        jobs = [job for job in self.selected_jobs() if not job.is_finished()]
+        if not jobs:
+            return
+        if not messagebox.askyesno("确认", f"确定要取消选中的 {len(jobs)} 个任务吗？", parent=self.dialog):
+            return
+        for job in jobs:
+            scheduler.cancel(job)
+    
+    def shift_priority(self, delta):
+        self.each_selected(lambda job: scheduler.set_priority(job, job.priority + delta))
+    
+    def set_concurrency(self):
+        try:
+            scheduler.set_concurrency(int(self.concurrency_var.get()))
+        except (ValueError, tk.TclError):
+            pass
+    
+    def show_lines(self):
+        """显示选中任务的结果行"""
+        jobs = self.selected_jobs()
+        if not jobs:
+            return
+        job = jobs[0]
+        
+        result_dialog = tk.Toplevel(self.dialog)
+        result_dialog.title(f"#{job.id} {job.label}")
+        result_dialog.geometry("700x500")
+        result_dialog.transient(self.dialog)
+        
+        summary = f"{job.status_text()}  {job.progress_text()}  {job.message}".strip()
+        ttk.Label(result_dialog, text=summary, font=('TkDefaultFont', 10, 'bold')).pack(pady=10)
+        
+        text = scrolledtext.ScrolledText(result_dialog, width=80, height=25)
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        text.insert(tk.END, "\n".join(job.lines))
+        text.config(state=tk.DISABLED)
+        
+        ttk.Button(result_dialog, text="关闭", command=result_dialog.destroy).pack(pady=(0, 10))
+        center_window(result_dialog, self.dialog)
+    
+    def clear_finished(self):
+        for job in scheduler.clear_finished():
+            if self.job_tree.exists(str(job.id)):
+                self.job_tree.delete(str(job.id))
+    
+    def close(self):
+        """关闭面板（任务继续在后台运行）"""
+        scheduler.remove_listener(self.on_job_changed)
+        self.dialog.destroy()
+
+
+class SyncChangesDialog:
+    """最近一轮后台同步的变更列表"""
+    def __init__(self, parent, summary):
+        self.summary = summary
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("最近一次同步的变更")
+        self.dialog.geometry("900x500")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.setup_ui()
+        
+        # 居中显示
+        center_window(self.dialog, parent)
+    
+    def setup_ui(self):
+        """设置界面"""
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        finished = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.summary['finished_at']))
+        ttk.Label(frame, text=f"{finished}  {describe_sync_run(self.summary)}").pack(anchor=tk.W, pady=(0, 5))
+        
+        columns = ("zone", "operation", "type", "name", "detail")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=18)
+        tree.heading("zone", text="域名")
+        tree.heading("operation", text="操作")
+        tree.heading("type", text="类型")
+        tree.heading("name", text="名称")
+        tree.heading("detail", text="说明")
+        
+        tree.column("zone", width=160)
+        tree.column("operation", width=50, stretch=False)
+        tree.column("type", width=60, stretch=False)
+        tree.column("name", width=220)
+        tree.column("detail", width=350)
+        
+        for _, zone_name, operation, record_type, name, detail in self.summary['changes']:
+            tree.insert("", tk.END, values=(zone_name, operation, record_type, name, detail))
+        for error in self.summary['errors']:
+            tree.insert("", tk.END, values=("", "失败", "", "", error))
+        
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.configure(yscrollcommand=scrollbar.set)
+
+
 # ==================== 主窗口 ====================
 
 class MainWindow:
@@ -1963,14 +6839,43 @@ class MainWindow:
         self.api = None
         self.current_zone = None
         self.zones_data = {}
+        self.record_model = RecordListModel()  # 当前域名的DNS记录（筛选、排序、选中状态）
+        self.records_data = self.record_model.records  # record_id -> record
+        self.pending_records = {}  # 乐观更新中、请求尚未完成的记录 record_id -> 预期的新记录（删除为 None）
+        self.record_errors = {}  # 最近一次操作失败并已回滚的记录 record_id -> 错误信息
+        self.record_offset = 0  # 记录列表可见区域第一行在 view 中的位置
+        self.record_rows = 20  # 记录列表可见行数，随窗口大小更新
         self.sort_column = None  # 当前排序列
         self.sort_reverse = False  # 排序方向
         self.available_accounts = []  # 可用的 Account ID 列表
         self.current_account_id = None  # 当前选择的 Account ID
+        self.select_after_id = None  # 域名选择防抖定时器
+        self.records_cancel = None  # 正在进行的记录加载的取消标记
+        self.domains_cancel = None  # 正在进行的域名加载的取消标记
+        self.prefetch_after_id = None  # 相邻域名预取定时器
+        self.sync_daemon = None  # 后台同步
+        self.job_queue_dialog = None  # 任务队列面板
+        
+        self.runner = BackgroundRunner(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        CloudflareAPI.add_mutation_listener(self.on_api_mutation)
         
         self.setup_ui()
         self.check_config()
     
+    def on_close(self):
+        """关闭窗口"""
+        unfinished = [job for job in scheduler.jobs if not job.is_finished()]
+        if unfinished and not messagebox.askyesno(
+                "确认", f"还有 {len(unfinished)} 个任务未完成，确定要退出吗？\n\n可恢复的批量添加任务下次可以继续。"):
+            return
+        for job in unfinished:
+            scheduler.cancel(job)
+        if self.sync_daemon:
+            self.sync_daemon.stop()
+        self.runner.shutdown()
+        self.root.destroy()
+    
     def setup_ui(self):
         """设置界面"""
         # 菜单栏
@@ -1982,6 +6887,22 @@ class MainWindow:
         menubar.add_cascade(label="设置", menu=settings_menu)
         settings_menu.add_command(label="账号管理", command=self.show_account_manage)
         
+        # 工具菜单
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="工具", menu=tools_menu)
+        tools_menu.add_command(label="跨域名批量替换", command=self.show_bulk_replace_dialog)
+        tools_menu.add_command(label="反向查找 (IP/主机名)", command=self.show_reverse_lookup_dialog)
+        tools_menu.add_command(label="全文搜索记录", command=self.show_record_search_dialog)
+        tools_menu.add_command(label="期望状态同步", command=self.show_sync_dialog)
+        tools_menu.add_command(label="记录模板", command=self.show_template_dialog)
+        tools_menu.add_command(label="全部账号域名总览", command=self.show_all_zones_dialog)
+        tools_menu.add_command(label="变更日志 / 撤销", command=self.show_journal_dialog)
+        tools_menu.add_command(label="任务队列", command=self.show_job_queue)
+        tools_menu.add_separator()
+        self.sync_var = tk.BooleanVar(value=False)
+        tools_menu.add_checkbutton(label="后台同步", variable=self.sync_var, command=self.toggle_sync)
+        tools_menu.add_command(label="最近一次同步的变更", command=self.show_sync_changes)
+        
         # 顶部工具栏
         toolbar = ttk.Frame(self.root)
         toolbar.pack(fill=tk.X, padx=10, pady=5)
@@ -2002,6 +6923,10 @@ class MainWindow:
         self.account_id_combo.pack(side=tk.LEFT, padx=2)
         self.account_id_combo.bind("<<ComboboxSelected>>", self.on_account_id_changed)
         
+        # 后台同步状态
+        self.sync_label = ttk.Label(toolbar, text="", foreground="gray")
+        self.sync_label.pack(side=tk.RIGHT, padx=5)
+        
         # 主框架
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -2009,6 +6934,7 @@ class MainWindow:
         # 左侧：域名列表
         left_frame = ttk.LabelFrame(main_frame, text="域名列表", padding="5")
         left_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 5))
+        self.domain_frame = left_frame
         
         # 域名列表按钮
         domain_btn_frame = ttk.Frame(left_frame)
@@ -2022,7 +6948,8 @@ class MainWindow:
         ttk.Button(domain_btn_frame, text="导出域名", command=self.export_domains).pack(side=tk.LEFT, padx=2)
         
         # 域名列表
-        self.domain_tree = ttk.Treeview(left_frame, columns=("domain", "status"), show="headings", height=15)
+        self.domain_tree = ttk.Treeview(left_frame, columns=("domain", "status"), show="headings", height=15,
+                                        selectmode="extended")
         self.domain_tree.heading("domain", text="域名", command=lambda: self.sort_domains("domain"))
         self.domain_tree.heading("status", text="状态", command=lambda: self.sort_domains("status"))
         self.domain_tree.column("domain", width=250, minwidth=150, stretch=True)
@@ -2050,12 +6977,13 @@ class MainWindow:
         # 右侧：DNS记录
         right_frame = ttk.LabelFrame(main_frame, text="DNS记录", padding="5")
         right_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.record_frame = right_frame
         
         # DNS记录按钮
         record_btn_frame = ttk.Frame(right_frame)
         record_btn_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
         
-        ttk.Button(record_btn_frame, text="刷新", command=self.refresh_records).pack(side=tk.LEFT, padx=2)
+        ttk.Button(record_btn_frame, text="刷新", command=lambda: self.refresh_records(force=True)).pack(side=tk.LEFT, padx=2)
         ttk.Button(record_btn_frame, text="添加记录", command=self.show_add_record_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(record_btn_frame, text="批量添加", command=self.show_batch_add_records_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(record_btn_frame, text="修改记录", command=self.show_edit_record_dialog).pack(side=tk.LEFT, padx=2)
@@ -2066,16 +6994,48 @@ class MainWindow:
         ttk.Button(record_btn_frame, text="批量开启代理", command=lambda: self.batch_toggle_proxy(True)).pack(side=tk.LEFT, padx=2)
         ttk.Button(record_btn_frame, text="批量关闭代理", command=lambda: self.batch_toggle_proxy(False)).pack(side=tk.LEFT, padx=2)
         
-        # DNS记录列表
+        # 记录筛选栏（在记录模型上即时筛选）
+        filter_frame = ttk.Frame(right_frame)
+        filter_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="类型:").pack(side=tk.LEFT)
+        self.filter_type_var = tk.StringVar(value="全部")
+        self.filter_type_combo = ttk.Combobox(filter_frame, textvariable=self.filter_type_var,
+                                              values=["全部"], state="readonly", width=8)
+        self.filter_type_combo.pack(side=tk.LEFT, padx=(2, 8))
+        self.filter_type_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_record_filter())
+        
+        ttk.Label(filter_frame, text="名称:").pack(side=tk.LEFT)
+        self.filter_name_var = tk.StringVar()
+        filter_name_entry = ttk.Entry(filter_frame, textvariable=self.filter_name_var, width=18)
+        filter_name_entry.pack(side=tk.LEFT, padx=(2, 8))
+        filter_name_entry.bind("<KeyRelease>", lambda e: self.apply_record_filter())
+        
+        ttk.Label(filter_frame, text="内容:").pack(side=tk.LEFT)
+        self.filter_content_var = tk.StringVar()
+        filter_content_entry = ttk.Entry(filter_frame, textvariable=self.filter_content_var, width=18)
+        filter_content_entry.pack(side=tk.LEFT, padx=(2, 8))
+        filter_content_entry.bind("<KeyRelease>", lambda e: self.apply_record_filter())
+        
+        ttk.Label(filter_frame, text="代理:").pack(side=tk.LEFT)
+        self.filter_proxy_var = tk.StringVar(value="全部")
+        filter_proxy_combo = ttk.Combobox(filter_frame, textvariable=self.filter_proxy_var,
+                                          values=["全部", "是", "否"], state="readonly", width=5)
+        filter_proxy_combo.pack(side=tk.LEFT, padx=(2, 8))
+        filter_proxy_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_record_filter())
+        
+        ttk.Button(filter_frame, text="清除筛选", command=self.clear_record_filter).pack(side=tk.LEFT, padx=2)
+        
+        # DNS记录列表：虚拟列表，只插入可见区域的行，滚动时按模型偏移量重新渲染
         self.record_tree = ttk.Treeview(right_frame, 
                                         columns=("type", "name", "content", "proxy", "ttl"), 
                                         show="headings", 
                                         height=20)
-        self.record_tree.heading("type", text="类型")
-        self.record_tree.heading("name", text="名称")
-        self.record_tree.heading("content", text="内容")
-        self.record_tree.heading("proxy", text="代理")
-        self.record_tree.heading("ttl", text="TTL")
+        self.record_tree.heading("type", text="类型", command=lambda: self.sort_records("type"))
+        self.record_tree.heading("name", text="名称", command=lambda: self.sort_records("name"))
+        self.record_tree.heading("content", text="内容", command=lambda: self.sort_records("content"))
+        self.record_tree.heading("proxy", text="代理", command=lambda: self.sort_records("proxy"))
+        self.record_tree.heading("ttl", text="TTL", command=lambda: self.sort_records("ttl"))
         
         self.record_tree.column("type", width=80, minwidth=60, stretch=False)
         self.record_tree.column("name", width=250, minwidth=150, stretch=True)
@@ -2083,18 +7043,37 @@ class MainWindow:
         self.record_tree.column("proxy", width=60, minwidth=50, stretch=False)
         self.record_tree.column("ttl", width=80, minwidth=60, stretch=False)
         
-        self.record_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.record_tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # 垂直滚动条
-        record_scroll_y = ttk.Scrollbar(right_frame, orient=tk.VERTICAL, command=self.record_tree.yview)
-        record_scroll_y.grid(row=1, column=1, sticky=(tk.N, tk.S))
-        self.record_tree.configure(yscrollcommand=record_scroll_y.set)
+        # 垂直滚动条对应模型中的位置，而不是 Treeview 中的行
+        self.record_scroll_y = ttk.Scrollbar(right_frame, orient=tk.VERTICAL, command=self.on_record_scroll)
+        self.record_scroll_y.grid(row=2, column=1, sticky=(tk.N, tk.S))
+        
+        self.record_tree.bind("<Configure>", self.on_record_tree_resize)
+        self.record_tree.bind("<MouseWheel>", self.on_record_wheel)
+        self.record_tree.bind("<Button-4>", self.on_record_wheel)
+        self.record_tree.bind("<Button-5>", self.on_record_wheel)
+        self.record_tree.bind("<Button-1>", self.on_record_click)
+        self.record_tree.bind("<<TreeviewSelect>>", self.on_record_select)
+        self.record_tree.bind("<Up>", self.on_record_key)
+        self.record_tree.bind("<Down>", self.on_record_key)
+        self.record_tree.bind("<Prior>", self.on_record_key)
+        self.record_tree.bind("<Next>", self.on_record_key)
+        self.record_tree.bind("<Control-a>", self.select_all_records)
         
         # 横向滚动条
         record_scroll_x = ttk.Scrollbar(right_frame, orient=tk.HORIZONTAL, command=self.record_tree.xview)
-        record_scroll_x.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        record_scroll_x.grid(row=3, column=0, sticky=(tk.W, tk.E))
         self.record_tree.configure(xscrollcommand=record_scroll_x.set)
         
+        # 提交中的行显示为灰色，失败已回滚的行显示为红色并在类型前加 ⚠
+        self.record_tree.tag_configure("pending", foreground="gray")
+        self.record_tree.tag_configure("error", foreground="red")
+        
+        # 记录操作结果汇总
+        self.record_status_label = ttk.Label(right_frame, text="", foreground="gray")
+        self.record_status_label.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
         # 配置权重
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=1)
@@ -2104,7 +7083,7 @@ class MainWindow:
         left_frame.columnconfigure(0, weight=1)
         left_frame.rowconfigure(1, weight=1)
         right_frame.columnconfigure(0, weight=1)
-        right_frame.rowconfigure(1, weight=1)
+        right_frame.rowconfigure(2, weight=1)
     
     def update_account_label(self):
         """更新账号标签"""
@@ -2119,8 +7098,15 @@ class MainWindow:
         if not self.api:
             return
         
-        # 获取账号列表
-        result, error = self.api.get_accounts()
+        # 在后台获取账号列表（多页时解码不占用界面线程）
+        api = self.api
+        self.runner.submit(api.get_accounts, lambda outcome: self.on_account_ids_loaded(api, outcome))
+    
+    def on_account_ids_loaded(self, api, outcome):
+        """账号列表获取完成（主线程）"""
+        if api is not self.api:
+            return  # 已切换到其他账号
+        result, error = outcome
         
         if error or not result:
             # 如果获取失败，使用配置中的 account_id
@@ -2152,6 +7138,10 @@ class MainWindow:
                         'id': acc.get('id', ''),
                         'name': f"{acc.get('name', '未命名')} ({acc.get('id', '')[:8]}...)"
                     })
+            
+            account = config.get_current_account()
+            if account:
+                registry.register_account_ids(account, [acc['id'] for acc in self.available_accounts])
         
         # 更新下拉菜单
         self.update_account_id_combo()
@@ -2189,8 +7179,8 @@ class MainWindow:
                 self.current_account_id = acc['id']
                 break
         
-        # 刷新域名列表
-        self.refresh_domains()
+        # 显示域名列表（有缓存时不重新获取）
+        self.show_domains()
     
     def check_config(self):
         """检查配置"""
@@ -2199,73 +7189,119 @@ class MainWindow:
         else:
             account = config.get_current_account()
             if account:
-                self.api = CloudflareAPI(
-                    account['api_token'], 
-                    account.get('account_id', ''),
-                    account.get('email', ''),
-                    account.get('auth_type', 'token')
-                )
-                self.update_account_label()
-                self.load_account_ids()  # 加载 Account ID 列表
-                self.refresh_domains()
+                self.switch_account(account)
     
     def show_account_manage(self):
         """显示账号管理对话框"""
-        dialog = AccountManageDialog(self.root)
+        dialog = AccountManageDialog(self.root, self.runner)
         self.root.wait_window(dialog.dialog)
         
         # 刷新当前账号
         account = config.get_current_account()
         if account:
-            self.api = CloudflareAPI(
-                account['api_token'], 
-                account.get('account_id', ''),
-                account.get('email', ''),
-                account.get('auth_type', 'token')
-            )
-            self.update_account_label()
-            self.load_account_ids()  # 加载 Account ID 列表
-            self.refresh_domains()
+            self.switch_account(account)
+    
+    def switch_account(self, account):
+        """切换到指定账号，复用注册表中该凭据的客户端（连接池）及其缓存的数据"""
+        # 保存当前账号的界面状态，切回时恢复
+        if self.api:
+            self.api.cache['current_account_id'] = self.current_account_id
+        
+        self.api = registry.get_client(account)
+        self.current_account_id = self.api.cache.get('current_account_id')
+        self.update_account_label()
+        self.load_account_ids()  # 加载 Account ID 列表
+        self.show_domains()
+    
+    def show_domains(self):
+        """显示域名列表，客户端中有缓存时直接使用，否则从 API 获取"""
+        key = ('zones', self.current_account_id or '')
+        zones = self.api.cache.get(key)
+        if zones is None:
+            # 后台同步写入的本地缓存足够新时直接使用
+            account = config.get_current_account()
+            zones = local_cache.load_zones(credential_id(account), self.current_account_id) if account else None
+            if zones is None:
+                self.refresh_domains()
+                return
+            self.api.cache[key] = zones
+        
+        self.clear_domains()
+        self.populate_domains(zones)
+    
+    def clear_domains(self):
+        """清空域名列表，并取消仍在进行的域名加载"""
+        if self.domains_cancel:
+            self.domains_cancel.set()
+            self.domains_cancel = None
+        self.domain_frame.config(text="域名列表")
+        
+        for item in self.domain_tree.get_children():
+            self.domain_tree.delete(item)
+        self.zones_data.clear()
     
     def refresh_domains(self):
-        """刷新域名列表"""
+        """刷新域名列表（后台逐页加载，每到一页立即追加显示）"""
         if not self.api:
             messagebox.showwarning("警告", "请先配置账号")
             return
         
         # 清空列表
-        for item in self.domain_tree.get_children():
-            self.domain_tree.delete(item)
+        self.clear_domains()
+        self.domain_frame.config(text="域名列表 (正在加载...)")
         
-        self.zones_data.clear()
+        api = self.api
+        # 如果 current_account_id 为空字符串，表示"所有账号"
+        account_id = self.current_account_id or ''
+        cancel_event = threading.Event()
+        self.domains_cancel = cancel_event
         
-        # 显示加载提示
-        loading_id = self.domain_tree.insert("", tk.END, values=("正在加载域名列表...", ""))
-        self.root.update()
+        def fetch():
+            for zones, error in api.iter_zones(account_id or None, cancel_event):
+                if error:
+                    return None, error
+                self.runner.call_soon(self.on_zones_page, cancel_event,
+                                      [Zone.from_api(zone) for zone in zones])
+            return True, None
         
-        # 获取域名列表 - 使用当前选择的 Account ID
-        # 如果 current_account_id 为空字符串，表示"所有账号"
-        zones, error = self.api.get_zones(self.current_account_id if self.current_account_id else None)
+        self.runner.submit(fetch, lambda result: self.on_zones_loaded(api, account_id, cancel_event, result))
+    
+    def on_zones_page(self, cancel_event, zones):
+        """收到一页域名（主线程），追加到列表末尾"""
+        if cancel_event.is_set():
+            return
+        self.populate_domains(zones)
+        self.domain_frame.config(text=f"域名列表 (正在加载... 已获取 {len(self.zones_data)} 个)")
+    
+    def on_zones_loaded(self, api, account_id, cancel_event, result):
+        """域名全部加载完成（主线程），已取消时丢弃结果"""
+        if cancel_event.is_set():
+            return
         
-        # 删除加载提示
-        self.domain_tree.delete(loading_id)
+        self.domains_cancel = None
+        self.domain_frame.config(text="域名列表")
         
+        _, error = result
         if error:
             messagebox.showerror("错误", f"获取域名列表失败: {error}")
             return
         
-        # 填充列表
-        if zones:
-            for zone in zones:
-                zone_id = zone['id']
-                domain = zone['name']
-                status = zone['status']
-                
-                self.zones_data[zone_id] = zone
-                self.domain_tree.insert("", tk.END, iid=zone_id, values=(domain, status))
-            
-            # 显示统计信息
-            self.root.title(f"Cloudflare DNS 域名管理工具 - 多账号版 ({len(zones)} 个域名)")
+        api.cache[('zones', account_id)] = list(self.zones_data.values())
+        self.update_domains_title()
+    
+    def populate_domains(self, zones):
+        """把域名追加到域名列表"""
+        for zone in zones:
+            if zone.id in self.zones_data:
+                continue
+            self.zones_data[zone.id] = zone
+            self.domain_tree.insert("", tk.END, iid=zone.id, values=(zone.name, zone.status))
+        self.update_domains_title()
+    
+    def update_domains_title(self):
+        """在窗口标题中显示域名数量"""
+        if self.zones_data:
+            self.root.title(f"Cloudflare DNS 域名管理工具 - 多账号版 ({len(self.zones_data)} 个域名)")
         else:
             self.root.title("Cloudflare DNS 域名管理工具 - 多账号版")
     
@@ -2309,36 +7345,50 @@ class MainWindow:
             self.domain_tree.heading("status", text=f"状态{arrow}")
     
     def show_pending_domains(self):
-        """显示所有pending状态的域名"""
+        """显示所有pending状态的域名（缺少名称服务器信息的在后台并发获取）"""
         if not self.api:
             messagebox.showwarning("警告", "请先配置账号")
             return
         
         # 收集pending域名
-        pending_domains = []
-        for zone_id, zone in self.zones_data.items():
-            if zone.get('status') == 'pending':
-                domain_name = zone.get('name')
-                name_servers = zone.get('name_servers', [])
-                
-                # 如果没有名称服务器信息，尝试获取
-                if not name_servers:
-                    ns_list, error = self.api.get_zone_nameservers(zone_id)
-                    if not error and ns_list:
-                        name_servers = ns_list
-                        zone['name_servers'] = ns_list
-                
-                pending_domains.append({
-                    'domain': domain_name,
-                    'nameservers': name_servers
-                })
-        
-        if not pending_domains:
+        zones = [zone for zone in self.zones_data.values() if zone.status == 'pending']
+        if not zones:
             messagebox.showinfo("提示", "没有pending状态的域名")
             return
         
+        api = self.api
+        missing = [zone for zone in zones if not zone.name_servers]
+        
+        def fetch():
+            for zone, ns_list, error in run_concurrently(lambda z: api.get_zone_nameservers(z.id), missing):
+                if not error and ns_list:
+                    zone.name_servers = tuple(ns_list)
+        
+        self.runner.submit(fetch, lambda _: self.on_pending_nameservers_loaded(api, zones))
+    
+    def on_pending_nameservers_loaded(self, api, zones):
+        """pending 域名的名称服务器获取完成（主线程）：账号未切换时打开对话框"""
+        if api is not self.api:
+            return
+        
+        pending_domains = [{
+            'zone_id': zone.id,
+            'domain': zone.name,
+            'nameservers': zone.name_servers
+        } for zone in zones]
+        
         # 创建对话框显示pending域名
-        PendingDomainsDialog(self.root, pending_domains)
+        PendingDomainsDialog(self.root, pending_domains, self.api, self.runner,
+                             self.current_account_id or None, self.on_zone_status_changed)
+    
+    def on_zone_status_changed(self, zone_id, status):
+        """域名状态变化（如激活检查发现已激活）时只更新对应的一行"""
+        zone = self.zones_data.get(zone_id)
+        if zone is None:
+            return
+        zone.status = sys.intern(status)
+        if self.domain_tree.exists(zone_id):
+            self.domain_tree.item(zone_id, values=(zone.name, zone.status))
     
     def export_domains(self):
         """导出所有域名到文本文件"""
@@ -2370,10 +7420,9 @@ class MainWindow:
         try:
             # 收集所有域名
             domains = []
-            for zone_id, zone in self.zones_data.items():
-                domain_name = zone.get('name')
-                if domain_name:
-                    domains.append(domain_name)
+            for zone in self.zones_data.values():
+                if zone.name:
+                    domains.append(zone.name)
             
             # 排序
             domains.sort()
@@ -2390,13 +7439,34 @@ class MainWindow:
             messagebox.showerror("错误", f"导出失败: {str(e)}")
     
     def on_domain_select(self, event):
-        """域名选择事件"""
+        """域名选择事件
+        
+        选择变化后先清空记录列表，停留 SELECT_DEBOUNCE_MS 毫秒后才加载，
+        用方向键快速浏览时中间经过的域名不会发起请求。
+        """
         selection = self.domain_tree.selection()
         if not selection:
             return
         
         zone_id = selection[0]
+        if zone_id == self.current_zone and self.select_after_id is None:
+            return
+        
         self.current_zone = zone_id
+        self.clear_records()
+        
+        if self.prefetch_after_id:
+            self.root.after_cancel(self.prefetch_after_id)
+            self.prefetch_after_id = None
+        if self.select_after_id:
+            self.root.after_cancel(self.select_after_id)
+        self.select_after_id = self.root.after(SELECT_DEBOUNCE_MS, lambda: self.on_selection_settled(zone_id))
+    
+    def on_selection_settled(self, zone_id):
+        """选择停留后加载名称服务器和DNS记录"""
+        self.select_after_id = None
+        if zone_id != self.current_zone:
+            return
         
         # 显示名称服务器
         self.show_nameservers(zone_id)
@@ -2408,66 +7478,360 @@ class MainWindow:
         """显示名称服务器"""
         self.ns_text.delete(1.0, tk.END)
         
-        if zone_id in self.zones_data:
-            zone = self.zones_data[zone_id]
-            name_servers = zone.get('name_servers', [])
-            
-            if name_servers:
-                domain_name = zone.get('name', '')
-                self.ns_text.insert(tk.END, f"域名: {domain_name}\n\n")
-                self.ns_text.insert(tk.END, "请将域名的DNS服务器更改为:\n\n")
-                for i, ns in enumerate(name_servers, 1):
-                    self.ns_text.insert(tk.END, f"{i}. {ns}\n")
-                
-                self.ns_text.insert(tk.END, f"\n共 {len(name_servers)} 个名称服务器")
-            else:
-                # 如果zones_data中没有，尝试重新获取
-                ns_list, error = self.api.get_zone_nameservers(zone_id)
-                if error:
-                    self.ns_text.insert(tk.END, f"获取名称服务器失败: {error}")
-                elif ns_list:
-                    domain_name = zone.get('name', '')
-                    self.ns_text.insert(tk.END, f"域名: {domain_name}\n\n")
-                    self.ns_text.insert(tk.END, "请将域名的DNS服务器更改为:\n\n")
-                    for i, ns in enumerate(ns_list, 1):
-                        self.ns_text.insert(tk.END, f"{i}. {ns}\n")
-                    
-                    self.ns_text.insert(tk.END, f"\n共 {len(ns_list)} 个名称服务器")
-                    
-                    # 更新缓存
-                    zone['name_servers'] = ns_list
-                else:
-                    self.ns_text.insert(tk.END, "暂无名称服务器信息")
-        else:
+        if zone_id not in self.zones_data:
             self.ns_text.insert(tk.END, "请先选择域名")
+            return
+        
+        zone = self.zones_data[zone_id]
+        
+        if zone.name_servers:
+            self.insert_nameservers(zone, zone.name_servers)
+            return
+        
+        # 如果zones_data中没有，在后台重新获取
+        self.ns_text.insert(tk.END, "正在获取名称服务器...")
+        api = self.api
+        self.runner.submit(lambda: api.get_zone_nameservers(zone_id),
+                           lambda result: self.on_nameservers_loaded(zone_id, result))
+    
+    def on_nameservers_loaded(self, zone_id, result):
+        """名称服务器获取完成（主线程）"""
+        if zone_id != self.current_zone:
+            return
+        
+        ns_list, error = result
+        zone = self.zones_data.get(zone_id)
+        self.ns_text.delete(1.0, tk.END)
+        
+        if error:
+            self.ns_text.insert(tk.END, f"获取名称服务器失败: {error}")
+        elif ns_list and zone:
+            # 更新缓存
+            zone.name_servers = tuple(ns_list)
+            self.insert_nameservers(zone, zone.name_servers)
+        else:
+            self.ns_text.insert(tk.END, "暂无名称服务器信息")
     
-    def refresh_records(self):
-        """刷新DNS记录"""
+    def insert_nameservers(self, zone, name_servers):
+        """填充名称服务器信息"""
+        self.ns_text.insert(tk.END, f"域名: {zone.name}\n\n")
+        self.ns_text.insert(tk.END, "请将域名的DNS服务器更改为:\n\n")
+        for i, ns in enumerate(name_servers, 1):
+            self.ns_text.insert(tk.END, f"{i}. {ns}\n")
+        
+        self.ns_text.insert(tk.END, f"\n共 {len(name_servers)} 个名称服务器")
+    
+    def clear_records(self):
+        """清空DNS记录列表，并取消正在进行的加载"""
+        if self.records_cancel:
+            self.records_cancel.set()
+            self.records_cancel = None
+            self.record_frame.config(text="DNS记录")
+        
+        self.record_model.clear()
+        self.pending_records.clear()
+        self.record_errors.clear()
+        self.record_status_label.config(text="")
+        self.record_offset = 0
+        self.render_records()
+    
+    def refresh_records(self, force=False):
+        """刷新DNS记录（后台加载，切换到其他域名时自动取消）
+        
+        缓存中有该域名时立即显示缓存，同时在后台重新获取并在有变化时更新；
+        force 为 True（刷新按钮）时忽略缓存。
+        """
         if not self.current_zone:
             return
         
+        zone_id = self.current_zone
+        api = self.api
+        
         # 清空列表
-        for item in self.record_tree.get_children():
-            self.record_tree.delete(item)
+        self.clear_records()
+        
+        cached = None if force else record_cache.get(zone_id)
+        if cached is None and not force:
+            # 后台同步写入的本地缓存足够新时直接使用，不请求 API
+            records = local_cache.load_records(zone_id)
+            if records is not None:
+                record_cache.put(zone_id, records)
+                self.populate_records(records)
+                self.schedule_prefetch()
+                return
+        
+        if cached is not None:
+            self.populate_records(cached)
+            self.record_frame.config(text="DNS记录 (正在后台更新...)")
+        else:
+            self.record_frame.config(text="DNS记录 (正在加载...)")
+        
+        cancel_event = threading.Event()
+        self.records_cancel = cancel_event
+        
+        self.runner.submit(lambda: api.list_dns_records(zone_id, cancel_event=cancel_event),
+                           lambda result: self.on_records_loaded(zone_id, cancel_event, result, cached))
+    
+    def on_records_loaded(self, zone_id, cancel_event, result, cached=None):
+        """DNS记录加载完成（主线程），已取消或已切换域名时丢弃结果"""
+        if cancel_event.is_set() or zone_id != self.current_zone:
+            return
+        
+        self.records_cancel = None
+        self.update_records_title()
         
-        # 获取DNS记录
-        records, error = self.api.list_dns_records(self.current_zone)
+        records, error = result
+        if not error:
+            records = [DnsRecord.from_api(record, zone_id) for record in records]
         if error:
-            messagebox.showerror("错误", f"获取DNS记录失败: {error}")
+            if cached is not None:
+                # 已显示缓存，后台更新失败时只提示，不弹窗
+                self.record_frame.config(text=f"DNS记录 (后台更新失败: {error})")
+            else:
+                messagebox.showerror("错误", f"获取DNS记录失败: {error}")
             return
         
-        # 填充列表
-        if records:
-            for record in records:
-                record_id = record['id']
-                record_type = record['type']
-                name = record['name']
-                content = record['content']
-                proxied = "是" if record.get('proxied') else "否"
-                ttl = record['ttl']
-                
-                self.record_tree.insert("", tk.END, iid=record_id, 
-                                      values=(record_type, name, content, proxied, ttl))
+        record_cache.put(zone_id, records)
+        
+        # 与已显示的缓存相同时不重绘
+        if records != cached:
+            self.populate_records(records)
+        
+        # 顺便更新反向索引
+        zone = self.zones_data.get(zone_id)
+        account = config.get_current_account()
+        record_index.update_zone(zone_id, records,
+                                 account['name'] if account else None, zone.name if zone else None)
+        
+        self.schedule_prefetch()
+    
+    def populate_records(self, records):
+        """填充DNS记录列表（保留仍存在的选中项和滚动位置）"""
+        self.record_model.set_records(records)
+        self.update_record_type_filter()
+        self.render_records()
+    
+    def on_api_mutation(self, api, method, endpoint, data, result):
+        """写操作监听器（任意线程）：当前域名的记录被修改时把返回的增量转交主线程更新列表"""
+        mutation = record_mutation(method, endpoint, result)
+        if mutation and mutation[0] == self.current_zone:
+            self.runner.call_soon(self.apply_record_mutation, *mutation)
+    
+    def apply_record_mutation(self, zone_id, deleted, upserted):
+        """把记录增量应用到记录模型并只重绘可见的行，不重新获取整个域名"""
+        if zone_id != self.current_zone:
+            return
+        records = [DnsRecord.from_api(data, zone_id) for data in upserted]
+        for record_id in deleted:
+            self.record_errors.pop(record_id, None)
+        for record in records:
+            self.record_errors.pop(record.id, None)
+        self.record_model.apply_changes(deleted, records)
+        self.update_record_type_filter()
+        self.render_records()
+    
+    def render_records(self):
+        """按模型的 view 和滚动位置重绘可见区域的行
+        
+        Treeview 中只保留可见的几十行（iid 仍为 record_id），滚动、筛选、排序都只重绘这些行，
+        与记录总数无关。
+        """
+        model = self.record_model
+        total = len(model.view)
+        self.record_offset = max(0, min(self.record_offset, total - self.record_rows))
+        visible = model.view[self.record_offset:self.record_offset + self.record_rows]
+        
+        self.record_tree.delete(*self.record_tree.get_children())
+        for record_id in visible:
+            record = model.records[record_id]
+            proxied = "是" if record.proxied else "否"
+            record_type = record.type
+            tags = ()
+            if record_id in self.pending_records:
+                tags = ("pending",)
+            elif record_id in self.record_errors:
+                tags = ("error",)
+                record_type = f"⚠ {record_type}"
+            self.record_tree.insert("", tk.END, iid=record.id, tags=tags,
+                                  values=(record_type, record.name, record.content, proxied, record.ttl))
+        
+        self.record_tree.selection_set([record_id for record_id in visible if record_id in model.selection])
+        
+        if total:
+            self.record_scroll_y.set(self.record_offset / total,
+                                     min(1.0, (self.record_offset + self.record_rows) / total))
+        else:
+            self.record_scroll_y.set(0.0, 1.0)
+        self.update_records_title()
+    
+    def update_records_title(self):
+        """在记录列表标题中显示筛选后的数量（加载中的提示由加载流程设置）"""
+        if self.records_cancel:
+            return
+        model = self.record_model
+        if not model.records:
+            self.record_frame.config(text="DNS记录")
+        elif model.is_filtered():
+            self.record_frame.config(text=f"DNS记录 (显示 {len(model.view)} / 共 {len(model)} 条)")
+        else:
+            self.record_frame.config(text=f"DNS记录 (共 {len(model)} 条)")
+    
+    def update_record_type_filter(self):
+        """用当前记录中出现的类型更新类型筛选下拉框"""
+        self.filter_type_combo['values'] = ["全部"] + self.record_model.types()
+    
+    def apply_record_filter(self):
+        """按筛选栏的条件即时筛选记录（只在模型上计算，回到列表顶部）"""
+        record_type = self.filter_type_var.get()
+        proxied = {"是": True, "否": False}.get(self.filter_proxy_var.get())
+        self.record_model.set_filters(
+            record_type='' if record_type == "全部" else record_type,
+            name=self.filter_name_var.get(),
+            content=self.filter_content_var.get(),
+            proxied=proxied
+        )
+        self.record_offset = 0
+        self.render_records()
+    
+    def clear_record_filter(self):
+        """清除全部筛选条件"""
+        self.filter_type_var.set("全部")
+        self.filter_name_var.set("")
+        self.filter_content_var.set("")
+        self.filter_proxy_var.set("全部")
+        self.apply_record_filter()
+    
+    def sort_records(self, column):
+        """点击列标题在模型上排序，再次点击反转顺序"""
+        self.record_model.sort_by(column)
+        self.render_records()
+    
+    def scroll_records_to(self, offset):
+        """滚动到 view 中的指定位置"""
+        offset = max(0, min(offset, len(self.record_model.view) - self.record_rows))
+        if offset != self.record_offset:
+            self.record_offset = offset
+            self.render_records()
+    
+    def on_record_scroll(self, *args):
+        """垂直滚动条回调（moveto 比例 / scroll 行数或页数）"""
+        if args[0] == "moveto":
+            self.scroll_records_to(int(float(args[1]) * len(self.record_model.view)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.record_rows if args[2] == "pages" else 1)
+            self.scroll_records_to(self.record_offset + step)
+    
+    def on_record_wheel(self, event):
+        """鼠标滚轮按行滚动模型（Treeview 中只有可见行，不能交给它自己滚动）"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_records_to(self.record_offset - 3)
+        else:
+            self.scroll_records_to(self.record_offset + 3)
+        return "break"
+    
+    def on_record_tree_resize(self, event):
+        """窗口大小变化时按可见高度重新计算行数"""
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        rows = max(1, (event.height - 25) // row_height)
+        if rows != self.record_rows:
+            self.record_rows = rows
+            self.render_records()
+    
+    def on_record_click(self, event):
+        """不按 Ctrl/Shift 单击记录时清除可见区域之外的选中项（随后由 Treeview 选中点击的行）"""
+        if not event.state & 0x0005 and self.record_tree.identify_row(event.y):
+            self.record_model.selection.clear()
+    
+    def on_record_select(self, event=None):
+        """把可见行的选中状态同步到模型"""
+        selected = set(self.record_tree.selection())
+        for record_id in self.record_tree.get_children():
+            if record_id in selected:
+                self.record_model.selection.add(record_id)
+            else:
+                self.record_model.selection.discard(record_id)
+        
+        # 选中失败标记的行时显示其错误信息
+        if len(selected) == 1:
+            record_id = next(iter(selected))
+            if record_id in self.record_errors:
+                record = self.records_data[record_id]
+                self.record_status_label.config(text=f"⚠ {record.name}: {self.record_errors[record_id]}",
+                                                foreground="red")
+    
+    def on_record_key(self, event):
+        """方向键和翻页键到达可见区域边缘时滚动模型"""
+        children = self.record_tree.get_children()
+        if not children:
+            return None
+        focus = self.record_tree.focus()
+        if event.keysym in ("Up", "Down"):
+            step = -1 if event.keysym == "Up" else 1
+            edge = children[0] if step < 0 else children[-1]
+            if focus != edge:
+                return None  # 可见区域内移动交给 Treeview
+        else:
+            step = -self.record_rows if event.keysym == "Prior" else self.record_rows
+        
+        view = self.record_model.view
+        position = self.record_offset + (children.index(focus) if focus in children else 0)
+        position = max(0, min(position + step, len(view) - 1))
+        record_id = view[position]
+        
+        self.record_model.selection = {record_id}
+        if position < self.record_offset:
+            self.scroll_records_to(position)
+        elif position >= self.record_offset + self.record_rows:
+            self.scroll_records_to(position - self.record_rows + 1)
+        else:
+            self.render_records()
+        if self.record_tree.exists(record_id):
+            self.record_tree.focus(record_id)
+        return "break"
+    
+    def select_all_records(self, event=None):
+        """Ctrl+A 选中当前筛选结果中的全部记录"""
+        self.record_model.selection = set(self.record_model.view)
+        self.render_records()
+        return "break"
+    
+    def selected_record_ids(self):
+        """选中的 record_id（包括滚动出可见区域的），按显示顺序排列"""
+        return self.record_model.selected_ids()
+    
+    def schedule_prefetch(self):
+        """空闲一段时间后预取相邻域名的记录"""
+        if self.prefetch_after_id:
+            self.root.after_cancel(self.prefetch_after_id)
+        self.prefetch_after_id = self.root.after(PREFETCH_DELAY_MS, self.prefetch_neighbours)
+    
+    def prefetch_neighbours(self):
+        """在后台预取选中域名上下相邻域名的记录到缓存"""
+        self.prefetch_after_id = None
+        zone_id = self.current_zone
+        if not zone_id or not self.domain_tree.exists(zone_id):
+            return
+        
+        items = self.domain_tree.get_children()
+        index = self.domain_tree.index(zone_id)
+        neighbours = items[max(0, index - PREFETCH_NEIGHBOURS):index] + items[index + 1:index + 1 + PREFETCH_NEIGHBOURS]
+        api = self.api
+        
+        def prefetch(neighbour):
+            records = local_cache.load_records(neighbour)
+            if records is None:
+                records, error = api.list_dns_records(neighbour)
+                if error:
+                    return
+                records = [DnsRecord.from_api(record, neighbour) for record in records]
+            record_cache.put(neighbour, records)
+        
+        for neighbour in neighbours:
+            if neighbour in self.zones_data and not record_cache.contains(neighbour):
+                self.runner.submit(lambda neighbour=neighbour: in_bulk_lane(prefetch, neighbour))
     
     def show_add_domain_dialog(self):
         """显示添加域名对话框"""
@@ -2475,7 +7839,7 @@ class MainWindow:
             messagebox.showwarning("警告", "请先配置账号")
             return
         
-        dialog = AddDomainDialog(self.root, self.api)
+        dialog = AddDomainDialog(self.root, self.api, self.runner)
         self.root.wait_window(dialog.dialog)
         
         if dialog.success:
@@ -2487,32 +7851,60 @@ class MainWindow:
             messagebox.showwarning("警告", "请先配置账号")
             return
         
-        dialog = BatchAddDialog(self.root, self.api)
+        dialog = BatchAddDialog(self.root, self.api,
+                                on_done=lambda job: self.runner.call_soon(self.refresh_domains))
         self.root.wait_window(dialog.dialog)
         
-        if dialog.success:
-            self.refresh_domains()
+        if dialog.job:
+            self.show_job_queue()
     
     def delete_domain(self):
-        """删除域名"""
-        if not self.current_zone:
+        """删除域名（可多选，多个时并发删除并逐个显示结果）"""
+        selection = [zone_id for zone_id in self.domain_tree.selection() if zone_id in self.zones_data]
+        if not selection:
             messagebox.showwarning("警告", "请先选择域名")
             return
         
-        zone = self.zones_data.get(self.current_zone)
-        if not zone:
+        if len(selection) > 1:
+            if not messagebox.askyesno("确认", f"确定要删除选中的 {len(selection)} 个域名吗?\n\n此操作不可撤销。"):
+                return
+            BulkDeleteZonesDialog(self.root, self.api, self.runner,
+                                  [self.zones_data[zone_id] for zone_id in selection], self.forget_zone)
             return
         
-        if not messagebox.askyesno("确认", f"确定要删除域名 {zone['name']} 吗?"):
+        zone = self.zones_data[selection[0]]
+        if not messagebox.askyesno("确认", f"确定要删除域名 {zone.name} 吗?"):
             return
         
-        result, error = self.api.delete_zone(self.current_zone)
+        api = self.api
+        self.runner.submit(lambda: api.delete_zone(zone.id),
+                           lambda result: self.on_zone_deleted(api, zone, result))
+    
+    def on_zone_deleted(self, api, zone, result):
+        """单个域名删除完成（主线程）"""
+        _, error = result
         if error:
-            messagebox.showerror("错误", f"删除域名失败: {error}")
-        else:
-            messagebox.showinfo("成功", "域名删除成功")
+            messagebox.showerror("错误", f"删除域名 {zone.name} 失败: {error}")
+            return
+        if api is self.api:
+            self.forget_zone(zone.id)
+        messagebox.showinfo("成功", f"域名 {zone.name} 删除成功")
+    
+    def forget_zone(self, zone_id):
+        """域名已删除：只移除对应的行和缓存，不重新获取整个列表"""
+        self.zones_data.pop(zone_id, None)
+        if self.domain_tree.exists(zone_id):
+            self.domain_tree.delete(zone_id)
+        
+        for key, zones in list(self.api.cache.items()):
+            if isinstance(key, tuple) and key[0] == 'zones':
+                self.api.cache[key] = [zone for zone in zones if zone.id != zone_id]
+        
+        if zone_id == self.current_zone:
             self.current_zone = None
-            self.refresh_domains()
+            self.clear_records()
+            self.ns_text.delete(1.0, tk.END)
+        self.update_domains_title()
     
     def show_add_record_dialog(self):
         """显示添加DNS记录对话框"""
@@ -2520,15 +7912,12 @@ class MainWindow:
             messagebox.showwarning("警告", "请先选择域名")
             return
         
-        dialog = AddRecordDialog(self.root, self.api, self.current_zone)
+        dialog = AddRecordDialog(self.root, self.api, self.current_zone, self.runner)
         self.root.wait_window(dialog.dialog)
-        
-        if dialog.success:
-            self.refresh_records()
     
     def show_edit_record_dialog(self):
         """显示修改DNS记录对话框"""
-        selection = self.record_tree.selection()
+        selection = self.selected_record_ids()
         if not selection:
             messagebox.showwarning("警告", "请先选择要修改的DNS记录")
             return
@@ -2538,11 +7927,8 @@ class MainWindow:
             return
         
         record_id = selection[0]
-        dialog = EditRecordDialog(self.root, self.api, self.current_zone, record_id)
+        dialog = EditRecordDialog(self.root, self.api, self.current_zone, record_id, self.runner)
         self.root.wait_window(dialog.dialog)
-        
-        if dialog.success:
-            self.refresh_records()
     
     def show_batch_add_records_dialog(self):
         """显示批量添加DNS记录对话框"""
@@ -2553,37 +7939,172 @@ class MainWindow:
         dialog = BatchAddRecordsDialog(self.root, self.api, self.current_zone)
         self.root.wait_window(dialog.dialog)
         
-        if dialog.success:
-            self.refresh_records()
+        if dialog.job:
+            self.show_job_queue()
     
     def show_batch_edit_records_dialog(self):
         """显示批量修改DNS记录对话框"""
-        selection = self.record_tree.selection()
+        selection = self.selected_record_ids()
         if not selection:
             messagebox.showwarning("警告", "请先选择要修改的DNS记录")
             return
         
-        # 获取选中记录的详细信息
-        selected_records = []
-        for record_id in selection:
-            # 通过API获取记录详情
-            result, error = self.api._request("GET", f"/zones/{self.current_zone}/dns_records/{record_id}")
-            if not error and result:
-                selected_records.append((record_id, result))
+        # 获取选中记录的详细信息（优先使用列表中已加载的数据，缺失的在后台并发获取）
+        zone_id = self.current_zone
+        api = self.api
+        selected_records = [(record_id, self.records_data[record_id])
+                            for record_id in selection if record_id in self.records_data]
+        missing = [record_id for record_id in selection if record_id not in self.records_data]
+        if not missing:
+            self.open_batch_edit_dialog(zone_id, selected_records)
+            return
+        
+        def fetch():
+            fetched = []
+            for record_id, result, error in run_concurrently(
+                    lambda rid: api._request("GET", f"/zones/{zone_id}/dns_records/{rid}"), missing):
+                if not error and result:
+                    fetched.append((record_id, result))
+            return fetched, None
         
+        self.runner.submit(fetch, lambda result: self.open_batch_edit_dialog(
+            zone_id, selected_records + (result[0] or [])))
+    
+    def open_batch_edit_dialog(self, zone_id, selected_records):
+        """打开批量修改DNS记录对话框（主线程）；获取期间切换了域名则不再打开"""
+        if zone_id != self.current_zone:
+            return
         if not selected_records:
             messagebox.showerror("错误", "无法获取选中记录的信息")
             return
         
-        dialog = BatchEditRecordsDialog(self.root, self.api, self.current_zone, selected_records)
+        dialog = BatchEditRecordsDialog(self.root, self.api, zone_id, selected_records,
+                                        on_done=lambda job: self.runner.call_soon(self.on_records_job_done, zone_id))
         self.root.wait_window(dialog.dialog)
         
-        if dialog.success:
+        if dialog.job:
+            self.show_job_queue()
+    
+    def on_records_job_done(self, zone_id):
+        """修改记录的后台任务结束（主线程）：仍在查看该域名时刷新记录列表"""
+        record_cache.invalidate(zone_id)
+        if self.current_zone == zone_id and self.records_cancel is None:
+            self.refresh_records(force=True)
+    
+    def show_bulk_replace_dialog(self):
+        """显示跨域名批量替换对话框"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        BulkReplaceDialog(self.root, self.runner)
+    
+    def show_reverse_lookup_dialog(self):
+        """显示反向查找对话框"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        ReverseLookupDialog(self.root, self.runner)
+    
+    def show_record_search_dialog(self):
+        """显示全文搜索对话框"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        RecordSearchDialog(self.root, self.runner)
+    
+    def show_all_zones_dialog(self):
+        """显示全部账号域名总览"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        AllZonesDialog(self.root, self.runner)
+    
+    def show_journal_dialog(self):
+        """显示变更日志对话框"""
+        JournalDialog(self.root, self.runner)
+    
+    def show_job_queue(self):
+        """显示任务队列面板（只保留一个）"""
+        if self.job_queue_dialog and self.job_queue_dialog.dialog.winfo_exists():
+            self.job_queue_dialog.dialog.lift()
+            return
+        self.job_queue_dialog = JobQueueDialog(self.root, self.runner)
+    
+    def toggle_sync(self):
+        """开启或停止后台同步"""
+        if self.sync_var.get():
+            if not config.is_configured():
+                messagebox.showwarning("警告", "请先配置账号")
+                self.sync_var.set(False)
+                return
+            self.sync_daemon = SyncDaemon(local_cache, on_round=lambda summary: self.runner.call_soon(
+                self.on_sync_round, summary))
+            self.sync_daemon.start()
+            self.sync_label.config(text="后台同步中...")
+        elif self.sync_daemon:
+            self.sync_daemon.stop()
+            self.sync_daemon = None
+            self.sync_label.config(text="后台同步已停止")
+    
+    def on_sync_round(self, summary):
+        """一轮后台同步结束（主线程）：显示摘要，有变化的域名从本地缓存重新显示"""
+        if not self.sync_daemon:
+            return
+        self.sync_label.config(text=f"{time.strftime('%H:%M:%S')} {describe_sync_run(summary)}")
+        
+        changed_zones = set()
+        zone_list_changed = False
+        for zone_id, _, _, record_type, _, _ in summary['changes']:
+            changed_zones.add(zone_id)
+            if record_type == "域名":
+                zone_list_changed = True
+        
+        for zone_id in changed_zones:
+            record_cache.invalidate(zone_id)
+        
+        if zone_list_changed:
+            for client in list(registry.clients.values()):
+                for key in [key for key in client.cache if isinstance(key, tuple) and key[0] == 'zones']:
+                    del client.cache[key]
+            if self.api and self.domains_cancel is None:
+                self.show_domains()
+        elif self.current_zone in changed_zones and self.records_cancel is None:
             self.refresh_records()
     
+    def show_sync_changes(self):
+        """显示最近一轮后台同步的变更"""
+        summary = local_cache.last_sync_run()
+        if not summary:
+            messagebox.showinfo("提示", "还没有进行过后台同步")
+            return
+        SyncChangesDialog(self.root, summary)
+    
+    def show_template_dialog(self):
+        """显示记录模板对话框，主窗口中选中的域名作为默认目标"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        zones = [self.zones_data[zone_id] for zone_id in self.domain_tree.selection() if zone_id in self.zones_data]
+        account = config.get_current_account()
+        TemplateDialog(self.root, self.runner, self.api, zones, account['name'] if account else '')
+    
+    def show_sync_dialog(self):
+        """显示期望状态同步对话框"""
+        if not config.is_configured():
+            messagebox.showwarning("警告", "请先配置账号")
+            return
+        
+        SyncDialog(self.root, self.runner)
+    
+    @journaled("删除DNS记录")
     def delete_record(self):
-        """删除DNS记录"""
-        selection = self.record_tree.selection()
+        """删除DNS记录（乐观更新：先从列表移除，失败时恢复）"""
+        selection = self.selected_record_ids()
         if not selection:
             messagebox.showwarning("警告", "请先选择DNS记录")
             return
@@ -2591,35 +8112,25 @@ class MainWindow:
         if not messagebox.askyesno("确认", "确定要删除选中的DNS记录吗?"):
             return
         
-        for record_id in selection:
-            result, error = self.api.delete_dns_record(self.current_zone, record_id)
-            if error:
-                messagebox.showerror("错误", f"删除DNS记录失败: {error}")
-                return
-        
-        messagebox.showinfo("成功", "DNS记录删除成功")
-        self.refresh_records()
+        zone_id = self.current_zone
+        api = self.api
+        changes = [(self.records_data[record_id], None) for record_id in selection]
+        self.start_optimistic("删除DNS记录", changes,
+                              lambda record: api.delete_dns_record(zone_id, record.id))
     
     def toggle_proxy(self, enable):
         """切换代理状态"""
-        selection = self.record_tree.selection()
+        selection = self.selected_record_ids()
         if not selection:
             messagebox.showwarning("警告", "请先选择DNS记录")
             return
         
-        record_id = selection[0]
-        result, error = self.api.update_record_proxy_status(self.current_zone, record_id, enable)
-        
-        if error:
-            messagebox.showerror("错误", f"更新代理状态失败: {error}")
-        else:
-            status = "开启" if enable else "关闭"
-            messagebox.showinfo("成功", f"代理已{status}")
-            self.refresh_records()
+        self.set_proxy_status(selection[:1], enable)
     
+    @journaled("批量切换代理")
     def batch_toggle_proxy(self, enable):
         """批量切换代理状态"""
-        selection = self.record_tree.selection()
+        selection = self.selected_record_ids()
         if not selection:
             messagebox.showwarning("警告", "请先选择DNS记录")
             return
@@ -2628,23 +8139,222 @@ class MainWindow:
         if not messagebox.askyesno("确认", f"确定要批量{status}代理吗?"):
             return
         
-        success_count = 0
-        fail_count = 0
+        self.set_proxy_status(selection, enable)
+    
+    def set_proxy_status(self, record_ids, enable):
+        """乐观地切换代理状态：列表立即显示新状态，后台只提交 proxied（开启时 TTL 设为自动）
         
-        for record_id in selection:
-            result, error = self.api.update_record_proxy_status(self.current_zone, record_id, enable)
-            if error:
-                fail_count += 1
-            else:
-                success_count += 1
+        类型已在本地记录中，不再像 update_record_proxy_status 那样先 GET 一次；
+        不支持代理的记录类型直接标记为失败。
+        """
+        status = "开启" if enable else "关闭"
+        label = f"{status}代理"
+        zone_id = self.current_zone
+        api = self.api
+        
+        changes = []
+        unsupported = []
+        for record_id in record_ids:
+            record = self.records_data[record_id]
+            if record.type not in PROXIABLE_TYPES:
+                unsupported.append((record, f"{record.type} 类型的记录不支持代理"))
+            elif record.proxied != enable:
+                changed = DnsRecord(record.id, record.zone_id, record.type, record.name, record.content,
+                                    enable, 1 if enable else record.ttl, record.priority, record.data)
+                changes.append((record, changed))
+        
+        patch = {"proxied": enable, "ttl": 1} if enable else {"proxied": enable}
+        self.start_optimistic(label, changes,
+                              lambda record: api.patch_dns_record(zone_id, record.id, patch),
+                              failed=unsupported)
+    
+    def start_optimistic(self, label, changes, send, failed=()):
+        """乐观更新记录列表，再在后台逐条发送请求
+        
+        changes 为 [(原记录, 预期的新记录，删除时为 None)]，send(原记录) 在后台线程执行并返回 (result, error)。
+        成功时由写操作监听器用接口返回的记录替换预期值；失败时回滚该行并标记 ⚠，
+        全部完成后在记录列表下方汇总结果，不逐条弹窗。
+        """
+        model = self.record_model
+        zone_id = self.current_zone
+        # 正在提交的记录不重复提交
+        changes = [(record, changed) for record, changed in changes if record.id not in self.pending_records]
+        positions = {record_id: index for index, record_id in enumerate(model.records)}
+        
+        for record, error in failed:
+            self.record_errors[record.id] = error
+        for record, changed in changes:
+            self.pending_records[record.id] = changed
+            self.record_errors.pop(record.id, None)
+        model.apply_changes([record.id for record, changed in changes if changed is None],
+                            [changed for record, changed in changes if changed is not None])
+        self.render_records()
+        
+        outcome = {'total': len(changes) + len(failed), 'done': len(failed), 'failed': list(failed)}
+        if not changes:
+            self.show_optimistic_summary(label, outcome)
+            return
         
-        messagebox.showinfo("完成", f"成功: {success_count}, 失败: {fail_count}")
-        self.refresh_records()
+        self.record_status_label.config(text=f"{label}: 正在提交 {len(changes)} 条记录...", foreground="gray")
+        for record, changed in changes:
+            self.runner.submit(
+                lambda record=record: send(record),
+                lambda result, record=record, changed=changed: self.on_optimistic_done(
+                    label, zone_id, record, changed, positions.get(record.id), result, outcome))
+    
+    def on_optimistic_done(self, label, zone_id, record, changed, position, result, outcome):
+        """一条乐观更新的请求完成（主线程）：失败时回滚并标记，全部完成后汇总"""
+        _, error = result
+        if self.pending_records.get(record.id, False) is changed:
+            del self.pending_records[record.id]
+        
+        outcome['done'] += 1
+        if error:
+            outcome['failed'].append((record, error))
+            if zone_id == self.current_zone:
+                self.rollback_record(record, changed, position, error)
+        
+        if zone_id == self.current_zone:
+            self.render_records()
+        if outcome['done'] == outcome['total']:
+            self.show_optimistic_summary(label, outcome)
+    
+    def rollback_record(self, record, changed, position, error):
+        """恢复乐观更新前的记录（期间列表已被重新加载时不覆盖新数据），并标记错误"""
+        model = self.record_model
+        current = model.records.get(record.id)
+        if changed is None:
+            if current is None:
+                model.restore(record, position)
+        elif current is changed:
+            model.apply_changes([], [record])
+        self.record_errors[record.id] = error
+    
+    def show_optimistic_summary(self, label, outcome):
+        """在记录列表下方汇总一批操作的结果"""
+        failed = outcome['failed']
+        if not outcome['total']:
+            self.record_status_label.config(text=f"{label}: 选中的记录无需修改", foreground="gray")
+            return
+        if not failed:
+            self.record_status_label.config(text=f"{label}: {outcome['total']} 条记录全部成功", foreground="green")
+            return
+        
+        record, error = failed[0]
+        text = (f"{label}: 成功 {outcome['total'] - len(failed)}, 失败 {len(failed)}"
+                f"（已恢复并标记 ⚠）  {record.name}: {error}")
+        self.record_status_label.config(text=text, foreground="red")
 
 
 # ==================== 程序入口 ====================
 
+def select_accounts(keys):
+    """按名称或 Account ID 选择已配置的账号，keys 为空时返回全部账号"""
+    if not keys:
+        return list(config.accounts), None
+    
+    accounts = []
+    for key in keys:
+        index = registry.find(key)
+        if index is None:
+            return None, f"未找到账号: {key}"
+        accounts.append(config.accounts[index])
+    return accounts, None
+
+
+@journaled("期望状态同步 (命令行)")
+def run_sync_cli(path, apply=False, account_keys=None):
+    """命令行：按期望状态文件输出变更计划，apply 为 True 时提交"""
+    accounts, error = select_accounts(account_keys)
+    if error:
+        print(error)
+        return 1
+    
+    state, error = load_desired_state(path)
+    if error:
+        print(error)
+        return 1
+    
+    plans, errors = build_sync_plans(state, accounts)
+    for error in errors:
+        print(f"[警告] {error}")
+    
+    for plan in plans:
+        print(f"{plan.zone_name}: {plan.summary()}")
+        for operation, record_type, name, detail in describe_sync_plan(plan):
+            print(f"  {operation} {record_type} {name} {detail}")
+    
+    if not apply:
+        return 0
+    
+    fail_count = 0
+    for plan, outcome, error in apply_sync_plans([p for p in plans if not p.is_empty()]):
+        failed = [item_error for _, _, _, item_error in outcome or [] if item_error]
+        if error:
+            failed.append(error)
+        fail_count += len(failed)
+        print(f"[{'失败' if failed else '完成'}] {plan.zone_name}: 失败 {len(failed)} 项")
+        for item_error in failed:
+            print(f"    {item_error}")
+    return 1 if fail_count else 0
+
+
+def run_daemon_cli(interval=SYNC_INTERVAL, budget=SYNC_REQUEST_BUDGET, account_keys=None):
+    """命令行：前台运行后台同步，每轮输出变更，Ctrl+C 退出"""
+    accounts, error = select_accounts(account_keys)
+    if error:
+        print(error)
+        return 1
+    
+    def on_round(summary):
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {describe_sync_run(summary)}")
+        for _, zone_name, operation, record_type, name, detail in summary['changes']:
+            print(f"  {zone_name}: {operation} {record_type} {name} {detail}")
+        for error in summary['errors']:
+            print(f"  [警告] {error}")
+    
+    daemon = SyncDaemon(local_cache, accounts if account_keys else None, interval, budget, on_round)
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Cloudflare DNS 域名管理工具")
+    parser.add_argument("--plan", metavar="FILE", help="按期望状态文件 (JSON/YAML) 输出变更计划，不启动界面")
+    parser.add_argument("--apply", action="store_true", help="与 --plan 一起使用：提交变更计划")
+    parser.add_argument("--account", action="append", metavar="NAME_OR_ID",
+                        help="只使用指定的已配置账号（名称或 Account ID，可重复）")
+    parser.add_argument("--bench-memory", type=int, nargs="?", const=100000, metavar="N",
+                        help="对比 N 个域名（默认 100000）用原始字典与精简模型保存时的内存占用")
+    parser.add_argument("--bench-transport", nargs="?", const="", metavar="URL",
+                        help="对比各 HTTP 传输在不同并发数下的吞吐量和延迟（默认使用本地模拟 API）")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS),
+                        help="本次运行使用的 HTTP 传输（默认按配置文件，http1）")
+    parser.add_argument("--daemon", action="store_true", help="不启动界面，定期同步所有账号的域名和记录到本地缓存")
+    parser.add_argument("--interval", type=float, default=SYNC_INTERVAL, metavar="SECONDS",
+                        help=f"与 --daemon 一起使用：同步间隔（默认 {SYNC_INTERVAL} 秒）")
+    parser.add_argument("--budget", type=int, default=SYNC_REQUEST_BUDGET, metavar="N",
+                        help=f"与 --daemon 一起使用：每轮最多请求数（默认 {SYNC_REQUEST_BUDGET}）")
+    args = parser.parse_args()
+    
+    if args.transport:
+        config.transport = args.transport
+    
+    if args.bench_transport is not None:
+        sys.exit(run_transport_benchmark(args.bench_transport or None))
+    
+    if args.bench_memory:
+        sys.exit(run_memory_benchmark(args.bench_memory))
+    
+    if args.plan:
+        sys.exit(run_sync_cli(args.plan, args.apply, args.account))
+    
+    if args.daemon:
+        sys.exit(run_daemon_cli(args.interval, args.budget, args.account))
+    
     root = tk.Tk()
     app = MainWindow(root)
     root.mainloop()